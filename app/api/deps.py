@@ -1,14 +1,58 @@
 # app/api/deps.py
 
-from fastapi import Depends, HTTPException, Header
+import math
+
+from fastapi import Depends, HTTPException, Header, Request
 from fastapi.security import HTTPBearer
-from app.services.supabase_client import get_user_from_token
+from app.core import admission
+from app.core.metrics import span
+from app.services.auth import verify_token
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 async def get_current_user(authorization: str = Depends(security)):
     token = authorization.credentials
-    user = await get_user_from_token(token)
+    with span("auth"):
+        user = await verify_token(token)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid or missing token")
     return user
+
+
+async def get_optional_user(authorization=Depends(optional_security)):
+    """The signed-in user, or None for anonymous requests. A token that is
+    present but invalid is still rejected."""
+    if authorization is None:
+        return None
+    return await get_current_user(authorization)
+
+
+async def _admit(key: str, priority: int, cost: float) -> None:
+    try:
+        await admission.controller.acquire(key, priority, cost)
+    except admission.AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests. Please retry shortly.",
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+
+
+def admitted_user(priority: int = admission.BULK, cost: float = 1):
+    """Dependency for LLM-backed routes: the signed-in user, once admission
+    control lets the request through (429 with Retry-After otherwise)."""
+    async def dependency(user=Depends(get_current_user)):
+        await _admit(user["id"], priority, cost)
+        return user
+    return dependency
+
+
+def admitted_optional_user(priority: int = admission.BULK, cost: float = 1):
+    """Like admitted_user for routes open to anonymous callers, who are
+    rate limited per client address."""
+    async def dependency(request: Request, user=Depends(get_optional_user)):
+        key = user["id"] if user else f"anon:{request.client.host if request.client else 'unknown'}"
+        await _admit(key, priority, cost)
+        return user
+    return dependency
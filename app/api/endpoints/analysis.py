@@ -0,0 +1,100 @@
+import asyncio
+import logging
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.services.llm_cache import cached_chat_completion
+from app.services.groq_service import GroqServiceError
+from app.prompts.loader import prompt_version
+from app.prompts.messages import career_messages, feedback_messages, rag_question_messages
+from app.services.rag import similar_postings
+from app.services.resume_text import resume_sections
+from app.core.admission import BULK
+from app.api.deps import admitted_user, get_current_user
+from app.api.etag import tagged_resume, with_etag
+from app.api.sse import sse_event
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+# Templates the combined result depends on, for its ETag.
+ANALYSIS_PROMPTS = ("career_recommendation.md", "resume_feedback.md", "rag_enhanced_question.md", "mock_question.md")
+# Prompt type (model tier) of each section.
+SECTION_ROUTES = {"recommendations": "career_recommendation", "feedback": "resume_feedback", "question": "interview_question"}
+
+
+async def _section(name: str, messages, version: str):
+    try:
+        return name, await cached_chat_completion(messages, prompt_version=version, route=SECTION_ROUTES[name]), None
+    except GroqServiceError as e:
+        logger.warning("Analysis section %s failed: %s", name, e)
+        return name, None, e.PUBLIC_MESSAGE
+
+
+async def _question_section(job_title: str, resume: dict):
+    # Retrieval runs inside the task, alongside the other sections.
+    postings = await similar_postings(job_title)
+    return await _section("question", *rag_question_messages(job_title, postings, resume_sections(resume)))
+
+
+async def analysis_resume(
+    request: Request,
+    job_title: Optional[str] = Body(None, embed=True),
+    user=Depends(get_current_user),
+) -> Tuple[Optional[dict], Optional[str]]:
+    """(resume, ETag) for /full. A dependency declared before admission, so
+    a 304 spends none of the three admission tokens."""
+    parts = (prompt_version(name) for name in ANALYSIS_PROMPTS)
+    return await tagged_resume(request, user["id"], *parts, (job_title or "").strip())
+
+
+@router.post("/full")
+async def full_analysis(
+    job_title: Optional[str] = Body(None, embed=True),
+    stream: bool = False,
+    tagged: Tuple[Optional[dict], Optional[str]] = Depends(analysis_resume),
+    # One request, up to three completions.
+    user=Depends(admitted_user(BULK, cost=3)),
+):
+    """Career paths, resume feedback and (optionally) an interview question
+    from one resume fetch, with the LLM calls running concurrently."""
+    resume, etag = tagged
+    if not resume or not resume.get("content"):
+        raise HTTPException(400, "No resume content found. Please upload your resume first.")
+
+    sections = {
+        "recommendations": career_messages(resume["content"], resume.get("sections")),
+        "feedback": feedback_messages(resume["content"], resume.get("sections")),
+    }
+    # Each call still goes through the shared Groq concurrency limit.
+    tasks = [asyncio.ensure_future(_section(name, *built)) for name, built in sections.items()]
+    if job_title and job_title.strip():
+        tasks.append(asyncio.ensure_future(_question_section(job_title, resume)))
+
+    if stream:
+        async def body():
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    name, content, error = await next_done
+                    if error:
+                        yield sse_event({"section": name, "detail": error}, event="error")
+                    else:
+                        yield sse_event({"section": name, "content": content}, event="section")
+                yield sse_event({}, event="done")
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+        # Sections can still fail after the headers are sent, so streams carry no ETag.
+        return StreamingResponse(body(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+    result = {"errors": {}}
+    for name, content, error in await asyncio.gather(*tasks):
+        if error:
+            result["errors"][name] = error
+        else:
+            result[name] = content
+    # Only a complete result is worth revalidating against.
+    return with_etag(JSONResponse(result), None if result["errors"] else etag)
@@ -1,25 +1,47 @@
+from typing import Optional, Tuple
+
 from fastapi import APIRouter, Depends
-from app.services.groq_service import chat_completion
-from app.services.supabase_client import get_latest_resume_by_user
-from app.prompts.loader import load_prompt
-from app.api.deps import get_current_user
+from fastapi.responses import JSONResponse
+from app.services.llm_cache import cached_chat_completion, cached_stream_chat_completion
+from app.prompts.messages import career_messages
+from app.api.deps import admitted_user
+from app.api.etag import resume_etag, with_etag
+from app.api.sse import sse_response
+from app.api.endpoints.jobs import enqueue
+from app.services import job_queue
 
 router = APIRouter()
 
+ROUTE = "career_recommendation"
+
+
+async def _run_job(params: dict) -> dict:
+    messages, version = career_messages(params["resume_text"])
+    return {"recommendations": await cached_chat_completion(messages, prompt_version=version, route=ROUTE)}
+
+job_queue.register("career_recommendation", _run_job)
+
+
 @router.post("/recommend")
-async def recommend_paths(user=Depends(get_current_user)):
-    resume = get_latest_resume_by_user(user["id"])
+async def recommend_paths(
+    stream: bool = False,
+    background: bool = False,
+    tagged: Tuple[Optional[dict], Optional[str]] = Depends(resume_etag("career_recommendation.md")),
+    user=Depends(admitted_user()),
+):
+    resume, etag = tagged
     if not resume or not resume.get("content"):
         return {"error": "No resume content found. Please upload again."}
 
-    template = load_prompt("career_recommendation.md")
-    prompt_text = template.replace("{{ resume_text }}", resume["content"])
+    messages, version = career_messages(resume["content"], resume.get("sections"))
+
+    if background:
+        return await enqueue(user["id"], "career_recommendation", {"resume_text": resume["content"]})
 
-    messages = [
-        {"role": "system", "content": "You are an expert career strategist with up‑to‑the‑minute knowledge of labor‑market trends, compensation data, and emerging skills demands."},
-        {"role": "user", "content": prompt_text}
-    ]
+    if stream:
+        # The stream can still end in an error event after the headers, so it carries no ETag.
+        return await sse_response(cached_stream_chat_completion(messages, prompt_version=version, route=ROUTE))
 
-    response = await chat_completion(messages)
-    return {"recommendations": response}
+    response = await cached_chat_completion(messages, prompt_version=version, route=ROUTE)
+    return with_etag(JSONResponse({"recommendations": response}), etag)
 
@@ -1,7 +1,66 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+from app.core.admission import admission_stats
+from app.prompts.loader import registry as prompt_registry
+from app.services.llm_cache import cache_stats
+from app.services import db_client, embeddings, groq_service, job_queue, question_cache, supabase_client, vector_search
 
 router = APIRouter()
 
 @router.get("")
 def health_check():
     return {"status": "ok"}
+
+
+@router.get("/live")
+def liveness():
+    """The process is up and serving; says nothing about dependencies."""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+def readiness(request: Request):
+    """200 once startup has finished and every dependency is usable,
+    503 (with the failing checks) otherwise. Best-effort features are
+    listed under "degraded" when unavailable but do not fail the check."""
+    checks = {
+        "startup": getattr(request.app.state, "ready", False),
+        "groq": groq_service.is_configured(),
+        "supabase": supabase_client.is_initialised(),
+        "job_queue": job_queue.is_running(),
+        "prompts": prompt_registry.loaded,
+    }
+    if embeddings.EMBEDDING_WARMUP:
+        checks["embedding_model"] = embeddings.model_loaded()
+    ready = all(checks.values())
+    optional = {}
+    if db_client.DATABASE_URL:
+        optional["database"] = db_client.is_configured()
+    if vector_search.VECTOR_BACKEND == "local":
+        optional["vector_index"] = vector_search.get_local_index() is not None
+    degraded = [name for name, ok in optional.items() if not ok]
+    status = "unavailable" if not ready else "degraded" if degraded else "ok"
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": status, "checks": checks, "degraded": degraded},
+    )
+
+
+@router.get("/cache")
+def llm_cache_stats():
+    return cache_stats()
+
+
+@router.get("/question_cache")
+def question_cache_stats():
+    return question_cache.cache_stats()
+
+
+@router.get("/admission")
+def admission_control_stats():
+    return admission_stats()
+
+
+@router.get("/routing")
+def model_routing_stats():
+    return groq_service.routing_stats()
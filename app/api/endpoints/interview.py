@@ -1,74 +1,101 @@
+import asyncio
+from typing import AsyncIterator, Optional, Tuple
+
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse
 from app.services.supabase_client import get_latest_resume_by_user
-from app.services.groq_service import chat_completion
-from app.prompts.loader import load_prompt
-from app.api.deps import get_current_user
+from app.services import mock_interviews, question_cache
+from app.services.groq_service import routed_completion, routed_stream_completion
+from app.services.llm_cache import cached_chat_completion
+from app.prompts.messages import critique_messages, feedback_messages, rag_question_messages
+from app.services.rag import similar_postings
+from app.services.resume_text import resume_sections
+from app.core.admission import BULK, INTERACTIVE
+from app.api.deps import admitted_optional_user, admitted_user
+from app.api.etag import resume_etag, with_etag
+from app.api.sse import sse_response
 
 router = APIRouter()
 
 # 1. Résumé feedback
 @router.post("/feedback")
-async def get_resume_feedback(user=Depends(get_current_user)):
-    resume = get_latest_resume_by_user(user["id"])
+async def get_resume_feedback(
+    tagged: Tuple[Optional[dict], Optional[str]] = Depends(resume_etag("resume_feedback.md")),
+    user=Depends(admitted_user(BULK)),
+):
+    resume, etag = tagged
     if not resume or not resume.get("content"):
         raise HTTPException(400, "No résumé content found. Upload one first.")
 
-    template = load_prompt("resume_feedback.md")
-    prompt_text = template.replace("{{ resume_text }}", resume["content"])
+    # Same compaction, budget and cache entries as /resume_feedback/feedback.
+    messages, version = feedback_messages(resume["content"], resume.get("sections"))
+    response = await cached_chat_completion(messages, prompt_version=version, route="resume_feedback")
+    return with_etag(JSONResponse({"feedback": response}), etag)
+
+# 2. Generate interview question
+async def start_retrieval(job_title: str, tailored: bool = False) -> AsyncIterator[Optional[asyncio.Task]]:
+    # Declared before the auth dependency so retrieval runs while the token is
+    # verified. Only tailored questions use it (pooled ones retrieve when the
+    # pool is filled), and it is cancelled however the request ends, 429 included.
+    retrieval = asyncio.ensure_future(similar_postings(job_title)) if tailored else None
+    try:
+        yield retrieval
+    finally:
+        if retrieval is not None:
+            retrieval.cancel()
 
-    messages = [
-        {
-            "role": "system",
-            "content": (
-                "You are a senior résumé coach for technical roles. "
-            ),
-        },
-        {"role": "user", "content": prompt_text},
-    ]
 
-    response = await chat_completion(messages)
-    return {"feedback": response}   
+async def _latest_sections(user):
+    if user is None:
+        return None
+    resume = await get_latest_resume_by_user(user["id"])
+    return resume_sections(resume) if resume and resume.get("content") else None
+
+
+# Pooled questions should differ from each other, so they skip the exact-match cache.
+QUESTION_TEMPERATURE = 0.9
+
+
+async def _pooled_question(job_title: str) -> str:
+    messages, _ = rag_question_messages(job_title, await similar_postings(job_title))
+    return (await routed_completion("interview_question", messages, temperature=QUESTION_TEMPERATURE)).strip()
+
 
-# 2. Generate interview question
 @router.get("/question")
-async def generate_interview_question(job_title: str):
-    template = load_prompt("interview_question.md")
-    prompt_text = template.replace("{{ job_title }}", job_title.strip())
-
-    messages = [
-        {
-            "role": "system",
-            "content": "You are a technical interviewer for top tech firms.",
-        },
-        {"role": "user", "content": prompt_text},
-    ]
-
-    response = await chat_completion(messages)
+async def generate_interview_question(
+    job_title: str,
+    tailored: bool = False,
+    retrieval: Optional[asyncio.Task] = Depends(start_retrieval),
+    user=Depends(admitted_optional_user(INTERACTIVE)),
+):
+    if not tailored or user is None:
+        # Shared across users: served from the semantic per-role pool.
+        return {"question": await question_cache.get_question(job_title, _pooled_question)}
+
+    sections = await _latest_sections(user)
+    postings = await retrieval
+    messages, version = rag_question_messages(job_title, postings, sections)
+
+    response = await cached_chat_completion(messages, prompt_version=version, route="interview_question")
     return {"question": response.strip()}
 
 # 3. Critique interview answer
 @router.post("/critique")
-async def critique_interview_answer(payload: dict):
+async def critique_interview_answer(payload: dict, stream: bool = False, user=Depends(admitted_user(INTERACTIVE))):
     question = payload.get("question", "").strip()
     answer = payload.get("answer", "").strip()
     if not question or not answer:
         raise HTTPException(400, "Both question and answer are required.")
 
-    template = load_prompt("interview_critique.md")
-    prompt_text = (
-        template.replace("{{ question }}", question)
-                .replace("{{ answer }}", answer)
-    )
-
-    messages = [
-        {
-            "role": "system",
-            "content": (
-                "You are a hiring manager"
-            ),
-        },
-        {"role": "user", "content": prompt_text},
-    ]
-
-    response = await chat_completion(messages)
-    return {"critique": response}  
\ No newline at end of file
+    messages, _ = critique_messages(question, answer)
+
+    def finish(text: str) -> dict:
+        score, critique = mock_interviews.parse_critique(text)
+        # Buffered write-behind; the response does not wait for the insert.
+        mock_interviews.record(user["id"], question, answer, critique, score)
+        return {"critique": critique, "score": score}
+
+    if stream:
+        return await sse_response(routed_stream_completion("critique", messages), on_complete=finish)
+
+    return finish(await routed_completion("critique", messages))  
\ No newline at end of file
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse
+from app.services import job_queue
+from app.api.deps import get_current_user
+
+router = APIRouter()
+
+PUBLIC_FIELDS = ("id", "kind", "status", "result", "error", "created_at", "updated_at")
+
+
+def _public(job: dict) -> dict:
+    return {field: job[field] for field in PUBLIC_FIELDS}
+
+
+async def enqueue(user_id: str, kind: str, params: dict) -> JSONResponse:
+    """Submit a background job and answer 202 with its id right away."""
+    try:
+        job = await job_queue.submit(user_id, kind, params)
+    except job_queue.JobQueueFull:
+        raise HTTPException(503, "Too many pending jobs. Please retry shortly.", headers={"Retry-After": "5"})
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job["id"], "status": job["status"]},
+        headers={"Location": f"/jobs/{job['id']}"},
+    )
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str, user=Depends(get_current_user)):
+    job = await job_queue.get_job(job_id)
+    if job is None or job["user_id"] != user["id"]:
+        raise HTTPException(404, "Job not found")
+    return _public(job)
@@ -0,0 +1,28 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core import admission, metrics
+from app.services import job_queue
+from app.services import mock_interviews, question_cache
+from app.services.llm_cache import cache_stats
+
+router = APIRouter()
+
+LLM_CACHE = metrics.Gauge("llm_cache", "LLM response cache statistics (see /health/cache).", ("stat",))
+QUESTION_CACHE = metrics.Gauge("question_cache", "Semantic interview-question cache statistics.", ("stat",))
+INTERVIEW_WRITER = metrics.Gauge("mock_interview_writer", "Write-behind buffer for mock interview results.", ("stat",))
+JOB_QUEUE_DEPTH = metrics.Gauge("job_queue_depth", "Background jobs waiting for a worker.",
+                                callback=job_queue.queue_depth)
+ADMISSION_QUEUE_DEPTH = metrics.Gauge("admission_queue_depth", "LLM-backed requests waiting for admission.",
+                                      callback=admission.queue_depth)
+
+
+@router.get("", response_class=PlainTextResponse, include_in_schema=False)
+def prometheus_metrics():
+    for stat, value in cache_stats().items():
+        LLM_CACHE.set(float(value), stat=stat)
+    for stat, value in question_cache.cache_stats().items():
+        QUESTION_CACHE.set(value, stat=stat)
+    for stat, value in mock_interviews.writer_stats().items():
+        INTERVIEW_WRITER.set(value, stat=stat)
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -1,12 +1,30 @@
-from fastapi import APIRouter, UploadFile, Depends
-from app.services.pdf_parser import extract_text_from_pdf
-from app.services.supabase_client import upsert_resume
+from fastapi import APIRouter, UploadFile, Depends, HTTPException
+from app.services.pdf_parser import extract_pdf_pages, checksum, PDFParseError
+from app.services.resume_text import preprocess
+from app.services.supabase_client import get_resume_meta, upsert_resume
 from app.api.deps import get_current_user
 
 router = APIRouter()
 
 @router.post("/upload")
 async def upload_resume(file: UploadFile, user=Depends(get_current_user)):
-    content = extract_text_from_pdf(await file.read())
-    resume_id = upsert_resume(user_id=user["id"], filename=file.filename, content=content)
-    return {"resume_id": resume_id, "message": "Resume uploaded"}
\ No newline at end of file
+    file_bytes = await file.read()
+    content_hash = checksum(file_bytes)
+    current = await get_resume_meta(user["id"])
+    if current and current.get("content_hash") == content_hash:
+        # Same PDF as the stored one: nothing to parse or write.
+        return {"resume_id": current["id"], "message": "Resume unchanged",
+                "revision": current.get("revision"), "unchanged": True}
+
+    try:
+        pages = await extract_pdf_pages(file_bytes)
+    except PDFParseError as e:
+        raise HTTPException(422, str(e))
+    # Normalize and section the text once here instead of on every prompt.
+    processed = preprocess(pages)
+    revision = ((current or {}).get("revision") or 0) + 1
+    resume_id = await upsert_resume(user_id=user["id"], filename=file.filename,
+                                    content=processed["text"], sections=processed["sections"],
+                                    content_hash=content_hash, revision=revision)
+    return {"resume_id": resume_id, "message": "Resume uploaded", "tokens": processed["tokens"],
+            "revision": revision, "unchanged": False}
@@ -1,25 +1,47 @@
+from typing import Optional, Tuple
+
 from fastapi import APIRouter, Depends
-from app.services.supabase_client import get_latest_resume_by_user
-from app.services.groq_service import chat_completion
-from app.prompts.loader import load_prompt
-from app.api.deps import get_current_user
+from fastapi.responses import JSONResponse
+from app.services.llm_cache import cached_chat_completion, cached_stream_chat_completion
+from app.prompts.messages import feedback_messages
+from app.api.deps import admitted_user
+from app.api.etag import resume_etag, with_etag
+from app.api.sse import sse_response
+from app.api.endpoints.jobs import enqueue
+from app.services import job_queue
 
 router = APIRouter()
 
+ROUTE = "resume_feedback"
+
+
+async def _run_job(params: dict) -> dict:
+    messages, version = feedback_messages(params["resume_text"])
+    return {"feedback": await cached_chat_completion(messages, prompt_version=version, route=ROUTE)}
+
+job_queue.register("resume_feedback", _run_job)
+
+
 @router.post("/feedback")
-async def get_resume_feedback(user=Depends(get_current_user)):
-    resume = get_latest_resume_by_user(user["id"])
+async def get_resume_feedback(
+    stream: bool = False,
+    background: bool = False,
+    tagged: Tuple[Optional[dict], Optional[str]] = Depends(resume_etag("resume_feedback.md")),
+    user=Depends(admitted_user()),
+):
+    resume, etag = tagged
 
     if not resume or not resume.get("content"):
         return {"error": "No resume content found. Please upload your resume first."}
 
-    template = load_prompt("resume_feedback.md")
-    prompt_text = template.replace("{{ resume_text }}", resume["content"])
+    messages, version = feedback_messages(resume["content"], resume.get("sections"))
+
+    if background:
+        return await enqueue(user["id"], "resume_feedback", {"resume_text": resume["content"]})
 
-    messages = [
-        {"role": "system", "content": "You are a resume expert who provides line-by-line critique and improvement suggestions."},
-        {"role": "user", "content": prompt_text}
-    ]
+    if stream:
+        # The stream can still end in an error event after the headers, so it carries no ETag.
+        return await sse_response(cached_stream_chat_completion(messages, prompt_version=version, route=ROUTE))
 
-    response = await chat_completion(messages)
-    return {"feedback": response}
+    response = await cached_chat_completion(messages, prompt_version=version, route=ROUTE)
+    return with_etag(JSONResponse({"feedback": response}), etag)
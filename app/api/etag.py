@@ -0,0 +1,56 @@
+# app/api/etag.py
+
+import hashlib
+from typing import Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request, Response
+from app.api.deps import get_current_user
+from app.prompts.loader import prompt_version
+from app.services.supabase_client import get_latest_resume_by_user
+
+
+def make_etag(revision: int, *parts: str) -> str:
+    digest = hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()[:16]
+    return f'"r{revision}-{digest}"'
+
+
+def _matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag in tags
+
+
+def check_etag(request: Request, resume: Optional[dict], *parts: str) -> Optional[str]:
+    """ETag for a result generated from this resume row and the given
+    prompt versions (plus any other inputs). Raises 304 when the client
+    already holds it; None for a missing resume or one uploaded before
+    revisions were recorded."""
+    if not resume or resume.get("revision") is None:
+        return None
+    etag = make_etag(resume["revision"], resume.get("content_hash") or "", *parts)
+    if _matches(request, etag):
+        raise HTTPException(status_code=304, headers={"ETag": etag})
+    return etag
+
+
+async def tagged_resume(request: Request, user_id: str, *parts: str) -> Tuple[Optional[dict], Optional[str]]:
+    """The user's resume and the ETag of a result generated from it."""
+    resume = await get_latest_resume_by_user(user_id)
+    return resume, check_etag(request, resume, *parts)
+
+
+def resume_etag(*prompt_files: str):
+    """Dependency for resume-based generations: (resume row, ETag). Declare
+    it before the admission dependency so a 304 costs one resume fetch,
+    which the handler reuses, but no admission token or Groq call."""
+    async def dependency(request: Request, user=Depends(get_current_user)) -> Tuple[Optional[dict], Optional[str]]:
+        return await tagged_resume(request, user["id"], *(prompt_version(name) for name in prompt_files))
+    return dependency
+
+
+def with_etag(response: Response, etag: Optional[str]) -> Response:
+    if etag:
+        response.headers["ETag"] = etag
+    return response
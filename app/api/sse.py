@@ -0,0 +1,53 @@
+# app/api/sse.py
+
+import json
+import logging
+from typing import AsyncIterator, Callable, Optional
+
+from fastapi.responses import StreamingResponse
+from app.services.groq_service import GroqServiceError
+
+logger = logging.getLogger(__name__)
+
+
+def sse_event(data: dict, event: str = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+async def sse_response(
+    tokens: AsyncIterator[str],
+    on_complete: Optional[Callable[[str], dict]] = None,
+) -> StreamingResponse:
+    """Wrap a token stream in a text/event-stream response.
+
+    The first token is awaited before the response starts so that an
+    upstream failure still surfaces as a normal error status. If given,
+    on_complete receives the full text and its result is sent as the
+    payload of the final "done" event.
+    """
+    try:
+        first = await tokens.__anext__()
+    except StopAsyncIteration:
+        first = None
+
+    async def body():
+        parts = []
+        if first is not None:
+            parts.append(first)
+            yield sse_event({"token": first})
+        try:
+            async for token in tokens:
+                parts.append(token)
+                yield sse_event({"token": token})
+        except GroqServiceError as e:
+            logger.warning("Stream failed after %d tokens: %s", len(parts), e)
+            yield sse_event({"detail": e.PUBLIC_MESSAGE}, event="error")
+            return
+        yield sse_event(on_complete("".join(parts)) if on_complete else {}, event="done")
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,235 @@
+# app/core/admission.py
+
+import os
+import time
+import heapq
+import asyncio
+import itertools
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from app.core.metrics import ADMISSION_REJECTED, ADMISSION_WAIT
+
+# Worker-wide budget for LLM-backed requests (requests per second and burst).
+ADMISSION_GLOBAL_RATE = float(os.getenv("ADMISSION_GLOBAL_RATE", "5"))
+ADMISSION_GLOBAL_BURST = float(os.getenv("ADMISSION_GLOBAL_BURST", "20"))
+# Per-user budget; a user over it is refused right away instead of queued.
+ADMISSION_USER_RATE = float(os.getenv("ADMISSION_USER_RATE", "0.2"))
+ADMISSION_USER_BURST = float(os.getenv("ADMISSION_USER_BURST", "10"))
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "50"))
+# Requests that would wait longer than this for the global budget get a 429.
+ADMISSION_MAX_WAIT = float(os.getenv("ADMISSION_MAX_WAIT", "10"))
+ADMISSION_MAX_USERS = int(os.getenv("ADMISSION_MAX_USERS", "10000"))
+
+# Lower runs first: someone waiting on a critique beats a batch of recommendations.
+INTERACTIVE = 0
+BULK = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BULK: "bulk"}
+
+
+class AdmissionRejected(Exception):
+    """The request was shed; retry_after is a hint in seconds."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"Request rejected ({reason}); retry after {retry_after:.1f}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self, cost: float = 1, now: Optional[float] = None) -> bool:
+        self._refill(time.monotonic() if now is None else now)
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return True
+        return False
+
+    def give_back(self, cost: float = 1) -> None:
+        self.tokens = min(self.burst, self.tokens + cost)
+
+    def wait_time(self, cost: float = 1, now: Optional[float] = None) -> float:
+        """Seconds until `cost` tokens are available (0 if they are now)."""
+        self._refill(time.monotonic() if now is None else now)
+        missing = cost - self.tokens
+        return max(0.0, missing / self.rate) if self.rate > 0 else float("inf")
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "cost", "future")
+
+    def __init__(self, priority: int, seq: int, cost: float, future: asyncio.Future):
+        self.priority = priority
+        self.seq = seq
+        self.cost = cost
+        self.future = future
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class AdmissionController:
+    """Per-user and global token buckets in front of the LLM calls.
+
+    A user over their own budget is refused immediately. Otherwise the
+    request takes a global token, or waits for one in a bounded priority
+    queue; when the queue is full or the expected wait exceeds max_wait
+    the request is refused with a Retry-After hint.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = ADMISSION_GLOBAL_RATE,
+        global_burst: float = ADMISSION_GLOBAL_BURST,
+        user_rate: float = ADMISSION_USER_RATE,
+        user_burst: float = ADMISSION_USER_BURST,
+        queue_size: int = ADMISSION_QUEUE_SIZE,
+        max_wait: float = ADMISSION_MAX_WAIT,
+        max_users: int = ADMISSION_MAX_USERS,
+    ):
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self.max_users = max_users
+        self._global = TokenBucket(global_rate, global_burst)
+        self._users: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._queue: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stats = {"admitted": 0, "queued": 0, "rejected": 0}
+
+    def _user_bucket(self, user_id: str) -> TokenBucket:
+        bucket = self._users.get(user_id)
+        if bucket is None:
+            bucket = self._users[user_id] = TokenBucket(self.user_rate, self.user_burst)
+            # Buckets of idle users have refilled anyway; forget the oldest.
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        else:
+            self._users.move_to_end(user_id)
+        return bucket
+
+    def _cost_ahead(self, priority: int) -> float:
+        return sum(w.cost for w in self._queue if w.priority <= priority and not w.future.done())
+
+    def _reject(self, reason: str, retry_after: float, user: TokenBucket, cost: float) -> AdmissionRejected:
+        user.give_back(cost)
+        self._stats["rejected"] += 1
+        ADMISSION_REJECTED.inc(reason=reason)
+        return AdmissionRejected(reason, max(1.0, retry_after))
+
+    async def acquire(self, user_id: str, priority: int = BULK, cost: float = 1) -> float:
+        """Wait until the request may run; returns the time spent queued."""
+        user = self._user_bucket(user_id)
+        if not user.try_take(cost):
+            self._stats["rejected"] += 1
+            ADMISSION_REJECTED.inc(reason="user_rate")
+            raise AdmissionRejected("user_rate", max(1.0, user.wait_time(cost)))
+
+        name = PRIORITY_NAMES.get(priority, str(priority))
+        if not self._queue and self._global.try_take(cost):
+            self._stats["admitted"] += 1
+            ADMISSION_WAIT.observe(0.0, priority=name)
+            return 0.0
+
+        drain = self._global.wait_time(self._cost_ahead(priority) + cost)
+        if len(self._queue) >= self.queue_size:
+            raise self._reject("queue_full", drain, user, cost)
+        if drain > self.max_wait:
+            # Shed now rather than hold a request that will time out anyway.
+            raise self._reject("wait_exceeded", drain, user, cost)
+
+        start = time.monotonic()
+        waiter = _Waiter(priority, next(self._seq), cost, asyncio.get_running_loop().create_future())
+        heapq.heappush(self._queue, waiter)
+        self._stats["queued"] += 1
+        self._dispatch()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), self.max_wait)
+        except asyncio.TimeoutError:
+            # Admitted in the same tick as the timeout: let it through.
+            if self._remove(waiter):
+                raise self._reject("timeout", self._global.wait_time(self._cost_ahead(priority)), user, cost)
+        except asyncio.CancelledError:
+            # Client went away while queued; admitted or not, free the place.
+            if not self._remove(waiter):
+                self._global.give_back(cost)
+            user.give_back(cost)
+            raise
+        waited = time.monotonic() - start
+        self._stats["admitted"] += 1
+        ADMISSION_WAIT.observe(waited, priority=name)
+        return waited
+
+    def _remove(self, waiter: _Waiter) -> bool:
+        """Drop a waiter that gave up; False if it had already been admitted."""
+        if waiter.future.done():
+            return False
+        waiter.future.cancel()
+        self._queue.remove(waiter)
+        heapq.heapify(self._queue)
+        self._dispatch()
+        return True
+
+    def _dispatch(self) -> None:
+        """Admit queued requests in priority order while global tokens last."""
+        while self._queue:
+            head = self._queue[0]
+            if head.future.done():
+                heapq.heappop(self._queue)
+                continue
+            if not self._global.try_take(head.cost):
+                self._schedule(self._global.wait_time(head.cost))
+                return
+            heapq.heappop(self._queue)
+            head.future.set_result(None)
+
+    def _schedule(self, delay: float) -> None:
+        loop = asyncio.get_running_loop()
+        # A timer left on another (closed) loop, e.g. between test clients, never fires.
+        if self._timer is not None and self._timer_loop is loop:
+            return
+        self._timer_loop = loop
+        self._timer = loop.call_later(delay, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def stats(self) -> Dict:
+        return {**self._stats, "queued_now": len(self._queue), "users": len(self._users),
+                "global_tokens": round(self._global.tokens, 2)}
+
+    def clear(self) -> None:
+        for waiter in self._queue:
+            waiter.future.cancel()
+        self._queue.clear()
+        self._users.clear()
+        self._global.tokens = self._global.burst
+        for key in self._stats:
+            self._stats[key] = 0
+
+
+controller = AdmissionController()
+
+
+def queue_depth() -> int:
+    return controller.queue_depth()
+
+
+def admission_stats() -> Dict:
+    return controller.stats()
@@ -1,10 +1,64 @@
-from fastapi import FastAPI
-from app.api.endpoints import health ,career, resume , resume_feedback, interview
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from app.api.endpoints import health ,career, resume , resume_feedback, interview, analysis, jobs, metrics as metrics_endpoint
+from app.core import metrics
+from app.prompts.loader import registry as prompt_registry
+from app.services import auth, groq_service, job_queue, mock_interviews, llm_cache, embeddings, db_client, vector_search, supabase_client, pdf_parser
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    metrics.start_loop_monitor()
+    prompt_registry.load_all()
+    await groq_service.init_client()
+    await supabase_client.init_client()
+    await auth.start()
+    llm_cache.open_disk_cache()
+    await db_client.init_pool()
+    if vector_search.VECTOR_BACKEND == "local":
+        await vector_search.load_local_index()
+        vector_search.start_refresh()
+    await job_queue.start()
+    await mock_interviews.start()
+    if embeddings.EMBEDDING_WARMUP:
+        # Under gunicorn with preload_app the model is already loaded in the
+        # master (see gunicorn.conf.py); this only runs the first encode.
+        await asyncio.to_thread(embeddings.warm_up)
+    app.state.ready = True
+    try:
+        yield
+    finally:
+        app.state.ready = False
+        await job_queue.stop()
+        await mock_interviews.stop()
+        await groq_service.close_client()
+        await supabase_client.close_client()
+        await auth.stop()
+        llm_cache.close_disk_cache()
+        await vector_search.stop_refresh()
+        await db_client.close_pool()
+        pdf_parser.shutdown_pool()
+        await metrics.stop_loop_monitor()
+
+
+app = FastAPI(title="Generative AI Job Advisor", lifespan=lifespan)
+app.add_middleware(metrics.MetricsMiddleware)
+
+
+@app.exception_handler(groq_service.GroqServiceError)
+async def groq_error_handler(request: Request, exc: groq_service.GroqServiceError):
+    status = 503 if exc.status_code == 429 else 502
+    return JSONResponse(status_code=status, content={"detail": exc.PUBLIC_MESSAGE})
 
-app = FastAPI(title="Generative AI Job Advisor")
 
 app.include_router(health.router, tags=["Health"], prefix="/health")
+app.include_router(metrics_endpoint.router, tags=["Health"], prefix="/metrics")
 app.include_router(resume.router, tags=["Resume"], prefix="/resume")
 app.include_router(career.router, tags=["Career"], prefix="/career")
 app.include_router(resume_feedback.router, tags=["Resume_Feedback"], prefix="/resume_feedback")
 app.include_router(interview.router, tags=["Interview"], prefix="/interview")
+app.include_router(analysis.router, tags=["Analysis"], prefix="/analysis")
+app.include_router(jobs.router, tags=["Jobs"], prefix="/jobs")
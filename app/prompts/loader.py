@@ -1,10 +1,94 @@
 # app/prompts/loader.py
 
 import os
+import glob
+import hashlib
+import threading
+from typing import Dict, FrozenSet
+
+from jinja2 import Environment, StrictUndefined, meta
+
+PROMPT_DIR = os.path.dirname(__file__)
+# Dev only: re-check template mtimes on every lookup.
+PROMPT_HOT_RELOAD = os.getenv("PROMPT_HOT_RELOAD", "false").lower() in ("1", "true", "yes")
+
+_env = Environment(undefined=StrictUndefined, autoescape=False, keep_trailing_newline=True)
+
+
+class PromptVariableError(ValueError):
+    """A template was rendered without all of its declared variables."""
+
+
+class PromptTemplate:
+    def __init__(self, name: str, source: str, mtime: float):
+        self.name = name
+        self.source = source
+        self.mtime = mtime
+        self.version = hashlib.sha256(source.encode("utf-8")).hexdigest()[:12]
+        self.variables: FrozenSet[str] = frozenset(meta.find_undeclared_variables(_env.parse(source)))
+        self._template = _env.from_string(source)
+
+    def render(self, **values) -> str:
+        missing = self.variables - values.keys()
+        if missing:
+            raise PromptVariableError(f"{self.name} is missing variables: {', '.join(sorted(missing))}")
+        return self._template.render(**values)
+
+
+class PromptRegistry:
+    """All prompt templates, read and compiled once instead of per request."""
+
+    def __init__(self, directory: str = PROMPT_DIR, hot_reload: bool = PROMPT_HOT_RELOAD):
+        self.directory = directory
+        self.hot_reload = hot_reload
+        self._templates: Dict[str, PromptTemplate] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _compile(self, name: str) -> PromptTemplate:
+        path = os.path.join(self.directory, name)
+        mtime = os.stat(path).st_mtime
+        with open(path, "r", encoding="utf-8") as f:
+            template = PromptTemplate(name, f.read(), mtime)
+        self._templates[name] = template
+        return template
+
+    def load_all(self) -> None:
+        with self._lock:
+            for path in sorted(glob.glob(os.path.join(self.directory, "*.md"))):
+                self._compile(os.path.basename(path))
+            self._loaded = True
+
+    def get(self, name: str) -> PromptTemplate:
+        if not self._loaded:
+            self.load_all()
+        template = self._templates.get(name)
+        if template is None:
+            raise KeyError(f"Unknown prompt template: {name}")
+        if self.hot_reload and os.stat(os.path.join(self.directory, name)).st_mtime != template.mtime:
+            with self._lock:
+                template = self._compile(name)
+        return template
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def names(self):
+        if not self._loaded:
+            self.load_all()
+        return sorted(self._templates)
+
+
+registry = PromptRegistry()
+
 
 def load_prompt(filename: str) -> str:
-    base_path = os.path.dirname(__file__)
-    path = os.path.join(base_path, filename)
-    with open(path, "r", encoding="utf-8") as f:
-        return f.read()
+    return registry.get(filename).source
+
+def prompt_version(filename: str) -> str:
+    """Short content hash of a template, used to version cache keys."""
+    return registry.get(filename).version
 
+def render_prompt(filename: str, **values) -> str:
+    return registry.get(filename).render(**values)
@@ -0,0 +1,72 @@
+# app/prompts/messages.py
+
+import os
+from typing import Dict, List, Optional, Tuple
+from app.prompts.loader import render_prompt, prompt_version
+from app.services.resume_text import fit_to_budget, split_sections
+from app.services.rag import format_postings
+
+# Input-token budgets for the resume part of each prompt. llama3-70b-8192
+# has an 8192-token context shared by the template, resume and the answer.
+CAREER_RESUME_BUDGET = int(os.getenv("CAREER_RESUME_BUDGET", "3000"))
+FEEDBACK_RESUME_BUDGET = int(os.getenv("FEEDBACK_RESUME_BUDGET", "4500"))
+QUESTION_BACKGROUND_BUDGET = int(os.getenv("QUESTION_BACKGROUND_BUDGET", "400"))
+
+# Section kinds each prompt keeps first when the resume is over budget.
+CAREER_PRIORITY = ("summary", "experience", "skills", "projects", "certifications", "education", "achievements")
+FEEDBACK_PRIORITY = ("experience", "summary", "skills", "projects", "education", "header", "certifications")
+
+# Each builder returns the chat messages plus the template version used for
+# cache keys, so endpoints that share a prompt also share cache entries.
+
+
+def _fit_resume(resume_text: str, sections: Optional[List[Dict]], budget: int, priority) -> str:
+    return fit_to_budget(sections or split_sections(resume_text), budget, priority)
+
+
+def career_messages(resume_text: str, sections: Optional[List[Dict]] = None) -> Tuple[List[Dict], str]:
+    resume_text = _fit_resume(resume_text, sections, CAREER_RESUME_BUDGET, CAREER_PRIORITY)
+    messages = [
+        {"role": "system", "content": "You are an expert career strategist with up‑to‑the‑minute knowledge of labor‑market trends, compensation data, and emerging skills demands."},
+        {"role": "user", "content": render_prompt("career_recommendation.md", resume_text=resume_text)}
+    ]
+    return messages, prompt_version("career_recommendation.md")
+
+def feedback_messages(resume_text: str, sections: Optional[List[Dict]] = None) -> Tuple[List[Dict], str]:
+    resume_text = _fit_resume(resume_text, sections, FEEDBACK_RESUME_BUDGET, FEEDBACK_PRIORITY)
+    messages = [
+        {"role": "system", "content": "You are a resume expert who provides line-by-line critique and improvement suggestions."},
+        {"role": "user", "content": render_prompt("resume_feedback.md", resume_text=resume_text)}
+    ]
+    return messages, prompt_version("resume_feedback.md")
+
+def question_messages(job_title: str) -> Tuple[List[Dict], str]:
+    messages = [
+        {"role": "system", "content": "You are a technical interviewer for top tech firms."},
+        {"role": "user", "content": render_prompt("mock_question.md", job_title=job_title.strip())},
+    ]
+    return messages, prompt_version("mock_question.md")
+
+def rag_question_messages(job_title: str, postings: List[Dict], resume_sections: Optional[List[Dict]] = None) -> Tuple[List[Dict], str]:
+    """Question grounded in similar job postings and, when available, the
+    candidate's summary and skills. Falls back to the plain prompt."""
+    if not postings:
+        return question_messages(job_title)
+    background = ""
+    if resume_sections:
+        relevant = [s for s in resume_sections if s["kind"] in ("summary", "skills")]
+        background = fit_to_budget(relevant, QUESTION_BACKGROUND_BUDGET, ("skills", "summary"))
+    job_description = f"Role: {job_title.strip()}\n\nSimilar postings:\n\n{format_postings(postings)}"
+    messages = [
+        {"role": "system", "content": "You are a technical interviewer for top tech firms."},
+        {"role": "user", "content": render_prompt("rag_enhanced_question.md", job_description=job_description,
+                                                  candidate_background=background)},
+    ]
+    return messages, prompt_version("rag_enhanced_question.md")
+
+def critique_messages(question: str, answer: str) -> Tuple[List[Dict], str]:
+    messages = [
+        {"role": "system", "content": "You are a hiring manager"},
+        {"role": "user", "content": render_prompt("mock_critique.md", question=question, answer=answer)},
+    ]
+    return messages, prompt_version("mock_critique.md")
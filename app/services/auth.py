@@ -0,0 +1,187 @@
+# app/services/auth.py
+
+import os
+import time
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import httpx
+import jwt
+
+from app.services import supabase_client
+
+SUPABASE_JWT_AUDIENCE = os.getenv("SUPABASE_JWT_AUDIENCE", "authenticated")
+SUPABASE_JWKS_URL = os.getenv("SUPABASE_JWKS_URL") or f"{supabase_client.url}/auth/v1/.well-known/jwks.json"
+AUTH_JWKS_REFRESH = float(os.getenv("AUTH_JWKS_REFRESH", "600"))
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "300"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+AUTH_LEEWAY = float(os.getenv("AUTH_LEEWAY", "10"))
+
+logger = logging.getLogger(__name__)
+
+# Example values that must never be trusted as a signing secret.
+PLACEHOLDER_JWT_SECRETS = {"your-supabase-jwt-secret", "your-jwt-secret", "changeme", "secret"}
+
+
+def _jwt_secret(value: Optional[str]) -> Optional[str]:
+    """The configured HS256 secret, or None when unset or a placeholder
+    (anyone could sign tokens with a publicly known secret)."""
+    value = (value or "").strip()
+    if value.lower() in PLACEHOLDER_JWT_SECRETS:
+        logger.error("SUPABASE_JWT_SECRET is a placeholder; local HS256 verification is disabled")
+        return None
+    return value or None
+
+
+SUPABASE_JWT_SECRET = _jwt_secret(os.getenv("SUPABASE_JWT_SECRET"))
+
+_jwks: Dict[str, jwt.PyJWK] = {}
+_refresh_task: Optional[asyncio.Task] = None
+# sha256(token) -> (expires_at, user); never outlives the token's own exp.
+_token_cache: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+
+
+class _NoVerificationKey(Exception):
+    """The token cannot be checked locally; fall back to Supabase Auth."""
+
+
+async def refresh_jwks() -> None:
+    global _jwks
+    async with httpx.AsyncClient(timeout=5) as client:
+        resp = await client.get(SUPABASE_JWKS_URL, headers={"apikey": supabase_client.key or ""})
+    resp.raise_for_status()
+    keys = {}
+    for data in resp.json().get("keys", []):
+        try:
+            key = jwt.PyJWK.from_dict(data)
+        except jwt.PyJWTError:
+            continue
+        if key.key_id:
+            keys[key.key_id] = key
+    _jwks = keys
+
+
+async def _refresh_forever() -> None:
+    while True:
+        await asyncio.sleep(AUTH_JWKS_REFRESH)
+        try:
+            await refresh_jwks()
+        except Exception as e:
+            logger.warning("JWKS refresh failed: %r", e)
+
+
+async def start() -> None:
+    """Load signing keys and keep them fresh in the background."""
+    global _refresh_task
+    if SUPABASE_JWT_SECRET or _refresh_task is not None:
+        return
+    try:
+        await refresh_jwks()
+    except Exception as e:
+        logger.warning("Initial JWKS fetch failed, using remote auth until it succeeds: %r", e)
+    _refresh_task = asyncio.create_task(_refresh_forever())
+
+
+async def stop() -> None:
+    global _refresh_task
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        try:
+            await _refresh_task
+        except asyncio.CancelledError:
+            pass
+    _refresh_task = None
+
+
+def _claims_to_user(claims: dict) -> dict:
+    return {
+        "id": claims["sub"],
+        "aud": claims.get("aud"),
+        "role": claims.get("role"),
+        "email": claims.get("email"),
+        "phone": claims.get("phone"),
+        "app_metadata": claims.get("app_metadata", {}),
+        "user_metadata": claims.get("user_metadata", {}),
+        "exp": claims.get("exp"),
+    }
+
+
+def verify_locally(token: str) -> Optional[dict]:
+    """Check signature, exp and aud without a network call.
+
+    Returns the user for a valid token, None for an invalid one, and raises
+    _NoVerificationKey when no matching key is available.
+    """
+    try:
+        header = jwt.get_unverified_header(token)
+    except jwt.PyJWTError:
+        return None
+
+    alg = header.get("alg")
+    if alg == "HS256" and SUPABASE_JWT_SECRET:
+        key = SUPABASE_JWT_SECRET
+    elif header.get("kid") in _jwks:
+        key = _jwks[header["kid"]]
+    else:
+        raise _NoVerificationKey()
+
+    try:
+        claims = jwt.decode(
+            token,
+            key,
+            algorithms=[alg],
+            audience=SUPABASE_JWT_AUDIENCE,
+            leeway=AUTH_LEEWAY,
+            options={"require": ["exp", "sub"]},
+        )
+    except jwt.PyJWTError:
+        return None
+    return _claims_to_user(claims)
+
+
+def _cache_get(cache_key: str) -> Optional[dict]:
+    item = _token_cache.get(cache_key)
+    if item is None:
+        return None
+    expires_at, user = item
+    if expires_at <= time.time():
+        _token_cache.pop(cache_key, None)
+        return None
+    _token_cache.move_to_end(cache_key)
+    return user
+
+
+def _cache_set(cache_key: str, token: str, user: dict) -> None:
+    expires_at = time.time() + AUTH_CACHE_TTL
+    try:
+        exp = jwt.decode(token, options={"verify_signature": False}).get("exp")
+    except jwt.PyJWTError:
+        exp = None
+    if exp is None:
+        return
+    expires_at = min(expires_at, float(exp))
+    if expires_at <= time.time():
+        return
+    _token_cache[cache_key] = (expires_at, user)
+    _token_cache.move_to_end(cache_key)
+    while len(_token_cache) > AUTH_CACHE_MAX_ENTRIES:
+        _token_cache.popitem(last=False)
+
+
+async def verify_token(token: str) -> Optional[dict]:
+    try:
+        return verify_locally(token)
+    except _NoVerificationKey:
+        pass
+
+    cache_key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    user = _cache_get(cache_key)
+    if user is not None:
+        return user
+    user = await supabase_client.get_user_from_token(token)
+    if user:
+        _cache_set(cache_key, token, user)
+    return user
@@ -0,0 +1,63 @@
+# app/services/db_client.py
+
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import asyncpg
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+DB_COMMAND_TIMEOUT = float(os.getenv("DB_COMMAND_TIMEOUT", "30"))
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional["asyncpg.Pool"] = None
+
+
+async def init_pool(dsn: Optional[str] = DATABASE_URL, **kwargs) -> None:
+    """Create the shared pool. Called once from the app lifespan; a no-op
+    when no DATABASE_URL is configured. Postgres only backs best-effort
+    features (job retrieval), so a failure is logged and the pool left
+    unset rather than stopping the app; /health/ready reports it."""
+    global _pool
+    if dsn and _pool is None:
+        import asyncpg
+
+        try:
+            _pool = await asyncpg.create_pool(
+                dsn,
+                min_size=DB_POOL_MIN_SIZE,
+                max_size=DB_POOL_MAX_SIZE,
+                command_timeout=DB_COMMAND_TIMEOUT,
+                **kwargs,
+            )
+        except Exception as e:
+            logger.error("Could not connect to Postgres (%r); job retrieval is disabled", e)
+
+
+async def close_pool() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+    _pool = None
+
+
+def is_configured() -> bool:
+    return _pool is not None
+
+
+def get_pool() -> "asyncpg.Pool":
+    if _pool is None:
+        raise RuntimeError("Postgres pool is not initialised; set DATABASE_URL.")
+    return _pool
+
+
+@asynccontextmanager
+async def get_pg_connection():
+    """Borrow a connection from the pool for the duration of the block."""
+    async with get_pool().acquire() as conn:
+        yield conn
@@ -1,5 +1,173 @@
-from sentence_transformers import SentenceTransformer
-model = SentenceTransformer("all-MiniLM-L6-v2")
+# app/services/embeddings.py
 
-def embed_text(text: str) -> list[float]:
-    return model.encode([text])[0].tolist()
+import os
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.metrics import span
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+EMBEDDING_DIM = 384
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+EMBEDDING_BATCH_WINDOW_MS = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "5"))
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "4096"))
+EMBEDDING_WARMUP = os.getenv("EMBEDDING_WARMUP", "false").lower() in ("1", "true", "yes")
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_model():
+    """Load the SentenceTransformer on first use instead of at import time."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                from sentence_transformers import SentenceTransformer
+                _model = SentenceTransformer(EMBEDDING_MODEL)
+    return _model
+
+
+def model_loaded() -> bool:
+    return _model is not None
+
+
+def warm_up() -> None:
+    """Load the model and run one encode so the first request pays nothing."""
+    embed_many(["warm up"], use_cache=False)
+
+
+class _VectorCache:
+    """Thread-safe LRU of text hash -> read-only float32 vector."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vec = self._data.get(key)
+            if vec is not None:
+                self._data.move_to_end(key)
+            return vec
+
+    def set(self, key: str, vec: np.ndarray) -> None:
+        vec.setflags(write=False)
+        with self._lock:
+            self._data[key] = vec
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_cache = _VectorCache(EMBEDDING_CACHE_SIZE)
+
+
+def _text_key(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def embed_many(texts: Sequence[str], use_cache: bool = True) -> np.ndarray:
+    """Encode texts in one batch. Returns a (len(texts), dim) float32 array."""
+    out = np.empty((len(texts), EMBEDDING_DIM), dtype=np.float32)
+    missing: List[Tuple[int, str, str]] = []
+    for i, text in enumerate(texts):
+        key = _text_key(text)
+        vec = _cache.get(key) if use_cache else None
+        if vec is None:
+            missing.append((i, key, text))
+        else:
+            out[i] = vec
+
+    if missing:
+        with span("embedding"):
+            encoded = get_model().encode(
+                [text for _, _, text in missing],
+                batch_size=EMBEDDING_BATCH_SIZE,
+                convert_to_numpy=True,
+                show_progress_bar=False,
+            ).astype(np.float32, copy=False)
+        for (i, key, _), vec in zip(missing, encoded):
+            out[i] = vec
+            if use_cache:
+                _cache.set(key, vec.copy())
+    return out
+
+
+def embed_text(text: str) -> np.ndarray:
+    return embed_many([text])[0]
+
+
+class _MicroBatcher:
+    """Coalesces concurrent single-text requests into one encode call that
+    runs on a worker thread, so the event loop is never blocked."""
+
+    def __init__(self, max_batch: int, window: float):
+        self.max_batch = max_batch
+        self.window = window
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def submit(self, text: str) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        try:
+            vectors = await asyncio.to_thread(embed_many, [text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), vec in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vec)
+
+
+_batchers: "dict[asyncio.AbstractEventLoop, _MicroBatcher]" = {}
+
+
+def _batcher() -> _MicroBatcher:
+    loop = asyncio.get_running_loop()
+    batcher = _batchers.get(loop)
+    if batcher is None:
+        _batchers.clear()
+        batcher = _batchers[loop] = _MicroBatcher(EMBEDDING_BATCH_SIZE, EMBEDDING_BATCH_WINDOW_MS / 1000)
+    return batcher
+
+
+async def aembed_text(text: str) -> np.ndarray:
+    """Async single-text embedding, micro-batched with concurrent callers."""
+    vec = _cache.get(_text_key(text))
+    if vec is not None:
+        return vec
+    return await _batcher().submit(text)
+
+
+async def aembed_many(texts: Sequence[str]) -> np.ndarray:
+    return await asyncio.to_thread(embed_many, texts)
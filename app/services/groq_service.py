@@ -1,40 +1,551 @@
 # app/services/groq_service.py
 
 import os
+import json
+import random
+import logging
+import time
+import asyncio
 import httpx
-from typing import List, Dict
+from collections import deque
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import List, Dict, Optional, AsyncIterator, Deque, Tuple
 from dotenv import load_dotenv
 
+from app.core.metrics import LLM_ROUTE_DECISIONS, LLM_ROUTE_LATENCY, record_usage, span
+
 # Load environment variables
 load_dotenv()
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
+GROQ_API_URL = os.getenv("GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions")
 DEFAULT_MODEL = "llama3-70b-8192"
 
-if not GROQ_API_KEY:
-    raise EnvironmentError("Missing GROQ_API_KEY in environment variables.")
+# Connection / resilience tuning
+GROQ_MAX_CONCURRENCY = int(os.getenv("GROQ_MAX_CONCURRENCY", "8"))
+GROQ_TIMEOUT = float(os.getenv("GROQ_TIMEOUT", "30"))
+GROQ_CONNECT_TIMEOUT = float(os.getenv("GROQ_CONNECT_TIMEOUT", "5"))
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "3"))
+GROQ_BACKOFF_BASE = float(os.getenv("GROQ_BACKOFF_BASE", "0.5"))
+GROQ_BACKOFF_MAX = float(os.getenv("GROQ_BACKOFF_MAX", "8"))
+# A Retry-After longer than this is not waited out inside a request; the
+# error (with its retry_after) goes to the caller instead.
+GROQ_RETRY_AFTER_MAX = float(os.getenv("GROQ_RETRY_AFTER_MAX", "30"))
 
-HEADERS = {
-    "Authorization": f"Bearer {GROQ_API_KEY}",
-    "Content-Type": "application/json"
-}
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+# Model routing (see ROUTES below)
+GROQ_FALLBACK_MODEL = os.getenv("GROQ_FALLBACK_MODEL", "llama3-8b-8192")
+# JSON overrides for the routing table, e.g. {"critique": {"model": "llama3-8b-8192", "slo": 5}}
+GROQ_ROUTES = os.getenv("GROQ_ROUTES")
+# Send a duplicate request when a hedge-enabled route has not answered by its p95.
+GROQ_HEDGE = os.getenv("GROQ_HEDGE", "false").lower() in ("1", "true", "yes")
+GROQ_HEDGE_MIN_DELAY = float(os.getenv("GROQ_HEDGE_MIN_DELAY", "0.25"))
+# How long a model that answered 429 is skipped when no Retry-After was sent.
+GROQ_ROUTE_COOLDOWN = float(os.getenv("GROQ_ROUTE_COOLDOWN", "10"))
+GROQ_ROUTE_WINDOW = int(os.getenv("GROQ_ROUTE_WINDOW", "200"))
+GROQ_ROUTE_MIN_SAMPLES = int(os.getenv("GROQ_ROUTE_MIN_SAMPLES", "20"))
+
+logger = logging.getLogger(__name__)
+
+
+class GroqServiceError(Exception):
+    """Raised when a Groq completion fails after all retries. The message
+    can carry Groq's status and response body: log it, but show clients
+    PUBLIC_MESSAGE."""
+
+    PUBLIC_MESSAGE = "AI service is temporarily unavailable. Please try again."
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def is_configured() -> bool:
+    return bool(GROQ_API_KEY)
+
+
+def _headers() -> Dict[str, str]:
+    # Checked per client rather than at import so the app can start (and
+    # report not-ready) without credentials.
+    if not GROQ_API_KEY:
+        raise GroqServiceError("Missing GROQ_API_KEY in environment variables.")
+    return {
+        "Authorization": f"Bearer {GROQ_API_KEY}",
+        "Content-Type": "application/json"
+    }
+
+
+_client: Optional[httpx.AsyncClient] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(GROQ_TIMEOUT, connect=GROQ_CONNECT_TIMEOUT)
+
+
+def _new_client(**kwargs) -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=GROQ_MAX_CONCURRENCY,
+        max_keepalive_connections=GROQ_MAX_CONCURRENCY,
+        keepalive_expiry=60,
+    )
+    return httpx.AsyncClient(http2=True, headers=_headers(), timeout=_timeout(), limits=limits, **kwargs)
+
+
+async def init_client(**kwargs) -> None:
+    """Create the shared client. Called once from the app lifespan."""
+    global _client, _semaphore
+    if not is_configured():
+        logger.warning("GROQ_API_KEY is not set; completions will fail until it is configured")
+        return
+    if _client is None:
+        _client = _new_client(**kwargs)
+        _semaphore = asyncio.Semaphore(GROQ_MAX_CONCURRENCY)
+
+
+async def close_client() -> None:
+    global _client, _semaphore
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _semaphore = None
+
+
+def _retry_after(response: Optional[httpx.Response]) -> Optional[float]:
+    """Retry-After in seconds; servers send either delta-seconds or an HTTP-date."""
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
 
-async def chat_completion(messages: List[Dict], model: str = DEFAULT_MODEL, temperature: float = 0.5) -> str:
+
+def _retry_delay(attempt: int, response: Optional[httpx.Response] = None) -> Optional[float]:
+    """Seconds to wait before the next attempt, or None when the server
+    asked for a longer pause than is worth holding a request for."""
+    retry_after = _retry_after(response)
+    if retry_after is not None:
+        # Retrying sooner than the server asked only earns another 429.
+        return retry_after if retry_after <= GROQ_RETRY_AFTER_MAX else None
+    # Full jitter: uniform(0, base * 2^attempt), capped.
+    return random.uniform(0, min(GROQ_BACKOFF_MAX, GROQ_BACKOFF_BASE * (2 ** attempt)))
+
+
+async def _backoff(attempt: int, response: Optional[httpx.Response], error: GroqServiceError, what: str) -> None:
+    """Sleep before a retry (never while holding a client slot), or raise
+    the error when the server's Retry-After is too long to wait out."""
+    delay = _retry_delay(attempt, response)
+    if delay is None:
+        raise error
+    logger.warning("Groq %s attempt %d failed (%s); retrying in %.2fs", what, attempt + 1, error, delay)
+    await asyncio.sleep(delay)
+
+
+async def _post_with_retries(
+    payload: Dict,
+    timeout: Optional[float] = None,
+    max_retries: int = GROQ_MAX_RETRIES,
+) -> httpx.Response:
+    last_error: Optional[GroqServiceError] = None
+    for attempt in range(max_retries + 1):
+        response = None
+        try:
+            # One slot per attempt, so backoff sleeps do not hold back other calls.
+            async with _client_slot() as client:
+                response = await client.post(
+                    GROQ_API_URL, json=payload,
+                    timeout=_request_timeout(timeout),
+                )
+            if response.status_code < 400:
+                return response
+            last_error = GroqServiceError(
+                f"Groq API call failed: {response.status_code} {response.text}",
+                status_code=response.status_code,
+                retry_after=_retry_after(response),
+            )
+            if response.status_code not in RETRYABLE_STATUS:
+                raise last_error
+        except httpx.TransportError as e:
+            last_error = GroqServiceError(f"Groq API call failed: {e!r}")
+
+        if attempt < max_retries:
+            await _backoff(attempt, response, last_error, "request")
+
+    raise last_error
+
+
+@asynccontextmanager
+async def _client_slot():
+    if _client is None:
+        # Outside the app lifespan (scripts, tests): use a short-lived client.
+        async with _new_client() as client:
+            yield client
+    else:
+        async with _semaphore:
+            yield _client
+
+
+def _request_timeout(timeout: Optional[float]):
+    return httpx.Timeout(timeout, connect=GROQ_CONNECT_TIMEOUT) if timeout else httpx.USE_CLIENT_DEFAULT
+
+
+def _payload(messages: List[Dict], model: str, temperature: float, max_tokens: Optional[int]) -> Dict:
     payload = {
         "model": model,
         "messages": messages,
         "temperature": temperature
     }
+    if max_tokens:
+        payload["max_tokens"] = max_tokens
+    return payload
+
+
+async def _complete(payload: Dict, timeout: Optional[float] = None, max_retries: int = GROQ_MAX_RETRIES) -> str:
+    with span("llm"):
+        response = await _post_with_retries(payload, timeout, max_retries)
+
+    try:
+        body = response.json()
+        record_usage(payload["model"], body.get("usage"))
+        return body["choices"][0]["message"]["content"]
+    except (ValueError, KeyError, IndexError) as e:
+        raise GroqServiceError(f"Unexpected Groq response: {e!r}", status_code=response.status_code)
+
+
+async def chat_completion(
+    messages: List[Dict],
+    model: str = DEFAULT_MODEL,
+    temperature: float = 0.5,
+    timeout: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+) -> str:
+    return await _complete(_payload(messages, model, temperature, max_tokens), timeout)
+
+
+def _parse_sse_chunk(line: str) -> Optional[Dict]:
+    """Return the JSON chunk carried by one SSE line, or None."""
+    if not line.startswith("data:"):
+        return None
+    data = line[len("data:"):].strip()
+    if not data or data == "[DONE]":
+        return None
+    try:
+        return json.loads(data)
+    except ValueError:
+        return None
+
+
+def _chunk_content(chunk: Dict) -> Optional[str]:
+    try:
+        return chunk["choices"][0].get("delta", {}).get("content")
+    except (KeyError, IndexError, AttributeError):
+        return None
+
+
+def _stream_usage(chunk: Dict) -> Optional[Dict]:
+    # Groq reports usage on the final chunk under x_groq; OpenAI-style servers at the top level.
+    return (chunk.get("x_groq") or {}).get("usage") or chunk.get("usage")
 
-    async with httpx.AsyncClient() as client:
+
+async def stream_chat_completion(
+    messages: List[Dict],
+    model: str = DEFAULT_MODEL,
+    temperature: float = 0.5,
+    timeout: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+) -> AsyncIterator[str]:
+    """Yield content tokens as Groq streams them back.
+
+    Retries only happen before the first token; once output has been
+    yielded a failure is raised to the caller.
+    """
+    payload = {**_payload(messages, model, temperature, max_tokens), "stream": True}
+
+    started = False
+    with span("llm_stream"):
+        last_error: Optional[GroqServiceError] = None
+        for attempt in range(GROQ_MAX_RETRIES + 1):
+            response = None
+            try:
+                async with _client_slot() as client:
+                    async with client.stream("POST", GROQ_API_URL, json=payload, timeout=_request_timeout(timeout)) as response:
+                        if response.status_code >= 400:
+                            await response.aread()
+                            last_error = GroqServiceError(
+                                f"Groq API call failed: {response.status_code} {response.text}",
+                                status_code=response.status_code,
+                                retry_after=_retry_after(response),
+                            )
+                            if response.status_code not in RETRYABLE_STATUS:
+                                raise last_error
+                        else:
+                            async for line in response.aiter_lines():
+                                if line.strip() == "data: [DONE]":
+                                    return
+                                chunk = _parse_sse_chunk(line)
+                                if not chunk:
+                                    continue
+                                record_usage(model, _stream_usage(chunk))
+                                token = _chunk_content(chunk)
+                                if token:
+                                    started = True
+                                    yield token
+                            return
+            except httpx.TransportError as e:
+                last_error = GroqServiceError(f"Groq API call failed: {e!r}")
+                if started:
+                    raise last_error
+
+            if attempt < GROQ_MAX_RETRIES:
+                await _backoff(attempt, response, last_error, "stream")
+
+        raise last_error
+
+
+# ---------- model routing ----------
+class Route:
+    """Model tier for one prompt type: primary model, optional fallback,
+    latency SLO in seconds and completion length cap."""
+    __slots__ = ("model", "fallback", "slo", "max_tokens", "hedge")
+
+    def __init__(self, model: str, fallback: Optional[str] = None, slo: float = 30.0,
+                 max_tokens: Optional[int] = None, hedge: bool = False):
+        self.model = model
+        self.fallback = fallback
+        self.slo = slo
+        self.max_tokens = max_tokens
+        self.hedge = hedge
+
+    def as_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+ROUTES: Dict[str, Route] = {
+    # Long, structured answers: keep the large model and fall back rather than fail.
+    "career_recommendation": Route(DEFAULT_MODEL, GROQ_FALLBACK_MODEL, slo=25, max_tokens=1500),
+    "resume_feedback": Route(DEFAULT_MODEL, GROQ_FALLBACK_MODEL, slo=25, max_tokens=1500),
+    # A single question: the small model is plenty and several times faster.
+    "interview_question": Route("llama3-8b-8192", "llama-3.1-8b-instant", slo=4, max_tokens=256, hedge=True),
+    # Interactive: the candidate is waiting for the score.
+    "critique": Route(DEFAULT_MODEL, GROQ_FALLBACK_MODEL, slo=10, max_tokens=700, hedge=True),
+}
+
+
+def _positive(value, kind) -> bool:
+    return isinstance(value, kind) and not isinstance(value, bool) and value > 0
+
+
+def _check_route(name: str, route: Route) -> None:
+    """Reject override values that would otherwise only fail mid-request."""
+    if not isinstance(route.model, str) or not route.model:
+        raise ValueError(f"{name}: model must be a model name")
+    if route.fallback is not None and (not isinstance(route.fallback, str) or not route.fallback):
+        raise ValueError(f"{name}: fallback must be a model name or null")
+    if not _positive(route.slo, (int, float)):
+        raise ValueError(f"{name}: slo must be a positive number of seconds")
+    if route.max_tokens is not None and not _positive(route.max_tokens, int):
+        raise ValueError(f"{name}: max_tokens must be a positive integer or null")
+    if not isinstance(route.hedge, bool):
+        raise ValueError(f"{name}: hedge must be true or false")
+
+
+def _load_route_overrides(raw: str) -> None:
+    """Apply GROQ_ROUTES. A malformed value is logged and ignored as a
+    whole, leaving the default routes in place."""
+    try:
+        overrides = json.loads(raw)
+        if not isinstance(overrides, dict):
+            raise ValueError("expected a JSON object of route names")
+        routes = {}
+        for name, fields in overrides.items():
+            if not isinstance(fields, dict):
+                raise ValueError(f"{name}: expected an object of route fields")
+            base = ROUTES[name].as_dict() if name in ROUTES else {"model": DEFAULT_MODEL}
+            routes[name] = Route(**{**base, **fields})
+            _check_route(name, routes[name])
+    except (ValueError, TypeError) as e:
+        logger.error("Ignoring invalid GROQ_ROUTES (%s); using the default routes", e)
+        return
+    ROUTES.update(routes)
+
+
+if GROQ_ROUTES:
+    _load_route_overrides(GROQ_ROUTES)
+
+
+def get_route(name: str) -> Route:
+    try:
+        return ROUTES[name]
+    except KeyError:
+        raise KeyError(f"Unknown completion route: {name}") from None
+
+
+_latencies: Dict[Tuple[str, str], Deque[float]] = {}
+_decisions: Dict[Tuple[str, str, str], int] = {}
+_cooldown_until: Dict[str, float] = {}
+
+
+def _observe(name: str, model: str, seconds: float) -> None:
+    window = _latencies.get((name, model))
+    if window is None:
+        window = _latencies[(name, model)] = deque(maxlen=GROQ_ROUTE_WINDOW)
+    window.append(seconds)
+    LLM_ROUTE_LATENCY.observe(seconds, route=name, model=model)
+
+
+def _decide(name: str, model: str, outcome: str) -> None:
+    key = (name, model, outcome)
+    _decisions[key] = _decisions.get(key, 0) + 1
+    LLM_ROUTE_DECISIONS.inc(route=name, model=model, outcome=outcome)
+    if outcome != "ok":
+        logger.info("Route %s answered by %s: %s", name, model, outcome)
+
+
+def _quantile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _hedge_delay(name: str, route: Route) -> float:
+    window = _latencies.get((name, route.model))
+    if window is not None and len(window) >= GROQ_ROUTE_MIN_SAMPLES:
+        return max(GROQ_HEDGE_MIN_DELAY, _quantile(window, 0.95))
+    # Too little data for a p95 yet: hedge halfway to the SLO.
+    return max(GROQ_HEDGE_MIN_DELAY, route.slo / 2)
+
+
+def _cooling_down(model: str) -> bool:
+    return _cooldown_until.get(model, 0) > time.monotonic()
+
+
+async def _attempt(name: str, payload: Dict, max_retries: int) -> str:
+    start = time.monotonic()
+    text = await _complete(payload, max_retries=max_retries)
+    _observe(name, payload["model"], time.monotonic() - start)
+    return text
+
+
+async def _hedged(name: str, route: Route, payload: Dict, max_retries: int) -> Tuple[str, bool]:
+    """First successful answer from the request and, when hedging is on and
+    it is slower than the route's p95, one duplicate. Also reports whether
+    the duplicate won."""
+    tasks = [asyncio.ensure_future(_attempt(name, payload, max_retries))]
+    try:
+        if GROQ_HEDGE and route.hedge:
+            done, _ = await asyncio.wait(tasks, timeout=_hedge_delay(name, route))
+            if not done:
+                tasks.append(asyncio.ensure_future(_attempt(name, payload, max_retries)))
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result(), task is not tasks[0]
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def routed_completion(name: str, messages: List[Dict], temperature: float = 0.5) -> str:
+    """chat_completion for a prompt type, using its tier from ROUTES.
+
+    The primary model gets one attempt (hedged if enabled) within the
+    route's SLO; when it is slow, rate limited or failing the fallback
+    model answers with the usual retries. A 429 also parks the primary
+    for its Retry-After so later calls go straight to the fallback.
+    """
+    route = get_route(name)
+    payload = _payload(messages, route.model, temperature, route.max_tokens)
+    if route.fallback is None:
         try:
-            response = await client.post(GROQ_API_URL, headers=HEADERS, json=payload)
-            response.raise_for_status()
-            return response.json()["choices"][0]["message"]["content"]
-        except httpx.HTTPStatusError as e:
-            print("[Groq ERROR]", e.response.status_code)
-            print("[Groq BODY]", e.response.text)
-            raise RuntimeError(f"Groq API call failed: {e.response.status_code} {e.response.text}")
-        except Exception as e:
-            raise RuntimeError(f"Groq API call failed: {str(e)}")
+            text, hedge_won = await _hedged(name, route, payload, GROQ_MAX_RETRIES)
+        except GroqServiceError:
+            _decide(name, route.model, "error")
+            raise
+        _decide(name, route.model, "hedge_won" if hedge_won else "ok")
+        return text
+
+    if _cooling_down(route.model):
+        reason = "rate_limited"
+    else:
+        try:
+            text, hedge_won = await asyncio.wait_for(_hedged(name, route, payload, 0), route.slo)
+        except asyncio.TimeoutError:
+            reason = "slow"
+        except GroqServiceError as e:
+            if e.status_code is not None and e.status_code not in RETRYABLE_STATUS:
+                # A bad request fails the same way on any model.
+                _decide(name, route.model, "error")
+                raise
+            if e.status_code == 429:
+                _cooldown_until[route.model] = time.monotonic() + (e.retry_after or GROQ_ROUTE_COOLDOWN)
+                reason = "rate_limited"
+            else:
+                reason = "error"
+        else:
+            _decide(name, route.model, "hedge_won" if hedge_won else "ok")
+            return text
+
+    try:
+        text = await _attempt(name, {**payload, "model": route.fallback}, GROQ_MAX_RETRIES)
+    except GroqServiceError:
+        _decide(name, route.fallback, "error")
+        raise
+    _decide(name, route.fallback, f"fallback_{reason}")
+    return text
+
+
+async def routed_stream_completion(name: str, messages: List[Dict], temperature: float = 0.5) -> AsyncIterator[str]:
+    """Streaming counterpart of routed_completion. Tokens cannot be taken
+    back, so there is no hedging or mid-stream fallback; the fallback model
+    is only used while the primary is parked after a 429."""
+    route = get_route(name)
+    model = route.fallback if route.fallback and _cooling_down(route.model) else route.model
+    try:
+        async for token in stream_chat_completion(messages, model=model, temperature=temperature,
+                                                  max_tokens=route.max_tokens):
+            yield token
+    except GroqServiceError as e:
+        if e.status_code == 429 and model == route.model:
+            _cooldown_until[model] = time.monotonic() + (e.retry_after or GROQ_ROUTE_COOLDOWN)
+        _decide(name, model, "error")
+        raise
+    _decide(name, model, "ok" if model == route.model else "fallback_rate_limited")
+
+
+def routing_stats() -> Dict:
+    """Routing table with observed latency and outcome counts per model."""
+    stats = {}
+    for name, route in ROUTES.items():
+        latency = {
+            model: {"samples": len(window), "p50": _quantile(window, 0.5), "p95": _quantile(window, 0.95)}
+            for (route_name, model), window in _latencies.items() if route_name == name and window
+        }
+        decisions = {
+            f"{model}:{outcome}": count
+            for (route_name, model, outcome), count in _decisions.items() if route_name == name
+        }
+        stats[name] = {**route.as_dict(), "latency": latency, "decisions": decisions}
+    return stats
+
+
+def clear_routing_stats() -> None:
+    _latencies.clear()
+    _decisions.clear()
+    _cooldown_until.clear()
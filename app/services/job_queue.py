@@ -0,0 +1,208 @@
+# app/services/job_queue.py
+
+import os
+import json
+import time
+import uuid
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.process import pid_alive
+from app.services.groq_service import GroqServiceError
+
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", "jobs.sqlite3")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "100"))
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "86400"))
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class JobQueueFull(Exception):
+    """The pending-job queue is at capacity."""
+
+
+class JobStore:
+    """SQLite-backed job records. Calls are blocking; callers offload them."""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, user_id TEXT NOT NULL, kind TEXT NOT NULL, dedup_key TEXT NOT NULL, "
+            "status TEXT NOT NULL, result TEXT, error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL, "
+            "owner TEXT)"
+        )
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "owner" not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_dedup ON jobs (dedup_key, created_at)")
+        self._conn.commit()
+
+    def _execute(self, sql: str, args=()) -> List[sqlite3.Row]:
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+            self._conn.commit()
+        return rows
+
+    def create(self, user_id: str, kind: str, dedup_key: str) -> dict:
+        now = time.time()
+        job = {"id": uuid.uuid4().hex, "user_id": user_id, "kind": kind, "dedup_key": dedup_key,
+               "status": "queued", "result": None, "error": None, "created_at": now, "updated_at": now,
+               "owner": _owner()}
+        self._execute(
+            "INSERT INTO jobs (id, user_id, kind, dedup_key, status, created_at, updated_at, owner) "
+            "VALUES (:id, :user_id, :kind, :dedup_key, :status, :created_at, :updated_at, :owner)",
+            job,
+        )
+        return job
+
+    def find_reusable(self, dedup_key: str) -> Optional[dict]:
+        """Latest queued/running job, or a succeeded one still within its TTL."""
+        rows = self._execute(
+            "SELECT * FROM jobs WHERE dedup_key = ? AND (status IN ('queued', 'running') "
+            "OR (status = 'succeeded' AND updated_at > ?)) ORDER BY created_at DESC LIMIT 1",
+            (dedup_key, time.time() - JOB_RESULT_TTL),
+        )
+        return _row_to_job(rows[0]) if rows else None
+
+    def get(self, job_id: str) -> Optional[dict]:
+        rows = self._execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        return _row_to_job(rows[0]) if rows else None
+
+    def update(self, job_id: str, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        self._execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?",
+            (status, json.dumps(result) if result is not None else None, error, time.time(), job_id),
+        )
+
+    def recover(self) -> None:
+        """Fail the pending jobs of worker processes that are gone; their
+        parameters lived only in that process. Sibling workers sharing the
+        database keep theirs. Our own pid can only be on rows of an earlier
+        process that had it, since this one has not created any yet."""
+        owners = self._execute("SELECT DISTINCT owner FROM jobs WHERE status IN ('queued', 'running')")
+        for owner in (row["owner"] for row in owners):
+            if owner is not None and owner.isdigit() and owner != _owner() and pid_alive(int(owner)):
+                continue
+            self._execute(
+                "UPDATE jobs SET status = 'failed', error = 'interrupted by restart', updated_at = ? "
+                "WHERE status IN ('queued', 'running') AND owner IS ?",
+                (time.time(), owner),
+            )
+        self._execute("DELETE FROM jobs WHERE updated_at < ?", (time.time() - JOB_RESULT_TTL,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _owner() -> str:
+    # Read per call: with preload_app the module is imported before the fork.
+    return str(os.getpid())
+
+
+def _row_to_job(row: sqlite3.Row) -> dict:
+    job = dict(row)
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+_handlers: Dict[str, Handler] = {}
+_store: Optional[JobStore] = None
+_queue: Optional[asyncio.Queue] = None
+_workers: List[asyncio.Task] = []
+_params: Dict[str, Dict[str, Any]] = {}
+_submit_lock: Optional[asyncio.Lock] = None
+
+
+def register(kind: str, handler: Handler) -> None:
+    _handlers[kind] = handler
+
+
+def dedup_key(user_id: str, kind: str, params: Dict[str, Any]) -> str:
+    blob = json.dumps({"user_id": user_id, "kind": kind, "params": params}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+async def _worker() -> None:
+    while True:
+        job_id, kind = await _queue.get()
+        params = _params.pop(job_id, {})
+        try:
+            await asyncio.to_thread(_store.update, job_id, "running")
+            result = await _handlers[kind](params)
+            await asyncio.to_thread(_store.update, job_id, "succeeded", result)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Job %s (%s) failed: %r", job_id, kind, e)
+            # Groq errors carry the upstream status and body; clients get the generic message.
+            error = e.PUBLIC_MESSAGE if isinstance(e, GroqServiceError) else str(e) or type(e).__name__
+            await asyncio.to_thread(_store.update, job_id, "failed", None, error)
+        finally:
+            _queue.task_done()
+
+
+async def start(path: str = JOBS_DB_PATH, workers: int = JOB_WORKERS) -> None:
+    global _store, _queue, _submit_lock
+    if _store is not None:
+        return
+    _submit_lock = asyncio.Lock()
+    _store = await asyncio.to_thread(JobStore, path)
+    await asyncio.to_thread(_store.recover)
+    _queue = asyncio.Queue(maxsize=JOB_QUEUE_MAX)
+    _workers.extend(asyncio.create_task(_worker()) for _ in range(workers))
+
+
+async def stop() -> None:
+    global _store, _queue
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    _params.clear()
+    if _store is not None:
+        _store.close()
+    _store = None
+    _queue = None
+
+
+async def submit(user_id: str, kind: str, params: Dict[str, Any]) -> dict:
+    """Enqueue a job, or return the existing one for identical input."""
+    if _store is None:
+        raise RuntimeError("Job queue is not running.")
+    key = dedup_key(user_id, kind, params)
+    async with _submit_lock:
+        existing = await asyncio.to_thread(_store.find_reusable, key)
+        if existing is not None:
+            return existing
+        if _queue.full():
+            raise JobQueueFull()
+        job = await asyncio.to_thread(_store.create, user_id, kind, key)
+        _params[job["id"]] = params
+        _queue.put_nowait((job["id"], kind))
+    return job
+
+
+async def get_job(job_id: str) -> Optional[dict]:
+    if _store is None:
+        return None
+    return await asyncio.to_thread(_store.get, job_id)
+
+
+def is_running() -> bool:
+    return _store is not None
+
+
+def queue_depth() -> int:
+    return _queue.qsize() if _queue is not None else 0
@@ -0,0 +1,258 @@
+# app/services/llm_cache.py
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Optional, AsyncIterator, Tuple
+
+from app.services import groq_service
+from app.services.groq_service import DEFAULT_MODEL
+
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "86400"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+# Optional persistent tier; disabled unless a path is configured.
+LLM_CACHE_SQLITE_PATH = os.getenv("LLM_CACHE_SQLITE_PATH")
+LLM_CACHE_DISK_MAX_ENTRIES = int(os.getenv("LLM_CACHE_DISK_MAX_ENTRIES", "20000"))
+
+
+def make_key(messages: List[Dict], model: str, temperature: float, prompt_version: Optional[str] = None) -> str:
+    blob = json.dumps(
+        {"model": model, "temperature": temperature, "messages": messages, "prompt_version": prompt_version},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """In-process LRU with per-entry TTL, bounded by entry count and bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[str]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            self._remove(key)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        if key in self._data:
+            self._remove(key)
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._bytes += size
+        while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+            self._remove(next(iter(self._data)))
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        _, value = self._data.pop(key)
+        self._bytes -= len(value.encode("utf-8"))
+
+
+class SQLiteCache:
+    """Persistent second tier that survives restarts. Calls are blocking."""
+
+    def __init__(self, path: str, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM llm_cache WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, created_at) VALUES (?, ?, ?, ?)",
+                (key, value, now + self.ttl, now),
+            )
+            self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                "SELECT key FROM llm_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_memory = LRUCache(LLM_CACHE_MAX_ENTRIES, LLM_CACHE_MAX_BYTES, LLM_CACHE_TTL)
+_disk: Optional[SQLiteCache] = None
+_inflight: Dict[str, asyncio.Task] = {}
+_stats = {"hits": 0, "disk_hits": 0, "misses": 0, "coalesced": 0}
+
+
+def open_disk_cache(path: Optional[str] = LLM_CACHE_SQLITE_PATH) -> None:
+    global _disk
+    if path and _disk is None:
+        _disk = SQLiteCache(path, LLM_CACHE_TTL, LLM_CACHE_DISK_MAX_ENTRIES)
+
+
+def close_disk_cache() -> None:
+    global _disk
+    if _disk is not None:
+        _disk.close()
+    _disk = None
+
+
+def cache_stats() -> Dict:
+    lookups = _stats["hits"] + _stats["disk_hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "entries": len(_memory),
+        "bytes": _memory._bytes,
+        "hit_ratio": (_stats["hits"] + _stats["disk_hits"]) / lookups if lookups else 0.0,
+        "disk_enabled": _disk is not None,
+    }
+
+
+async def _lookup(key: str) -> Optional[str]:
+    value = _memory.get(key)
+    if value is not None:
+        _stats["hits"] += 1
+        return value
+    if _disk is not None:
+        value = await asyncio.to_thread(_disk.get, key)
+        if value is not None:
+            _stats["disk_hits"] += 1
+            _memory.set(key, value)
+            return value
+    return None
+
+
+async def _store(key: str, value: str) -> None:
+    # An empty answer is a failure to retry, not one to replay for LLM_CACHE_TTL.
+    if not value or not value.strip():
+        return
+    _memory.set(key, value)
+    if _disk is not None:
+        await asyncio.to_thread(_disk.set, key, value)
+
+
+async def _fill(key: str, messages: List[Dict], model: str, temperature: float, route: Optional[str]) -> str:
+    try:
+        if route:
+            value = await groq_service.routed_completion(route, messages, temperature=temperature)
+        else:
+            value = await groq_service.chat_completion(messages, model=model, temperature=temperature)
+        await _store(key, value)
+        return value
+    finally:
+        _inflight.pop(key, None)
+
+
+async def cached_chat_completion(
+    messages: List[Dict],
+    model: str = DEFAULT_MODEL,
+    temperature: float = 0.5,
+    prompt_version: Optional[str] = None,
+    route: Optional[str] = None,
+) -> str:
+    """chat_completion with a content-addressed cache and single-flight dedup.
+    With a route, the prompt type's model tier is used (see groq_service.ROUTES)."""
+    if route:
+        # Keyed on the tier's primary model; a fallback answer is cached under it too.
+        model = groq_service.get_route(route).model
+    key = make_key(messages, model, temperature, prompt_version)
+
+    task = _inflight.get(key)
+    if task is not None:
+        _stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    value = await _lookup(key)
+    if value is not None:
+        return value
+
+    # Another request may have started the same call while we checked disk.
+    task = _inflight.get(key)
+    if task is not None:
+        _stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    _stats["misses"] += 1
+    task = asyncio.ensure_future(_fill(key, messages, model, temperature, route))
+    _inflight[key] = task
+    return await asyncio.shield(task)
+
+
+async def cached_stream_chat_completion(
+    messages: List[Dict],
+    model: str = DEFAULT_MODEL,
+    temperature: float = 0.5,
+    prompt_version: Optional[str] = None,
+    route: Optional[str] = None,
+) -> AsyncIterator[str]:
+    """Streaming variant: replays a cached answer in one chunk, otherwise
+    streams from Groq and stores the full text once the stream completes."""
+    if route:
+        model = groq_service.get_route(route).model
+    key = make_key(messages, model, temperature, prompt_version)
+
+    task = _inflight.get(key)
+    if task is not None:
+        _stats["coalesced"] += 1
+        yield await asyncio.shield(task)
+        return
+
+    value = await _lookup(key)
+    if value is not None:
+        yield value
+        return
+
+    _stats["misses"] += 1
+    parts = []
+    if route:
+        tokens = groq_service.routed_stream_completion(route, messages, temperature=temperature)
+    else:
+        tokens = groq_service.stream_chat_completion(messages, model=model, temperature=temperature)
+    async for token in tokens:
+        parts.append(token)
+        yield token
+    await _store(key, "".join(parts))
+
+
+def clear() -> None:
+    _memory.clear()
+    for key in _stats:
+        _stats[key] = 0
@@ -0,0 +1,277 @@
+# app/services/mock_interviews.py
+
+import os
+import re
+import json
+import time
+import asyncio
+import logging
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.core.process import pid_alive
+from app.services import supabase_client
+
+MOCK_LOG_BATCH_SIZE = int(os.getenv("MOCK_LOG_BATCH_SIZE", "50"))
+MOCK_LOG_FLUSH_INTERVAL = float(os.getenv("MOCK_LOG_FLUSH_INTERVAL", "2"))
+MOCK_LOG_MAX_BUFFER = int(os.getenv("MOCK_LOG_MAX_BUFFER", "5000"))
+# How long shutdown waits for the last batch before spilling what is left.
+MOCK_LOG_STOP_TIMEOUT = float(os.getenv("MOCK_LOG_STOP_TIMEOUT", "10"))
+# Rows that could not be written are appended here and replayed later.
+MOCK_LOG_SPILL_PATH = os.getenv("MOCK_LOG_SPILL_PATH", "mock_interviews.spill.jsonl")
+
+logger = logging.getLogger(__name__)
+
+_SCORE = re.compile(r"score\W{0,10}(\d{1,2}(?:\.\d+)?)\s*(?:/|out of)\s*10", re.IGNORECASE)
+_BARE_SCORE = re.compile(r"\b(\d{1,2}(?:\.\d+)?)\s*(?:/|out of)\s*10\b", re.IGNORECASE)
+
+
+def parse_critique(text: str) -> Tuple[Optional[int], str]:
+    """Split model output into (score out of 10, critique text). The last
+    "Score: N/10" line wins; it is removed from the critique."""
+    matches = list(_SCORE.finditer(text)) or list(_BARE_SCORE.finditer(text))
+    if not matches:
+        return None, text.strip()
+    match = matches[-1]
+    score = max(0, min(10, round(float(match.group(1)))))
+
+    start = text.rfind("\n", 0, match.start()) + 1
+    end = text.find("\n", match.end())
+    end = len(text) if end == -1 else end
+    line = text[start:end]
+    # Drop the line only when it is just the score (markdown decoration aside).
+    if re.fullmatch(r"[\W_]*" + re.escape(match.group(0)) + r"[\W_]*", line.strip(), re.IGNORECASE):
+        text = text[:start] + text[end:]
+    return score, text.strip()
+
+
+_spill_lock = threading.Lock()
+
+
+def _spill_path() -> str:
+    # One file per process: gunicorn workers must not interleave appends.
+    return f"{MOCK_LOG_SPILL_PATH}.{os.getpid()}"
+
+
+def _spill(rows: List[Dict]) -> None:
+    with _spill_lock, open(_spill_path(), "a", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+def _spill_files() -> List[str]:
+    """This process's spill file plus any left behind by processes that
+    are gone (earlier runs, crashed workers, the unsuffixed legacy file)."""
+    directory = os.path.dirname(MOCK_LOG_SPILL_PATH)
+    base = os.path.basename(MOCK_LOG_SPILL_PATH)
+    # A ".replay" suffix marks a file whose replay was cut short by a crash.
+    pattern = re.compile(re.escape(base) + r"(?:\.(\d+))?(?:\.replay)?$")
+    try:
+        names = os.listdir(directory or ".")
+    except FileNotFoundError:
+        return []
+    paths = []
+    for name in names:
+        match = pattern.match(name)
+        if match is None:
+            continue
+        pid = int(match.group(1)) if match.group(1) else None
+        if pid is None or pid == os.getpid() or not pid_alive(pid):
+            paths.append(os.path.join(directory, name))
+    return paths
+
+
+def _decode(path: str, lines: List[str]) -> List[Dict]:
+    """Parse spilled rows; lines that do not parse (e.g. torn by a crash
+    mid-write) are moved to a .bad file instead of blocking the replay."""
+    rows, bad = [], []
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        if isinstance(row, dict):
+            rows.append(row)
+        else:
+            bad.append(line if line.endswith("\n") else line + "\n")
+    if bad:
+        logger.error("Quarantining %d unreadable spilled rows from %s to %s.bad", len(bad), path, MOCK_LOG_SPILL_PATH)
+        with open(f"{MOCK_LOG_SPILL_PATH}.bad", "a", encoding="utf-8") as f:
+            f.writelines(bad)
+    return rows
+
+
+def _take_spilled() -> List[Dict]:
+    """Read and remove the spill files; rows that fail again are re-spilled."""
+    rows = []
+    with _spill_lock:
+        claimed = f"{_spill_path()}.replay"
+        # Our own interrupted replay goes first, before anything is claimed over it.
+        for path in sorted(_spill_files(), key=lambda p: p != claimed):
+            if path != claimed:
+                # Claim the file first so a sibling worker cannot replay it too.
+                try:
+                    os.replace(path, claimed)
+                except FileNotFoundError:
+                    continue
+            with open(claimed, "r", encoding="utf-8") as f:
+                rows.extend(_decode(path, f.readlines()))
+            os.remove(claimed)
+    return rows
+
+
+_STOP = object()
+_queue: Optional[asyncio.Queue] = None
+_flusher: Optional[asyncio.Task] = None
+_spilling: Set[asyncio.Task] = set()
+_stats = {"buffered": 0, "written": 0, "batches": 0, "spilled": 0}
+
+
+async def _write(rows: List[Dict]) -> bool:
+    try:
+        for start in range(0, len(rows), MOCK_LOG_BATCH_SIZE):
+            await supabase_client.insert_mock_interviews(rows[start:start + MOCK_LOG_BATCH_SIZE])
+            _stats["batches"] += 1
+    except Exception as e:
+        logger.warning("Writing %d mock interview rows failed, spilling to %s: %r", len(rows), _spill_path(), e)
+        _stats["written"] += start
+        try:
+            await asyncio.to_thread(_spill, rows[start:])
+            _stats["spilled"] += len(rows) - start
+        except OSError as spill_error:
+            logger.error("Dropping %d mock interview rows: %r", len(rows) - start, spill_error)
+        return False
+    _stats["written"] += len(rows)
+    return True
+
+
+async def _replay_spilled() -> None:
+    rows = await asyncio.to_thread(_take_spilled)
+    if rows:
+        logger.info("Replaying %d spilled mock interview rows", len(rows))
+        await _write(rows)
+
+
+async def _drain(first: Dict) -> Tuple[List[Dict], bool]:
+    """Collect a batch: up to MOCK_LOG_BATCH_SIZE rows or whatever arrives
+    within MOCK_LOG_FLUSH_INTERVAL of the first one. Also reports whether
+    the stop marker was seen."""
+    batch = [first]
+    deadline = time.monotonic() + MOCK_LOG_FLUSH_INTERVAL
+    while len(batch) < MOCK_LOG_BATCH_SIZE:
+        timeout = deadline - time.monotonic()
+        if timeout <= 0:
+            break
+        try:
+            item = await asyncio.wait_for(_queue.get(), timeout)
+        except asyncio.TimeoutError:
+            break
+        if item is _STOP:
+            return batch, True
+        batch.append(item)
+    return batch, False
+
+
+async def _run() -> None:
+    # Rows left over from an earlier run or outage go first.
+    try:
+        await _replay_spilled()
+    except Exception:
+        logger.exception("Replaying spilled mock interview rows failed")
+    spilled_pending = os.path.exists(_spill_path())
+    stopping = False
+    while not stopping:
+        item = await _queue.get()
+        if item is _STOP:
+            break
+        batch, stopping = await _drain(item)
+        try:
+            ok = await _write(batch)
+        except asyncio.CancelledError:
+            # stop() gave up waiting: keep the batch in flight on disk.
+            await asyncio.to_thread(_spill, batch)
+            _stats["spilled"] += len(batch)
+            raise
+        try:
+            # A successful write means the database is back; retry earlier spills.
+            if ok and spilled_pending:
+                await _replay_spilled()
+            spilled_pending = not ok or os.path.exists(_spill_path())
+        except Exception:
+            logger.exception("Replaying spilled mock interview rows failed")
+            spilled_pending = True
+
+
+async def start() -> None:
+    global _queue, _flusher
+    if _flusher is not None:
+        return
+    _queue = asyncio.Queue(maxsize=MOCK_LOG_MAX_BUFFER)
+    _flusher = asyncio.create_task(_run())
+
+
+async def stop() -> None:
+    """Flush everything still buffered; rows that cannot be written spill."""
+    global _queue, _flusher
+    if _flusher is None:
+        return
+    try:
+        _queue.put_nowait(_STOP)
+        await asyncio.wait({_flusher}, timeout=MOCK_LOG_STOP_TIMEOUT)
+    except asyncio.QueueFull:
+        pass
+    # Full queue or timeout: the flusher is stuck behind a slow write.
+    stuck = not _flusher.done()
+    if stuck:
+        _flusher.cancel()
+    await asyncio.gather(_flusher, return_exceptions=True)
+    rows = []
+    while not _queue.empty():
+        item = _queue.get_nowait()
+        if item is not _STOP:
+            rows.append(item)
+    if rows and stuck:
+        await asyncio.to_thread(_spill, rows)
+        _stats["spilled"] += len(rows)
+    elif rows:
+        await _write(rows)
+    if _spilling:
+        await asyncio.gather(*_spilling, return_exceptions=True)
+    _queue = None
+    _flusher = None
+
+
+def _spill_later(row: Dict) -> None:
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Called outside the app (scripts): nothing to block.
+        _spill([row])
+        return
+    task = loop.create_task(asyncio.to_thread(_spill, [row]))
+    _spilling.add(task)
+    task.add_done_callback(_spilled)
+
+
+def _spilled(task: asyncio.Task) -> None:
+    _spilling.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Dropping a mock interview row: %r", task.exception())
+
+
+def record(user_id: str, question: str, answer: str, critique: str, score: Optional[int]) -> None:
+    """Buffer one result without waiting for the database."""
+    row = {"user_id": user_id, "question": question, "answer": answer, "critique": critique, "score": score}
+    _stats["buffered"] += 1
+    if _queue is None or _queue.full():
+        # Not running (scripts, tests) or overloaded: keep the row on disk.
+        _spill_later(row)
+        _stats["spilled"] += 1
+        return
+    _queue.put_nowait(row)
+
+
+def writer_stats() -> Dict:
+    return {**_stats, "pending": _queue.qsize() if _queue is not None else 0}
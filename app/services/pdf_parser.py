@@ -1,8 +1,142 @@
-import fitz  
-
-def extract_text_from_pdf(file_bytes: bytes) -> str:
-    doc = fitz.open(stream=file_bytes, filetype="pdf")
-    text = ""
-    for page in doc:
-        text += page.get_text()
-    return text.strip()
\ No newline at end of file
+# app/services/pdf_parser.py
+
+import os
+import asyncio
+import hashlib
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple
+
+from app.core.metrics import span
+
+PDF_MAX_WORKERS = int(os.getenv("PDF_MAX_WORKERS", "2"))
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "50"))
+PDF_PARSE_TIMEOUT = float(os.getenv("PDF_PARSE_TIMEOUT", "20"))
+# Documents longer than this are split into page ranges parsed in parallel.
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "16"))
+PDF_TEXT_CACHE_SIZE = int(os.getenv("PDF_TEXT_CACHE_SIZE", "256"))
+
+
+class PDFParseError(Exception):
+    """The upload could not be parsed (corrupt file or timeout)."""
+
+
+def extract_page_range(file_bytes: bytes, start: int, stop: int) -> Tuple[List[str], int]:
+    """Return the text of pages [start, stop) and the document's page count."""
+    # Imported here: PyMuPDF is only needed in the parser processes.
+    import fitz
+
+    with fitz.open(stream=file_bytes, filetype="pdf") as doc:
+        stop = min(stop, doc.page_count)
+        return [doc.load_page(i).get_text() for i in range(start, stop)], doc.page_count
+
+
+def extract_text_from_pdf(file_bytes: bytes, max_pages: int = PDF_MAX_PAGES) -> str:
+    pages, _ = extract_page_range(file_bytes, 0, max_pages)
+    return "".join(pages).strip()
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_cache: "OrderedDict[str, Tuple[str, ...]]" = OrderedDict()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: forking a process that is running an event loop and threads is unsafe.
+        _pool = ProcessPoolExecutor(max_workers=PDF_MAX_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    """Shut a broken or stuck pool down and kill its workers; the next
+    parse starts a fresh pool."""
+    global _pool
+    if _pool is pool:
+        _pool = None
+    processes = list((getattr(pool, "_processes", None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    # shutdown() lets running calls finish; a worker stuck on a bad PDF never would.
+    for process in processes:
+        process.kill()
+
+
+def shutdown_pool() -> None:
+    if _pool is not None:
+        _discard_pool(_pool)
+
+
+def checksum(file_bytes: bytes) -> str:
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+async def _parse(pool: ProcessPoolExecutor, file_bytes: bytes, max_pages: int) -> List[str]:
+    loop = asyncio.get_running_loop()
+    first_stop = min(max_pages, PDF_PARALLEL_MIN_PAGES)
+    pages, page_count = await loop.run_in_executor(pool, extract_page_range, file_bytes, 0, first_stop)
+
+    last = min(page_count, max_pages)
+    if last <= first_stop:
+        return pages
+
+    # Large document: fan the remaining pages out across the pool.
+    step = max(1, -(-(last - first_stop) // PDF_MAX_WORKERS))
+    ranges = [(start, min(start + step, last)) for start in range(first_stop, last, step)]
+    chunks = await asyncio.gather(*[
+        loop.run_in_executor(pool, extract_page_range, file_bytes, start, stop) for start, stop in ranges
+    ])
+    for chunk, _ in chunks:
+        pages.extend(chunk)
+    return pages
+
+
+async def _parse_in_pool(file_bytes: bytes, max_pages: int) -> List[str]:
+    """Run _parse, replacing the pool (and retrying once) if a worker died."""
+    for attempt in range(2):
+        pool = _get_pool()
+        try:
+            return await _parse(pool, file_bytes, max_pages)
+        except BrokenProcessPool:
+            _discard_pool(pool)
+            if attempt:
+                raise
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling():
+                # Timed out or abandoned: the worker is still busy with this
+                # file, so kill it rather than let it hold a slot.
+                _discard_pool(pool)
+                raise
+            # Only our queued call was cancelled, by another parse discarding the pool.
+            if attempt:
+                raise BrokenProcessPool("PDF parser pool was restarted twice")
+
+
+async def extract_pdf_pages(file_bytes: bytes, max_pages: int = PDF_MAX_PAGES) -> List[str]:
+    """Parse in the process pool with a page cap and timeout. Results are
+    cached by checksum, so re-uploading the same file skips parsing."""
+    key = f"{checksum(file_bytes)}:{max_pages}"
+    cached = _cache.get(key)
+    if cached is not None:
+        _cache.move_to_end(key)
+        return list(cached)
+
+    try:
+        with span("pdf_parse"):
+            pages = await asyncio.wait_for(_parse_in_pool(file_bytes, max_pages), PDF_PARSE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise PDFParseError(f"PDF parsing timed out after {PDF_PARSE_TIMEOUT:.0f}s")
+    except BrokenProcessPool:
+        raise PDFParseError("The PDF parser crashed on this file")
+    except (RuntimeError, ValueError) as e:
+        raise PDFParseError(f"Could not read PDF: {e}")
+
+    _cache[key] = tuple(pages)
+    while len(_cache) > PDF_TEXT_CACHE_SIZE:
+        _cache.popitem(last=False)
+    return pages
+
+
+async def extract_text(file_bytes: bytes, max_pages: int = PDF_MAX_PAGES) -> str:
+    return "".join(await extract_pdf_pages(file_bytes, max_pages)).strip()
@@ -0,0 +1,184 @@
+# app/services/question_cache.py
+
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional
+
+import numpy as np
+
+from app.services.embeddings import EMBEDDING_DIM, aembed_text
+from app.services.rag import normalize_title
+
+# Titles whose embeddings are at least this similar share a question pool.
+QUESTION_CACHE_THRESHOLD = float(os.getenv("QUESTION_CACHE_THRESHOLD", "0.85"))
+QUESTION_POOL_SIZE = int(os.getenv("QUESTION_POOL_SIZE", "5"))
+# Refill in the background once a pool has fewer questions than this.
+QUESTION_POOL_MIN = int(os.getenv("QUESTION_POOL_MIN", "2"))
+# Each question is retired after this many serves so answers stay varied.
+QUESTION_MAX_SERVES = int(os.getenv("QUESTION_MAX_SERVES", "20"))
+QUESTION_CACHE_TTL = float(os.getenv("QUESTION_CACHE_TTL", "86400"))
+QUESTION_CACHE_MAX_CLUSTERS = int(os.getenv("QUESTION_CACHE_MAX_CLUSTERS", "2000"))
+
+logger = logging.getLogger(__name__)
+
+Generator = Callable[[str], Awaitable[str]]
+
+
+class _Question:
+    __slots__ = ("text", "created_at", "serves")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.created_at = time.monotonic()
+        self.serves = 0
+
+
+class QuestionPool:
+    """Questions generated for one cluster of similar job titles."""
+
+    def __init__(self, title: str):
+        self.title = title
+        self.questions: Deque[_Question] = deque()
+        self.last_used = time.monotonic()
+        self.refill: Optional[asyncio.Task] = None
+
+    def take(self) -> Optional[str]:
+        """Next question in rotation; expired and worn-out ones are dropped."""
+        now = time.monotonic()
+        while self.questions:
+            question = self.questions.popleft()
+            if now - question.created_at > QUESTION_CACHE_TTL:
+                continue
+            question.serves += 1
+            if question.serves < QUESTION_MAX_SERVES:
+                self.questions.append(question)
+            self.last_used = now
+            return question.text
+        return None
+
+    def add(self, text: str) -> None:
+        if len(self.questions) < QUESTION_POOL_SIZE and all(q.text != text for q in self.questions):
+            self.questions.append(_Question(text))
+
+    @property
+    def low(self) -> bool:
+        return len(self.questions) < QUESTION_POOL_MIN
+
+
+class SemanticQuestionCache:
+    """Pools keyed by unit-normalized title embeddings; lookup is one
+    matrix-vector product over the cluster centroids."""
+
+    def __init__(self, threshold: float, max_clusters: int, dim: int = EMBEDDING_DIM):
+        self.threshold = threshold
+        self.max_clusters = max_clusters
+        self._vectors = np.empty((0, dim), dtype=np.float32)
+        self._pools: List[QuestionPool] = []
+
+    def __len__(self):
+        return len(self._pools)
+
+    def match(self, vec: np.ndarray) -> Optional[QuestionPool]:
+        if not self._pools:
+            return None
+        scores = self._vectors @ vec
+        best = int(np.argmax(scores))
+        return self._pools[best] if scores[best] >= self.threshold else None
+
+    def add(self, title: str, vec: np.ndarray) -> QuestionPool:
+        existing = self.match(vec)
+        if existing is not None:
+            return existing
+        if len(self._pools) >= self.max_clusters:
+            oldest = min(range(len(self._pools)), key=lambda i: self._pools[i].last_used)
+            self._vectors = np.delete(self._vectors, oldest, axis=0)
+            del self._pools[oldest]
+        pool = QuestionPool(title)
+        self._vectors = np.vstack([self._vectors, vec[None, :]])
+        self._pools.append(pool)
+        return pool
+
+    def clear(self) -> None:
+        for pool in self._pools:
+            if pool.refill is not None:
+                pool.refill.cancel()
+        self._vectors = self._vectors[:0]
+        self._pools.clear()
+
+
+_cache = SemanticQuestionCache(QUESTION_CACHE_THRESHOLD, QUESTION_CACHE_MAX_CLUSTERS)
+_stats = {"hits": 0, "misses": 0, "refills": 0, "bypassed": 0}
+_pending: Dict[str, asyncio.Task] = {}
+
+
+def _unit(vec: np.ndarray) -> np.ndarray:
+    norm = float(np.linalg.norm(vec))
+    return (vec / norm).astype(np.float32) if norm else vec
+
+
+async def _refill(pool: QuestionPool, generate: Generator) -> None:
+    try:
+        while len(pool.questions) < QUESTION_POOL_SIZE:
+            before = len(pool.questions)
+            pool.add(await generate(pool.title))
+            _stats["refills"] += 1
+            if len(pool.questions) == before:
+                break  # the model repeated itself; try again on a later request
+    except Exception as e:
+        logger.warning("Question pool refill for %r failed: %r", pool.title, e)
+    finally:
+        pool.refill = None
+
+
+def _schedule_refill(pool: QuestionPool, generate: Generator) -> None:
+    if pool.low and pool.refill is None:
+        pool.refill = asyncio.ensure_future(_refill(pool, generate))
+
+
+async def get_question(job_title: str, generate: Generator) -> str:
+    """A pooled question for the title's cluster, or a fresh one that seeds
+    a new pool. Low pools are topped up in the background."""
+    job_title = job_title.strip()
+    title = normalize_title(job_title)
+    try:
+        vec = _unit(await aembed_text(title))
+    except Exception as e:
+        # No embedding model available: behave like an uncached call.
+        if not _stats["bypassed"]:
+            logger.warning("Question cache unavailable: %r", e)
+        _stats["bypassed"] += 1
+        return await generate(job_title)
+
+    pool = _cache.match(vec)
+    question = pool.take() if pool is not None else None
+    if question is not None:
+        _stats["hits"] += 1
+        _schedule_refill(pool, generate)
+        return question
+
+    _stats["misses"] += 1
+    task = _pending.get(title)
+    if task is None:
+        task = asyncio.ensure_future(generate(job_title))
+        _pending[title] = task
+        task.add_done_callback(lambda _: _pending.pop(title, None))
+    question = await asyncio.shield(task)
+    # Another spelling may have created the cluster while we were generating.
+    pool = _cache.add(job_title, vec)
+    pool.add(question)
+    pool.take()
+    _schedule_refill(pool, generate)
+    return question
+
+
+def cache_stats() -> Dict:
+    return {**_stats, "clusters": len(_cache)}
+
+
+def clear() -> None:
+    _cache.clear()
+    for key in _stats:
+        _stats[key] = 0
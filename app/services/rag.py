@@ -0,0 +1,80 @@
+# app/services/rag.py
+
+import os
+import re
+import json
+import asyncio
+import logging
+from typing import Dict, List
+
+from app.services import vector_search
+from app.services.llm_cache import LRUCache
+
+RAG_TOP_K = int(os.getenv("RAG_TOP_K", "3"))
+RAG_CACHE_TTL = float(os.getenv("RAG_CACHE_TTL", "3600"))
+RAG_CACHE_MAX_ENTRIES = int(os.getenv("RAG_CACHE_MAX_ENTRIES", "1024"))
+# Each posting is clipped so grounding does not crowd out the rest of the prompt.
+RAG_MAX_DESCRIPTION_CHARS = int(os.getenv("RAG_MAX_DESCRIPTION_CHARS", "1200"))
+
+logger = logging.getLogger(__name__)
+
+_cache = LRUCache(RAG_CACHE_MAX_ENTRIES, 8 * 1024 * 1024, RAG_CACHE_TTL)
+_inflight: Dict[str, asyncio.Task] = {}
+
+
+TITLE_ABBREVIATIONS = {
+    "sr": "senior", "snr": "senior", "jr": "junior", "mgr": "manager", "eng": "engineer",
+    "engr": "engineer", "dev": "developer", "swe": "software engineer", "sde": "software engineer",
+    "pm": "product manager", "ml": "machine learning", "ai": "artificial intelligence",
+}
+
+
+def normalize_title(job_title: str) -> str:
+    """Lower-case, drop punctuation and expand common abbreviations, so
+    "Sr. Data Scientist" and "senior data scientist" share cache entries."""
+    words = re.sub(r"[^\w+#]+", " ", job_title.lower()).split()
+    return " ".join(TITLE_ABBREVIATIONS.get(word, word) for word in words)
+
+
+async def _fetch(key: str) -> List[dict]:
+    try:
+        postings = await vector_search.find_similar_jobs(key, top_k=RAG_TOP_K)
+        postings = [{"title": p.get("title", ""), "description": p.get("description", "")} for p in postings]
+        _cache.set(key, json.dumps(postings))
+        return postings
+    except Exception as e:
+        # Grounding is best effort: without postings the plain prompt is used.
+        logger.warning("Job retrieval for %r failed: %r", key, e)
+        return []
+    finally:
+        _inflight.pop(key, None)
+
+
+async def similar_postings(job_title: str) -> List[dict]:
+    """Top-k postings for a job title, cached per normalized title and
+    shared by concurrent requests for the same title."""
+    key = normalize_title(job_title)
+    if not key or not vector_search.search_available():
+        return []
+    cached = _cache.get(key)
+    if cached is not None:
+        return json.loads(cached)
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_fetch(key))
+        _inflight[key] = task
+    return await asyncio.shield(task)
+
+
+def format_postings(postings: List[dict]) -> str:
+    blocks = []
+    for posting in postings:
+        description = posting["description"].strip()
+        if len(description) > RAG_MAX_DESCRIPTION_CHARS:
+            description = description[:RAG_MAX_DESCRIPTION_CHARS].rsplit(" ", 1)[0] + " ..."
+        blocks.append(f"{posting['title'].strip()}\n{description}")
+    return "\n\n".join(blocks)
+
+
+def clear() -> None:
+    _cache.clear()
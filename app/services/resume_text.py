@@ -0,0 +1,186 @@
+# app/services/resume_text.py
+
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+# Lines within this many lines of a page edge are header/footer candidates.
+EDGE_LINES = 3
+# Sections are only truncated into the budget when at least this much room is left.
+MIN_PARTIAL_TOKENS = 40
+
+KNOWN_HEADINGS = {
+    "summary", "professional summary", "profile", "objective", "about", "about me",
+    "experience", "work experience", "professional experience", "employment", "employment history",
+    "work history", "education", "skills", "technical skills", "core competencies", "projects",
+    "certifications", "certificates", "awards", "achievements", "publications", "languages",
+    "interests", "hobbies", "volunteer", "volunteer experience", "leadership", "courses",
+    "coursework", "references", "activities",
+}
+
+# Section kinds keyed by heading keyword, used to rank sections per prompt.
+SECTION_KINDS = {
+    "summary": "summary", "profile": "summary", "objective": "summary", "about": "summary",
+    "experience": "experience", "employment": "experience", "work": "experience",
+    "education": "education", "coursework": "education", "courses": "education",
+    "skills": "skills", "competencies": "skills", "languages": "skills",
+    "projects": "projects", "certifications": "certifications", "certificates": "certifications",
+    "awards": "achievements", "achievements": "achievements", "publications": "achievements",
+    "leadership": "experience", "volunteer": "experience",
+}
+
+_PAGE_NUMBER = re.compile(r"^(page\s*)?[-–(]?\s*\d+\s*(of\s*\d+)?\s*[-–)]?$", re.IGNORECASE)
+_BULLETS = re.compile(r"^[•●▪◦■►‣∙·*]\s*")
+_SPACES = re.compile(r"[ \t\u00a0\u2000-\u200b\u202f\u3000]+")
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    # Llama 3 uses a tiktoken BPE; cl100k_base is a close, locally available stand-in.
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str) -> int:
+    """Token count from tiktoken when installed, otherwise a conservative
+    estimate (roughly one token per short word or punctuation mark)."""
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return sum(1 + len(piece) // 6 for piece in re.findall(r"\w+|[^\w\s]", text))
+
+
+def _normalize_line(line: str) -> str:
+    return _BULLETS.sub("- ", _SPACES.sub(" ", line).strip())
+
+
+def _edge_key(line: str) -> str:
+    # Page numbers and dates differ between pages; compare lines without digits.
+    return re.sub(r"\d+", "#", line.lower())
+
+
+def normalize_pages(pages: Sequence[str]) -> str:
+    """Join page texts with whitespace collapsed, page numbers dropped and
+    lines repeated at the top or bottom of most pages (headers/footers)
+    kept only once."""
+    split = [[_normalize_line(line) for line in page.splitlines()] for page in pages]
+    split = [[line for line in lines if line] for lines in split]
+
+    repeated = set()
+    if len(split) > 1:
+        counts = Counter()
+        for lines in split:
+            edges = set(lines[:EDGE_LINES]) | set(lines[-EDGE_LINES:])
+            counts.update({_edge_key(line) for line in edges})
+        threshold = max(2, (len(split) + 1) // 2)
+        repeated = {key for key, n in counts.items() if n >= threshold}
+
+    out: List[str] = []
+    seen = set()
+    for lines in split:
+        for i, line in enumerate(lines):
+            edge = i < EDGE_LINES or i >= len(lines) - EDGE_LINES
+            # A number alone mid-page is content (a year, a GPA), not a page number.
+            if edge and _PAGE_NUMBER.match(line):
+                continue
+            key = _edge_key(line)
+            if edge and key in repeated:
+                # Keep the first copy: a running header usually carries the name.
+                if key in seen:
+                    continue
+                seen.add(key)
+            out.append(line)
+    return "\n".join(out)
+
+
+def _heading(line: str) -> Optional[str]:
+    candidate = line.strip().rstrip(":").strip()
+    if not candidate or len(candidate) > 40:
+        return None
+    if candidate.lower() in KNOWN_HEADINGS:
+        return candidate
+    words = candidate.split()
+    if len(words) <= 4 and candidate.isupper() and any(c.isalpha() for c in candidate):
+        return candidate
+    return None
+
+
+def _kind(title: str) -> str:
+    for word in re.findall(r"[a-z]+", title.lower()):
+        if word in SECTION_KINDS:
+            return SECTION_KINDS[word]
+    return "other"
+
+
+def split_sections(text: str) -> List[Dict]:
+    """Split normalized resume text at its headings. Text before the first
+    heading (name, contact details) becomes the "header" section."""
+    sections: List[Dict] = []
+    title, kind, body = "", "header", []
+
+    def flush():
+        content = "\n".join(body).strip()
+        if content:
+            sections.append({"title": title, "kind": kind, "text": content, "tokens": count_tokens(content)})
+
+    for line in text.splitlines():
+        heading = _heading(line)
+        if heading:
+            flush()
+            title, kind, body = heading, _kind(heading), [line]
+        else:
+            body.append(line)
+    flush()
+    return sections
+
+
+def preprocess(pages: Sequence[str]) -> Dict:
+    """Run once at upload: compact text plus its sections with token counts."""
+    text = normalize_pages(pages)
+    sections = split_sections(text)
+    return {"text": text, "sections": sections, "tokens": sum(s["tokens"] for s in sections)}
+
+
+def _truncate(text: str, budget: int) -> str:
+    kept: List[str] = []
+    used = 0
+    for line in text.splitlines():
+        cost = count_tokens(line) + 1
+        if used + cost > budget:
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept + ["[...]"]) if kept else ""
+
+
+def fit_to_budget(sections: Sequence[Dict], budget: int, priority: Sequence[str] = ()) -> str:
+    """Pick sections by kind priority (unlisted kinds last, document order
+    as tie-break) until the token budget is spent, truncating the first
+    section that does not fit. The result keeps the original section order."""
+    if sum(s["tokens"] for s in sections) <= budget:
+        return "\n\n".join(s["text"] for s in sections)
+
+    rank = {kind: i for i, kind in enumerate(priority)}
+    order = sorted(range(len(sections)), key=lambda i: (rank.get(sections[i]["kind"], len(rank)), i))
+    chosen: Dict[int, str] = {}
+    remaining = budget
+    for i in order:
+        section = sections[i]
+        if section["tokens"] <= remaining:
+            chosen[i] = section["text"]
+            remaining -= section["tokens"]
+        elif remaining >= MIN_PARTIAL_TOKENS:
+            partial = _truncate(section["text"], remaining)
+            if partial:
+                chosen[i] = partial
+                remaining -= count_tokens(partial)
+    return "\n\n".join(chosen[i] for i in sorted(chosen))
+
+
+def resume_sections(resume: Dict) -> List[Dict]:
+    """Sections stored at upload, or split on the fly for older rows."""
+    return resume.get("sections") or split_sections(resume.get("content") or "")
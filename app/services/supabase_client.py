@@ -1,54 +1,146 @@
 # app/services/supabase_client.py
 
-from supabase import create_client
+from typing import Optional, TYPE_CHECKING
+
 import httpx
+import logging
 import os
-import uuid
+
+from app.core.metrics import timed
+
+if TYPE_CHECKING:
+    from supabase import AsyncClient
 
 url = os.getenv("SUPABASE_URL")
 key = os.getenv("SUPABASE_KEY")
-supabase = create_client(url, key)
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "10"))
+SUPABASE_MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "20"))
+
+logger = logging.getLogger(__name__)
+
+# Shared async clients: one PostgREST session and one pool for Auth calls,
+# created in the app lifespan (or lazily on first use).
+_client: Optional["AsyncClient"] = None
+_http: Optional[httpx.AsyncClient] = None
+
+
+async def init_client() -> None:
+    """Create the shared clients. A missing or invalid SUPABASE_URL/KEY is
+    logged rather than raised, so the app starts live but not ready."""
+    global _client, _http
+    try:
+        if _client is None:
+            # supabase (and its realtime/storage dependencies) is slow to import;
+            # pay for it in the lifespan rather than at import time.
+            from supabase import acreate_client
+            _client = await acreate_client(url, key)
+        if _http is None:
+            _http = httpx.AsyncClient(
+                base_url=url,
+                timeout=SUPABASE_TIMEOUT,
+                limits=httpx.Limits(max_connections=SUPABASE_MAX_CONNECTIONS),
+            )
+    except Exception as e:
+        logger.error("Could not create the Supabase client (%r); check SUPABASE_URL and SUPABASE_KEY", e)
+
+
+def _require(client):
+    if client is None:
+        raise RuntimeError("Supabase client is not initialised; check SUPABASE_URL and SUPABASE_KEY.")
+    return client
+
+
+async def close_client() -> None:
+    global _client, _http
+    if _client is not None:
+        await _client.postgrest.aclose()
+    if _http is not None:
+        await _http.aclose()
+    _client = None
+    _http = None
+
+
+def is_initialised() -> bool:
+    return _client is not None and _http is not None
+
+
+async def get_client() -> "AsyncClient":
+    if _client is None:
+        await init_client()
+    return _require(_client)
+
 
 async def get_user_from_token(token: str):
+    if _http is None:
+        await init_client()
     headers = {
         "apikey": key,
         "Authorization": f"Bearer {token}"
     }
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(f"{url}/auth/v1/user", headers=headers)
+    resp = await _require(_http).get("/auth/v1/user", headers=headers)
     if resp.status_code == 200:
-        return resp.json() 
+        return resp.json()
     return None
 
-def upsert_resume(user_id: str, filename: str, content: str):
-    result = supabase.table("resumes").upsert({
+@timed("db")
+async def upsert_resume(
+    user_id: str,
+    filename: str,
+    content: str,
+    sections: Optional[list] = None,
+    content_hash: Optional[str] = None,
+    revision: Optional[int] = None,
+):
+    client = await get_client()
+    row = {
         "user_id": user_id,
         "filename": filename,
         "content": content
-    }, on_conflict=["user_id"]).execute()
+    }
+    if sections is not None:
+        row["sections"] = sections
+    if content_hash is not None:
+        row["content_hash"] = content_hash
+    if revision is not None:
+        row["revision"] = revision
+    # returning=representation (the default) hands back the row, so no
+    # second round trip is needed to learn the id.
+    result = await client.table("resumes").upsert(row, on_conflict="user_id").execute()
+
+    return result.data[0]["id"]
 
-    # Fetch the upserted record
-    data = supabase.table("resumes") \
-        .select("id") \
+@timed("db")
+async def get_resume_meta(user_id: str):
+    """id, content_hash and revision of the user's resume, without its text."""
+    client = await get_client()
+    res = await client.table("resumes") \
+        .select("id, content_hash, revision") \
         .eq("user_id", user_id) \
-        .single() \
-        .execute()
-    
-    return data.data["id"]
+        .order("created_at", desc=True) \
+        .limit(1).execute()
+    return res.data[0] if res.data else None
 
-def get_latest_resume_by_user(user_id: str):
-    res = supabase.table("resumes") \
+@timed("db")
+async def get_latest_resume_by_user(user_id: str):
+    client = await get_client()
+    res = await client.table("resumes") \
         .select("*") \
         .eq("user_id", user_id) \
         .order("created_at", desc=True) \
         .limit(1).execute()
-    return res.data[0]
+    return res.data[0] if res.data else None
+
+@timed("db")
+async def insert_mock_interviews(rows: list):
+    """One bulk insert for a batch of mock interview results."""
+    client = await get_client()
+    await client.table("mock_interviews").insert(rows, returning="minimal").execute()
 
-def log_mock_interview(user_id: str, question: str, answer: str, critique: str, score: int):
-    supabase.table("mock_interviews").insert({
+async def log_mock_interview(user_id: str, question: str, answer: str, critique: str, score: int):
+    await insert_mock_interviews([{
         "user_id": user_id,
         "question": question,
         "answer": answer,
         "critique": critique,
         "score": score
-    }).execute()
+    }])
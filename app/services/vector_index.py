@@ -0,0 +1,253 @@
+# app/services/vector_index.py
+
+import os
+import json
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class FlatIndex:
+    """Exact inner-product index over one contiguous float32 matrix.
+
+    Rows are kept dense: deleting an id moves the last row into its slot,
+    so search is always a single matrix-vector product plus argpartition.
+    """
+
+    kind = "flat"
+
+    def __init__(self, dim: int, capacity: int = 1024):
+        self.dim = dim
+        self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._size = 0
+        self._row_of: Dict[int, int] = {}
+        self.metadata: Dict[int, dict] = {}
+        # What the index was built from (e.g. the table's row count and max
+        # id); saved with a snapshot so a stale one can be detected.
+        self.source: Optional[dict] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._vectors[:self._size]
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._ids[:self._size]
+
+    def _reserve(self, extra: int) -> None:
+        needed = self._size + extra
+        if needed <= len(self._vectors):
+            return
+        capacity = max(needed, 2 * len(self._vectors))
+        vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+        vectors[:self._size] = self.vectors
+        ids = np.zeros(capacity, dtype=np.int64)
+        ids[:self._size] = self.ids
+        self._vectors, self._ids = vectors, ids
+
+    def add(self, ids: Sequence[int], vectors: np.ndarray, metadata: Optional[Sequence[dict]] = None) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        if len(ids) != len(vectors):
+            raise ValueError("ids and vectors must have the same length")
+        self.remove([i for i in ids if i in self._row_of])
+        self._reserve(len(ids))
+        start = self._size
+        self._vectors[start:start + len(ids)] = vectors
+        self._ids[start:start + len(ids)] = ids
+        for offset, id_ in enumerate(ids):
+            self._row_of[int(id_)] = start + offset
+        self._size += len(ids)
+        if metadata is not None:
+            for id_, meta in zip(ids, metadata):
+                self.metadata[int(id_)] = meta
+        self._on_add(start, vectors)
+
+    def remove(self, ids: Iterable[int]) -> int:
+        removed = 0
+        for id_ in ids:
+            row = self._row_of.pop(int(id_), None)
+            if row is None:
+                continue
+            last = self._size - 1
+            if row != last:
+                self._vectors[row] = self._vectors[last]
+                self._ids[row] = self._ids[last]
+                self._row_of[int(self._ids[row])] = row
+                self._on_move(last, row)
+            self._size -= 1
+            self.metadata.pop(int(id_), None)
+            removed += 1
+        return removed
+
+    # Hooks for subclasses that keep per-row state.
+    def _on_add(self, start: int, vectors: np.ndarray) -> None:
+        pass
+
+    def _on_move(self, src: int, dst: int) -> None:
+        pass
+
+    def _candidates(self, query: np.ndarray) -> Optional[np.ndarray]:
+        return None
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """Return up to k (id, score) pairs, highest inner product first."""
+        if self._size == 0 or k <= 0:
+            return []
+        query = np.asarray(query, dtype=np.float32).reshape(self.dim)
+        rows = self._candidates(query)
+        if rows is None:
+            scores = self.vectors @ query
+        else:
+            scores = self._vectors[rows] @ query
+        k = min(k, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        picked = top if rows is None else rows[top]
+        return [(int(self._ids[r]), float(s)) for r, s in zip(picked, scores[top])]
+
+    # ---------- persistence ----------
+    def _extra_arrays(self) -> Dict[str, np.ndarray]:
+        return {}
+
+    def save(self, path: str) -> None:
+        """Write the index to a directory of .npy files (plus JSON metadata).
+        Each file is replaced atomically, so workers that have the previous
+        snapshot memory-mapped keep reading the old, intact files."""
+        os.makedirs(path, exist_ok=True)
+        arrays = {"vectors": self.vectors, "ids": self.ids, **self._extra_arrays()}
+        for name, array in arrays.items():
+            target = os.path.join(path, f"{name}.npy")
+            with open(target + ".tmp", "wb") as f:
+                np.save(f, np.ascontiguousarray(array))
+            os.replace(target + ".tmp", target)
+        target = os.path.join(path, "meta.json")
+        with open(target + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(
+                {"kind": self.kind, "dim": self.dim, "config": self._config(), "source": self.source,
+                 "metadata": {str(k): v for k, v in self.metadata.items()}},
+                f,
+            )
+        os.replace(target + ".tmp", target)
+
+    def _config(self) -> dict:
+        return {}
+
+    def _load_arrays(self, path: str, mmap_mode: Optional[str]) -> None:
+        self._vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode=mmap_mode)
+        self._ids = np.load(os.path.join(path, "ids.npy"), mmap_mode=mmap_mode)
+        self._size = len(self._ids)
+        self._row_of = {int(id_): row for row, id_ in enumerate(self._ids)}
+
+
+class IVFIndex(FlatIndex):
+    """Approximate index: vectors are bucketed under k-means centroids and a
+    query only scores the rows in its `nprobe` closest buckets."""
+
+    kind = "ivf"
+
+    def __init__(self, dim: int, nlist: int = 256, nprobe: int = 8, capacity: int = 1024):
+        super().__init__(dim, capacity)
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.centroids: Optional[np.ndarray] = None
+        self._assign = np.zeros(capacity, dtype=np.int32)
+
+    def train(self, sample: np.ndarray, iterations: int = 10, seed: int = 0) -> None:
+        sample = np.asarray(sample, dtype=np.float32)
+        rng = np.random.default_rng(seed)
+        nlist = min(self.nlist, len(sample))
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[labels == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+            centroids /= np.linalg.norm(centroids, axis=1, keepdims=True) + 1e-12
+        self.centroids = centroids
+        self.nlist = nlist
+        if self._size:
+            self._assign[:self._size] = self._nearest(self.vectors)
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def _nearest(self, vectors: np.ndarray) -> np.ndarray:
+        return np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+
+    def _reserve(self, extra: int) -> None:
+        super()._reserve(extra)
+        if len(self._assign) < len(self._vectors):
+            assign = np.zeros(len(self._vectors), dtype=np.int32)
+            assign[:self._size] = self._assign[:self._size]
+            self._assign = assign
+
+    def _on_add(self, start: int, vectors: np.ndarray) -> None:
+        if self.is_trained:
+            self._assign[start:start + len(vectors)] = self._nearest(vectors)
+
+    def _on_move(self, src: int, dst: int) -> None:
+        self._assign[dst] = self._assign[src]
+
+    def _candidates(self, query: np.ndarray) -> Optional[np.ndarray]:
+        if not self.is_trained:
+            return None
+        nprobe = min(self.nprobe, len(self.centroids))
+        probes = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        return np.flatnonzero(np.isin(self._assign[:self._size], probes))
+
+    def _extra_arrays(self) -> Dict[str, np.ndarray]:
+        if not self.is_trained:
+            return {}
+        return {"centroids": self.centroids, "assign": self._assign[:self._size]}
+
+    def _config(self) -> dict:
+        return {"nlist": self.nlist, "nprobe": self.nprobe}
+
+    def _load_arrays(self, path: str, mmap_mode: Optional[str]) -> None:
+        super()._load_arrays(path, mmap_mode)
+        centroids = os.path.join(path, "centroids.npy")
+        if os.path.exists(centroids):
+            self.centroids = np.load(centroids)
+            self._assign = np.load(os.path.join(path, "assign.npy"), mmap_mode=mmap_mode)
+        else:
+            self._assign = np.zeros(self._size, dtype=np.int32)
+
+
+def load_index(path: str, mmap: bool = True) -> FlatIndex:
+    """Open a saved index. With mmap the arrays are mapped copy-on-write, so
+    workers start instantly and share pages until they modify the index."""
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta["kind"] == IVFIndex.kind:
+        index: FlatIndex = IVFIndex(meta["dim"], capacity=1, **meta["config"])
+    else:
+        index = FlatIndex(meta["dim"], capacity=1)
+    index._load_arrays(path, "c" if mmap else None)
+    index.metadata = {int(k): v for k, v in meta["metadata"].items()}
+    index.source = meta.get("source")
+    return index
+
+
+def build_index(ids: Sequence[int], vectors: np.ndarray, metadata: Optional[Sequence[dict]] = None,
+                ivf_threshold: int = 20000, nprobe: int = 8) -> FlatIndex:
+    """Exact index for small corpora, trained IVF index above ivf_threshold."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    dim = vectors.shape[1]
+    if len(vectors) < ivf_threshold:
+        index: FlatIndex = FlatIndex(dim, capacity=max(len(vectors), 1))
+    else:
+        nlist = int(4 * np.sqrt(len(vectors)))
+        index = IVFIndex(dim, nlist=nlist, nprobe=nprobe, capacity=len(vectors))
+        rng = np.random.default_rng(0)
+        sample = vectors[rng.choice(len(vectors), min(len(vectors), 50 * nlist), replace=False)]
+        index.train(sample)
+    index.add(list(ids), vectors, metadata)
+    return index
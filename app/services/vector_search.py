@@ -1,31 +1,257 @@
 # app/services/vector_search.py
 
-from typing import List
-from app.services.embeddings import embed_text
-from app.services.db_client import get_pg_connection 
-import asyncpg
+import io
+import os
+import csv
+import asyncio
+import logging
+from itertools import islice
+from typing import Iterable, List, Optional, Sequence, Tuple
 
-async def insert_job_embedding(title: str, description: str):
-    embedding = embed_text(description)
-    conn = await get_pg_connection()
-    await conn.execute(
-        """
-        INSERT INTO job_embeddings (title, description, embedding)
-        VALUES ($1, $2, $3)
-        """, title, description, embedding
+import numpy as np
+
+from app.core.metrics import span
+from app.services.embeddings import aembed_text, aembed_many
+from app.services import db_client
+from app.services.db_client import get_pg_connection
+from app.services.vector_index import FlatIndex, build_index, load_index
+
+JOB_INGEST_BATCH_SIZE = int(os.getenv("JOB_INGEST_BATCH_SIZE", "1000"))
+# "pgvector" scans job_embeddings in Postgres; "local" serves queries from an
+# in-process index that is built from the table (or a saved snapshot).
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "pgvector")
+VECTOR_INDEX_PATH = os.getenv("VECTOR_INDEX_PATH")
+VECTOR_IVF_THRESHOLD = int(os.getenv("VECTOR_IVF_THRESHOLD", "20000"))
+VECTOR_IVF_NPROBE = int(os.getenv("VECTOR_IVF_NPROBE", "8"))
+# How often each worker catches its local index up with rows other workers
+# (or ingestion jobs) inserted; 0 disables.
+VECTOR_INDEX_REFRESH = float(os.getenv("VECTOR_INDEX_REFRESH", "60"))
+
+_ROWS_QUERY = "SELECT id, title, description, embedding::text AS embedding FROM job_embeddings"
+
+logger = logging.getLogger(__name__)
+
+_local_index: Optional[FlatIndex] = None
+_refresh_task: Optional[asyncio.Task] = None
+
+
+def to_pgvector(vec: np.ndarray) -> str:
+    """Format a vector as a pgvector text literal, e.g. '[0.1,0.2]'."""
+    return "[" + ",".join("%.7g" % x for x in vec.tolist()) + "]"
+
+
+def from_pgvector(text: str) -> np.ndarray:
+    return np.array(text.strip("[]").split(","), dtype=np.float32)
+
+
+def get_local_index() -> Optional[FlatIndex]:
+    return _local_index
+
+
+async def load_local_index() -> None:
+    """Open the saved index (memory-mapped) and catch it up with Postgres,
+    or build it from Postgres. Called from the app lifespan when
+    VECTOR_BACKEND=local. A failure is logged and leaves no index, so
+    search_available() reports False."""
+    global _local_index
+    try:
+        if VECTOR_INDEX_PATH and os.path.exists(os.path.join(VECTOR_INDEX_PATH, "meta.json")):
+            _local_index = await asyncio.to_thread(load_index, VECTOR_INDEX_PATH)
+        if db_client.is_configured():
+            # The snapshot may predate rows inserted since it was saved.
+            await refresh_local_index(save=True)
+    except Exception as e:
+        _local_index = None
+        logger.error("Could not load the local vector index (%r); job retrieval is disabled", e)
+
+
+async def _table_state(conn) -> dict:
+    row = await conn.fetchrow("SELECT count(*) AS rows, coalesce(max(id), 0) AS max_id FROM job_embeddings")
+    return {"rows": row["rows"], "max_id": row["max_id"]}
+
+
+def _unpack(rows) -> Tuple[List[int], List[Tuple[str, str]], np.ndarray]:
+    ids = [r["id"] for r in rows]
+    jobs = [(r["title"], r["description"]) for r in rows]
+    return ids, jobs, np.stack([from_pgvector(r["embedding"]) for r in rows])
+
+
+async def _save_snapshot() -> None:
+    if VECTOR_INDEX_PATH and _local_index is not None:
+        await asyncio.to_thread(_local_index.save, VECTOR_INDEX_PATH)
+
+
+async def rebuild_local_index(save: bool = True) -> None:
+    global _local_index
+    async with get_pg_connection() as conn:
+        async with conn.transaction(isolation="repeatable_read", readonly=True):
+            state = await _table_state(conn)
+            rows = await conn.fetch(_ROWS_QUERY)
+    if not rows:
+        _local_index = None
+        return
+    ids, jobs, vectors = _unpack(rows)
+    metadata = [{"title": title, "description": description} for title, description in jobs]
+    index = await asyncio.to_thread(
+        build_index, ids, vectors, metadata, VECTOR_IVF_THRESHOLD, VECTOR_IVF_NPROBE
     )
-    await conn.close()
+    index.source = state
+    _local_index = index
+    if save:
+        await _save_snapshot()
+
+
+async def refresh_local_index(save: bool = False) -> bool:
+    """Catch the local index up with job_embeddings. Rows added since it
+    was built are added in place; anything else (deleted rows, an index
+    of unknown origin) means a rebuild. Returns whether the index changed."""
+    index = _local_index
+    known = index.source if index is not None else None
+    async with get_pg_connection() as conn:
+        async with conn.transaction(isolation="repeatable_read", readonly=True):
+            state = await _table_state(conn)
+            if known == state:
+                return False
+            added = []
+            if known and state["rows"] > known["rows"]:
+                added = await conn.fetch(_ROWS_QUERY + " WHERE id > $1 ORDER BY id", known["max_id"])
+    if added and known["rows"] + len(added) == state["rows"] and _local_index is index:
+        _index_rows(*_unpack(added))
+        index.source = state
+        if save:
+            await _save_snapshot()
+    else:
+        await rebuild_local_index(save)
+    return True
+
+
+async def _refresh_forever() -> None:
+    while True:
+        await asyncio.sleep(VECTOR_INDEX_REFRESH)
+        try:
+            await refresh_local_index()
+        except Exception as e:
+            logger.warning("Vector index refresh failed: %r", e)
+
+
+def start_refresh() -> None:
+    """Keep this worker's local index in step with the table. Called from
+    the app lifespan after load_local_index()."""
+    global _refresh_task
+    if VECTOR_INDEX_REFRESH > 0 and db_client.is_configured() and _refresh_task is None:
+        _refresh_task = asyncio.create_task(_refresh_forever())
+
+
+async def stop_refresh() -> None:
+    global _refresh_task
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        try:
+            await _refresh_task
+        except asyncio.CancelledError:
+            pass
+    _refresh_task = None
+
+
+def _index_rows(ids: Sequence[int], jobs: Sequence[Tuple[str, str]], vectors: np.ndarray) -> None:
+    global _local_index
+    if _local_index is None:
+        _local_index = FlatIndex(vectors.shape[1])
+    metadata = [{"title": title, "description": description} for title, description in jobs]
+    _local_index.add(list(ids), vectors, metadata)
+
+
+def remove_from_local_index(ids: Iterable[int]) -> int:
+    return _local_index.remove(ids) if _local_index is not None else 0
+
+
+async def insert_job_embedding(title: str, description: str):
+    embedding = await aembed_text(description)
+    async with get_pg_connection() as conn:
+        job_id = await conn.fetchval(
+            """
+            INSERT INTO job_embeddings (title, description, embedding)
+            VALUES ($1, $2, $3::vector)
+            RETURNING id
+            """, title, description, to_pgvector(embedding)
+        )
+    if VECTOR_BACKEND == "local":
+        _index_rows([job_id], [(title, description)], embedding.reshape(1, -1))
+        source = _local_index.source
+        if source:
+            # Other workers pick this row up on their next refresh.
+            _local_index.source = {"rows": source["rows"] + 1, "max_id": max(source["max_id"], job_id)}
+
+
+def search_available() -> bool:
+    """Whether find_similar_jobs has a backend to query."""
+    return (VECTOR_BACKEND == "local" and _local_index is not None) or db_client.is_configured()
+
 
 async def find_similar_jobs(query: str, top_k: int = 3) -> List[dict]:
-    embedding = embed_text(query)
-    conn = await get_pg_connection()
-    rows = await conn.fetch(
-        """
-        SELECT title, description
-        FROM job_embeddings
-        ORDER BY embedding <#> $1
-        LIMIT $2
-        """, embedding, top_k
-    )
-    await conn.close()
+    embedding = await aembed_text(query)
+    if VECTOR_BACKEND == "local" and _local_index is not None:
+        with span("vector_search"):
+            hits = _local_index.search(embedding, top_k)
+        return [dict(_local_index.metadata[job_id]) for job_id, _ in hits]
+    with span("vector_search"):
+        async with get_pg_connection() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT title, description
+                FROM job_embeddings
+                ORDER BY embedding <#> $1::vector
+                LIMIT $2
+                """, to_pgvector(embedding), top_k
+            )
     return [dict(r) for r in rows]
+
+
+def _chunks(items: Iterable[Tuple[str, str]], size: int):
+    it = iter(items)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def _csv_payload(jobs: Sequence[Tuple[str, str]], vectors: np.ndarray) -> io.BytesIO:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for (title, description), vec in zip(jobs, vectors):
+        writer.writerow((title, description, to_pgvector(vec)))
+    return io.BytesIO(buf.getvalue().encode("utf-8"))
+
+
+async def _copy_chunk(jobs: Sequence[Tuple[str, str]], vectors: np.ndarray) -> None:
+    async with get_pg_connection() as conn:
+        await conn.copy_to_table(
+            "job_embeddings",
+            source=_csv_payload(jobs, vectors),
+            columns=["title", "description", "embedding"],
+            format="csv",
+        )
+
+
+async def bulk_insert_job_embeddings(
+    jobs: Iterable[Tuple[str, str]],
+    batch_size: int = JOB_INGEST_BATCH_SIZE,
+) -> int:
+    """Embed and load (title, description) pairs in large chunks.
+
+    Each chunk is batch-encoded and streamed to Postgres with a single
+    COPY; the COPY of one chunk overlaps with encoding the next.
+    Returns the number of rows written.
+    """
+    total = 0
+    pending = None
+    for chunk in _chunks(jobs, batch_size):
+        vectors = await aembed_many([description for _, description in chunk])
+        if pending is not None:
+            await pending
+        pending = asyncio.ensure_future(_copy_chunk(chunk, vectors))
+        total += len(chunk)
+    if pending is not None:
+        await pending
+    if VECTOR_BACKEND == "local" and total:
+        # COPY does not hand back ids, so refresh the local index in one pass.
+        await rebuild_local_index()
+    return total
@@ -0,0 +1,77 @@
+"""Recall / latency of the local vector index against an exact scan.
+
+    python -m benchmarks.bench_vector_index --rows 100000 --queries 200
+
+Vectors are synthetic and clustered (unit-norm, MiniLM dimension) so the
+IVF buckets behave roughly like real job-description embeddings.
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from app.services.vector_index import FlatIndex, IVFIndex, build_index
+
+
+def clustered_vectors(rows: int, dim: int, clusters: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    vectors = centers[rng.integers(0, clusters, rows)] + 0.6 * rng.normal(size=(rows, dim))
+    vectors = vectors.astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def timed_search(index: FlatIndex, queries: np.ndarray, k: int):
+    results, latencies = [], []
+    for q in queries:
+        start = time.perf_counter()
+        results.append({i for i, _ in index.search(q, k)})
+        latencies.append((time.perf_counter() - start) * 1000)
+    return results, np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--out", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    data = clustered_vectors(args.rows + args.queries, args.dim, clusters=200, seed=0)
+    vectors, queries = data[:args.rows], data[args.rows:]
+    ids = list(range(args.rows))
+
+    exact = FlatIndex(args.dim, capacity=args.rows)
+    exact.add(ids, vectors)
+    truth, exact_ms = timed_search(exact, queries, args.k)
+    results = [{"index": "flat", "nprobe": None, "recall": 1.0,
+                "p50_ms": float(np.percentile(exact_ms, 50)), "p95_ms": float(np.percentile(exact_ms, 95))}]
+
+    start = time.perf_counter()
+    ivf = build_index(ids, vectors, ivf_threshold=0)
+    build_s = time.perf_counter() - start
+    assert isinstance(ivf, IVFIndex)
+    for nprobe in args.nprobe:
+        ivf.nprobe = nprobe
+        found, ms = timed_search(ivf, queries, args.k)
+        recall = np.mean([len(f & t) / args.k for f, t in zip(found, truth)])
+        results.append({"index": "ivf", "nprobe": nprobe, "recall": float(recall),
+                        "p50_ms": float(np.percentile(ms, 50)), "p95_ms": float(np.percentile(ms, 95))})
+
+    print(f"rows={args.rows} dim={args.dim} k={args.k} nlist={ivf.nlist} ivf_build={build_s:.1f}s")
+    print(f"{'index':<6}{'nprobe':>8}{'recall':>9}{'p50 ms':>9}{'p95 ms':>9}")
+    for r in results:
+        print(f"{r['index']:<6}{str(r['nprobe'] or '-'):>8}{r['recall']:>9.3f}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"params": vars(args), "ivf_build_s": build_s, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Local stand-ins for Groq, Supabase (REST + Auth) and Postgres.
+
+Each fake injects configurable latency and errors so the API can be load
+tested offline with realistic upstream behaviour.
+"""
+
+import json
+import time
+import uuid
+import random
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+import jwt
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+@dataclass
+class Upstream:
+    """Latency (seconds, uniform in mean*(1±jitter)) and error injection."""
+    latency: float = 0.0
+    jitter: float = 0.5
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+
+    def delay(self) -> float:
+        if self.latency <= 0:
+            return 0.0
+        return random.uniform(self.latency * (1 - self.jitter), self.latency * (1 + self.jitter))
+
+    def failure(self):
+        roll = random.random()
+        if roll < self.rate_limit_rate:
+            return JSONResponse({"error": "rate limited"}, status_code=429, headers={"Retry-After": "0"})
+        if roll < self.rate_limit_rate + self.error_rate:
+            return JSONResponse({"error": "injected failure"}, status_code=503)
+        return None
+
+
+LOREM = ("Consider roles in data engineering, analytics engineering and machine learning "
+         "operations, where your pipeline and cloud experience transfer directly. ").split()
+
+
+def fake_groq(cfg: Upstream, tokens: int = 120) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/openai/v1/chat/completions")
+    async def completions(request: Request):
+        payload = await request.json()
+        failure = cfg.failure()
+        if failure is not None:
+            await asyncio.sleep(cfg.delay() / 10)
+            return failure
+
+        words = [LOREM[i % len(LOREM)] for i in range(tokens)]
+        prompt_tokens = sum(len(m.get("content", "").split()) for m in payload.get("messages", []))
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": tokens, "total_tokens": prompt_tokens + tokens}
+        total = cfg.delay()
+
+        if not payload.get("stream"):
+            await asyncio.sleep(total)
+            return {
+                "id": uuid.uuid4().hex,
+                "model": payload.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": " ".join(words)}}],
+                "usage": usage,
+            }
+
+        async def body():
+            # Roughly a fifth of the latency before the first token, the rest spread over the stream.
+            await asyncio.sleep(total * 0.2)
+            per_token = total * 0.8 / max(len(words), 1)
+            for word in words:
+                chunk = {"choices": [{"index": 0, "delta": {"content": word + " "}}]}
+                yield f"data: {json.dumps(chunk)}\n\n"
+                await asyncio.sleep(per_token)
+            yield f"data: {json.dumps({'choices': [{'index': 0, 'delta': {}}], 'x_groq': {'usage': usage}})}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(body(), media_type="text/event-stream")
+
+    return app
+
+
+def fake_supabase(rest: Upstream, auth: Upstream) -> FastAPI:
+    """Just enough PostgREST and GoTrue surface for the API's queries."""
+    app = FastAPI()
+    tables = {"resumes": {}, "mock_interviews": []}
+
+    def _eq(request: Request, column: str):
+        value = request.query_params.get(column, "")
+        return value[3:] if value.startswith("eq.") else None
+
+    @app.get("/auth/v1/user")
+    async def user(request: Request):
+        await asyncio.sleep(auth.delay())
+        failure = auth.failure()
+        if failure is not None:
+            return failure
+        token = request.headers.get("authorization", "").removeprefix("Bearer ")
+        try:
+            claims = jwt.decode(token, options={"verify_signature": False})
+        except jwt.PyJWTError:
+            return JSONResponse({"msg": "invalid JWT"}, status_code=401)
+        return {"id": claims["sub"], "aud": "authenticated", "role": "authenticated"}
+
+    @app.get("/auth/v1/.well-known/jwks.json")
+    async def jwks():
+        return {"keys": []}
+
+    @app.get("/rest/v1/resumes")
+    async def select_resumes(request: Request):
+        await asyncio.sleep(rest.delay())
+        failure = rest.failure()
+        if failure is not None:
+            return failure
+        row = tables["resumes"].get(_eq(request, "user_id"))
+        return [row] if row else []
+
+    @app.post("/rest/v1/{table}")
+    async def insert(table: str, request: Request):
+        await asyncio.sleep(rest.delay())
+        failure = rest.failure()
+        if failure is not None:
+            return failure
+        body = await request.json()
+        rows = body if isinstance(body, list) else [body]
+        stored = []
+        for row in rows:
+            row = {"id": uuid.uuid4().hex, "created_at": time.time(), **row}
+            if table == "resumes":
+                existing = tables["resumes"].get(row["user_id"])
+                if existing:
+                    row["id"] = existing["id"]
+                tables["resumes"][row["user_id"]] = row
+            else:
+                tables.setdefault(table, []).append(row)
+            stored.append(row)
+        return JSONResponse(stored, status_code=201)
+
+    @app.patch("/rest/v1/{table}")
+    async def update(table: str, request: Request):
+        await asyncio.sleep(rest.delay())
+        body = await request.json()
+        row = tables["resumes"].get(_eq(request, "user_id")) if table == "resumes" else None
+        if row:
+            row.update(body)
+        return [row] if row else []
+
+    app.state.tables = tables
+    return app
+
+
+class FakeConnection:
+    def __init__(self, cfg: Upstream, rows):
+        self.cfg = cfg
+        self.rows = rows
+
+    async def fetch(self, query, *args):
+        await asyncio.sleep(self.cfg.delay())
+        limit = args[-1] if args and isinstance(args[-1], int) else len(self.rows)
+        return self.rows[:limit]
+
+    async def fetchval(self, query, *args):
+        await asyncio.sleep(self.cfg.delay())
+        return len(self.rows) + 1
+
+    async def execute(self, query, *args):
+        await asyncio.sleep(self.cfg.delay())
+        return "OK"
+
+    async def copy_to_table(self, table, **kwargs):
+        await asyncio.sleep(self.cfg.delay())
+        return "COPY"
+
+
+class FakePool:
+    """asyncpg.Pool stand-in serving canned job postings with a simulated
+    query latency and a bounded number of connections."""
+
+    def __init__(self, cfg: Upstream, size: int = 10, postings: int = 20):
+        self.cfg = cfg
+        self._slots = asyncio.Semaphore(size)
+        self.rows = [
+            {"id": i, "title": f"Posting {i}", "description": " ".join(LOREM[:25])} for i in range(postings)
+        ]
+
+    @asynccontextmanager
+    async def acquire(self):
+        async with self._slots:
+            yield FakeConnection(self.cfg, self.rows)
+
+    async def close(self):
+        pass
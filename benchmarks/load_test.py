@@ -0,0 +1,304 @@
+"""Offline load test for the FastAPI app against local Groq/Supabase/Postgres fakes.
+
+    python -m benchmarks.load_test --concurrency 1 8 32 --duration 20 --out bench.json
+
+Boots app.main:app with uvicorn, points it at the fakes from
+benchmarks.fakes, drives a weighted mix of upload / recommend / feedback /
+question / critique traffic at each concurrency level and reports
+p50/p95/p99 latency, throughput, error counts and event-loop lag of the
+API process. Results are written as JSON so runs can be diffed.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import argparse
+import tempfile
+import threading
+import subprocess
+from typing import Callable, Dict, List, Optional
+
+import fitz
+import httpx
+import jwt
+import numpy as np
+import uvicorn
+
+from benchmarks.fakes import FakePool, Upstream, fake_groq, fake_supabase
+
+JWT_SECRET = "benchmark-secret-benchmark-secret-benchmark"
+JOB_TITLES = ["Data Scientist", "data scientist ", "Backend Engineer", "Product Manager",
+              "ML Engineer", "DevOps Engineer", "Sr. Data Scientist", "Frontend Developer"]
+DEFAULT_MIX = "upload=1,recommend=2,feedback=2,question=3,critique=2"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class LagProbe:
+    """Measures how late a periodic timer fires on the server's event loop."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - expected) * 1000)
+
+    def reset(self) -> List[float]:
+        samples, self.samples = self.samples, []
+        return samples
+
+
+def serve_in_thread(app, port: int, probe: Optional[LagProbe] = None) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on"))
+
+    def run():
+        async def main():
+            tasks = [asyncio.create_task(server.serve())]
+            if probe is not None:
+                tasks.append(asyncio.create_task(probe.run()))
+            await tasks[0]
+            for task in tasks[1:]:
+                task.cancel()
+        asyncio.run(main())
+
+    threading.Thread(target=run, daemon=True).start()
+    deadline = time.time() + 20
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError(f"server on port {port} did not start")
+        time.sleep(0.05)
+    return server
+
+
+def make_pdf(text: str) -> bytes:
+    doc = fitz.open()
+    for page in range(2):
+        doc.new_page().insert_textbox(fitz.Rect(50, 50, 550, 800), f"{text}\nPage {page + 1}\n" + "Experience " * 80)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"p50": None, "p95": None, "p99": None, "max": None}
+    arr = np.array(values)
+    return {
+        "p50": round(float(np.percentile(arr, 50)), 2),
+        "p95": round(float(np.percentile(arr, 95)), 2),
+        "p99": round(float(np.percentile(arr, 99)), 2),
+        "max": round(float(arr.max()), 2),
+    }
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+class Traffic:
+    """One coroutine per operation; each returns (status, first-byte time or None)."""
+
+    def __init__(self, client: httpx.AsyncClient, users: int, stream: bool):
+        self.client = client
+        self.stream = stream
+        self.tokens = [
+            jwt.encode({"sub": f"bench-user-{i}", "aud": "authenticated", "exp": int(time.time()) + 86400},
+                       JWT_SECRET, algorithm="HS256")
+            for i in range(users)
+        ]
+        self.pdfs = [make_pdf(f"Candidate {i}: Python, SQL, cloud data pipelines") for i in range(min(users, 8))]
+
+    def _headers(self, i: int) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.tokens[i]}"}
+
+    async def _post_stream(self, url: str, headers):
+        """Returns (status, time of first body byte)."""
+        ttfb = None
+        async with self.client.stream("POST", url, headers=headers, params={"stream": "true"}) as resp:
+            async for _ in resp.aiter_bytes():
+                if ttfb is None:
+                    ttfb = time.perf_counter()
+            return resp.status_code, ttfb
+
+    async def upload(self, i: int):
+        pdf = self.pdfs[i % len(self.pdfs)]
+        resp = await self.client.post("/resume/upload", headers=self._headers(i),
+                                      files={"file": ("resume.pdf", pdf, "application/pdf")})
+        return resp.status_code, None
+
+    async def recommend(self, i: int):
+        if self.stream:
+            return await self._post_stream("/career/recommend", self._headers(i))
+        return (await self.client.post("/career/recommend", headers=self._headers(i))).status_code, None
+
+    async def feedback(self, i: int):
+        if self.stream:
+            return await self._post_stream("/resume_feedback/feedback", self._headers(i))
+        return (await self.client.post("/resume_feedback/feedback", headers=self._headers(i))).status_code, None
+
+    async def question(self, i: int):
+        resp = await self.client.get("/interview/question", headers=self._headers(i),
+                                     params={"job_title": random.choice(JOB_TITLES)})
+        return resp.status_code, None
+
+    async def critique(self, i: int):
+        resp = await self.client.post("/interview/critique", headers=self._headers(i), json={
+            "question": "Tell me about a time you improved a data pipeline.",
+            "answer": f"At my last job (attempt {random.randint(0, 10**6)}) I cut batch latency by 40%.",
+        })
+        return resp.status_code, None
+
+
+async def run_level(traffic: Traffic, mix: Dict[str, float], concurrency: int, duration: float,
+                    users: int, probe: LagProbe) -> dict:
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    ops: Dict[str, Callable] = {name: getattr(traffic, name) for name in names}
+    latencies = {name: [] for name in names}
+    ttfb = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    deadline = time.perf_counter() + duration
+    probe.reset()
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            name = random.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                status, first_byte = await ops[name](random.randrange(users))
+            except httpx.HTTPError:
+                status, first_byte = 599, None
+            end = time.perf_counter()
+            if status >= 400:
+                errors[name] += 1
+            else:
+                latencies[name].append((end - start) * 1000)
+                if first_byte is not None:
+                    ttfb[name].append((first_byte - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+
+    completed = sum(len(v) for v in latencies.values())
+    return {
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 2),
+        "requests": completed + sum(errors.values()),
+        "rps": round(completed / elapsed, 2),
+        "errors": sum(errors.values()),
+        "latency_ms": percentiles([x for v in latencies.values() for x in v]),
+        "operations": {
+            name: {"count": len(latencies[name]), "errors": errors[name], "latency_ms": percentiles(latencies[name]),
+                   **({"ttfb_ms": percentiles(ttfb[name])} if ttfb[name] else {})}
+            for name in names
+        },
+        "event_loop_lag_ms": percentiles(probe.reset()),
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=15, help="seconds per concurrency level")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"weighted operations (default: {DEFAULT_MIX})")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--stream", action="store_true", help="use ?stream=true for recommend/feedback")
+    parser.add_argument("--remote-auth", action="store_true", help="verify tokens via the fake /auth/v1/user")
+    parser.add_argument("--no-llm-cache", action="store_true")
+    parser.add_argument("--groq-latency", type=float, default=0.8)
+    parser.add_argument("--groq-error-rate", type=float, default=0.0)
+    parser.add_argument("--groq-429-rate", type=float, default=0.0)
+    parser.add_argument("--supabase-latency", type=float, default=0.03)
+    parser.add_argument("--auth-latency", type=float, default=0.05)
+    parser.add_argument("--db-latency", type=float, default=0.01)
+    parser.add_argument("--supabase-error-rate", type=float, default=0.0)
+    parser.add_argument("--out", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    groq_port, supabase_port, api_port = _free_port(), _free_port(), _free_port()
+    serve_in_thread(fake_groq(Upstream(args.groq_latency, error_rate=args.groq_error_rate,
+                                       rate_limit_rate=args.groq_429_rate)), groq_port)
+    serve_in_thread(fake_supabase(Upstream(args.supabase_latency, error_rate=args.supabase_error_rate),
+                                  Upstream(args.auth_latency)), supabase_port)
+
+    workdir = tempfile.mkdtemp(prefix="job-advisor-bench-")
+    os.environ.update({
+        "GROQ_API_KEY": "benchmark",
+        "GROQ_API_URL": f"http://127.0.0.1:{groq_port}/openai/v1/chat/completions",
+        "SUPABASE_URL": f"http://127.0.0.1:{supabase_port}",
+        "SUPABASE_KEY": "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoic2VydmljZV9yb2xlIn0.benchmark",
+        "JOBS_DB_PATH": os.path.join(workdir, "jobs.sqlite3"),
+    })
+    os.environ.pop("DATABASE_URL", None)
+    if not args.remote_auth:
+        os.environ["SUPABASE_JWT_SECRET"] = JWT_SECRET
+    else:
+        os.environ.pop("SUPABASE_JWT_SECRET", None)
+    if args.no_llm_cache:
+        os.environ["LLM_CACHE_MAX_ENTRIES"] = "0"
+
+    from app.main import app
+    from app.services import db_client
+    db_client._pool = FakePool(Upstream(args.db_latency))
+
+    probe = LagProbe()
+    serve_in_thread(app, api_port, probe)
+
+    async def drive():
+        limits = httpx.Limits(max_connections=max(args.concurrency) + 10)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{api_port}", timeout=120, limits=limits) as client:
+            traffic = Traffic(client, args.users, args.stream)
+            # Every user needs a stored resume before the generation endpoints make sense.
+            await asyncio.gather(*[traffic.upload(i) for i in range(args.users)])
+            results = []
+            for level in args.concurrency:
+                result = await run_level(traffic, parse_mix(args.mix), level, args.duration, args.users, probe)
+                lat = result["latency_ms"]
+                print(f"c={level:<4} rps={result['rps']:<8} p50={lat['p50']}ms p95={lat['p95']}ms "
+                      f"p99={lat['p99']}ms errors={result['errors']} "
+                      f"loop_lag_p99={result['event_loop_lag_ms']['p99']}ms", flush=True)
+                results.append(result)
+            return results
+
+    levels = asyncio.run(drive())
+    report = {
+        "revision": _git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": sys.version.split()[0],
+        "params": vars(args),
+        "levels": levels,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+# gunicorn.conf.py
+#
+# Pre-fork deployment: gunicorn -c gunicorn.conf.py app.main:app
+#
+# The app is imported once in the master (preload_app) and the embedding
+# model is loaded there before the workers are forked, so every worker
+# shares the weights copy-on-write instead of loading its own copy.
+
+import gc
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+
+EMBEDDING_PRELOAD = os.getenv("EMBEDDING_PRELOAD", "true").lower() in ("1", "true", "yes")
+
+
+def when_ready(server):
+    if EMBEDDING_PRELOAD:
+        from app.services import embeddings
+
+        # Load only; inference would start torch thread pools, which do not
+        # survive fork. Each worker runs its first encode in the lifespan.
+        embeddings.get_model()
+        server.log.info("Loaded embedding model %s in the master", embeddings.EMBEDDING_MODEL)
+    # Move everything allocated so far out of the collector's reach, so GC
+    # passes in the workers do not touch (and copy) the shared pages.
+    gc.freeze()
@@ -0,0 +1,138 @@
+# streamlit_app/backend.py
+#
+# HTTP side of the frontend: pooled session, SSE streaming, background jobs
+# and result memoization. No Streamlit imports, so it can be tested on its
+# own; main.py makes all st.* calls, on the script thread.
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterator
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+REQUEST_TIMEOUT = 15
+STREAM_TIMEOUT = (5, 120)
+
+
+class BackendBusy(Exception):
+    """The backend shed the request (429, or 503 with Retry-After)."""
+
+    def __init__(self, retry_after: str | None):
+        super().__init__(f"Backend busy; retry after {retry_after or 'a few'} seconds")
+        self.retry_after = retry_after
+
+
+class BackendError(Exception):
+    """The backend answered, but the generation failed."""
+
+
+def new_session() -> requests.Session:
+    """Keep-alive connection pool; idempotent GETs are retried on 502-504."""
+    session = requests.Session()
+    retry = Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504), allowed_methods=("GET",))
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def raise_for_status(res: requests.Response) -> None:
+    if res.status_code == 429 or (res.status_code == 503 and "Retry-After" in res.headers):
+        raise BackendBusy(res.headers.get("Retry-After"))
+    res.raise_for_status()
+
+
+def _headers(token: str, **extra) -> dict:
+    return {"Authorization": f"Bearer {token}", **extra}
+
+
+def iter_sse(res: requests.Response) -> Iterator[tuple[str | None, dict]]:
+    """Yield (event, data) pairs from a streaming SSE response."""
+    event = None
+    for line in res.iter_lines(decode_unicode=True):
+        if not line:
+            event = None
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            yield event, json.loads(line[len("data:"):].strip())
+
+
+def stream_tokens(
+    session: requests.Session,
+    url: str,
+    token: str,
+    on_done: Callable[[dict], None] | None = None,
+    **kwargs,
+) -> Iterator[str]:
+    """Yield tokens from an SSE endpoint (`?stream=true`) as they arrive.
+    The payload of the final "done" event goes to on_done."""
+    headers = _headers(token, Accept="text/event-stream")
+    with session.post(url, headers=headers, params={"stream": "true"}, stream=True,
+                      timeout=STREAM_TIMEOUT, **kwargs) as res:
+        raise_for_status(res)
+        for event, data in iter_sse(res):
+            if event == "error":
+                raise BackendError(data.get("detail", "Generation failed."))
+            if event == "done":
+                if on_done is not None:
+                    on_done(data)
+            elif "token" in data:
+                yield data["token"]
+
+
+def submit_job(session: requests.Session, url: str, token: str) -> dict:
+    """Queue a generation (`?background=true`); returns {job_id, status}."""
+    res = session.post(url, headers=_headers(token), params={"background": "true"}, timeout=REQUEST_TIMEOUT)
+    raise_for_status(res)
+    body = res.json()
+    if "error" in body:
+        raise BackendError(body["error"])
+    return body
+
+
+def poll_job(session: requests.Session, url: str, token: str) -> dict:
+    """Current state of a job: {status, result, error, ...}."""
+    res = session.get(url, headers=_headers(token), timeout=REQUEST_TIMEOUT)
+    raise_for_status(res)
+    body = res.json()
+    if body["status"] == "failed":
+        raise BackendError(body.get("error") or "Generation failed.")
+    return body
+
+
+class ResultMemo:
+    """Generated answers per (endpoint, resume checksum), kept for `ttl`
+    seconds. Only successful results are stored."""
+
+    def __init__(self, ttl: float, max_entries: int = 512, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, tuple[float, str]] = OrderedDict()
+
+    def get(self, path: str, checksum: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get((path, checksum))
+            if entry is None:
+                return None
+            if entry[0] <= self._clock():
+                del self._entries[(path, checksum)]
+                return None
+            self._entries.move_to_end((path, checksum))
+            return entry[1]
+
+    def set(self, path: str, checksum: str, value: str) -> None:
+        if not value:
+            return
+        with self._lock:
+            self._entries[(path, checksum)] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end((path, checksum))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
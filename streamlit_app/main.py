@@ -13,6 +13,9 @@ from supabase import create_client, Client
 
 # ════════════════ 1.  CONFIG  ══════════════════
 from config import API_BASE, SUPABASE_URL, SUPABASE_KEY
+from backend import (
+    BackendBusy, BackendError, ResultMemo, new_session, poll_job, raise_for_status, stream_tokens, submit_job,
+)
 
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5 MB
 
@@ -49,19 +52,60 @@ def refresh_token_if_needed() -> None:
         st.rerun()
 
 # ════════════════ 3.  BACKEND CALL WRAPPER ═════
+RESULT_CACHE_TTL = 3600   # seconds a generated answer is reused for the same resume
+JOB_TIMEOUT = 300
+
+# Every st.* call, cache lookups included, happens on the script thread;
+# backend.py does the HTTP work.
+@st.cache_resource
+def get_session() -> requests.Session:
+    """One keep-alive connection pool shared by every rerun and browser tab."""
+    return new_session()
+
+@st.cache_resource
+def get_memo() -> ResultMemo:
+    """Generated answers per (endpoint, resume checksum), across reruns and tabs."""
+    return ResultMemo(ttl=RESULT_CACHE_TTL)
+
+def _url(path: str) -> str:
+    return f"{API_BASE}/{path.lstrip('/')}"
+
+def _show_busy(e: BackendBusy) -> None:
+    """Friendly notice for the backend's 429 (admission control) or full job queue."""
+    st.warning(f"⏳ The advisor is busy right now. Please try again in {e.retry_after or 'a few'} seconds.")
+
 def call_backend(path: str, method: str = "POST", **kwargs):
     refresh_token_if_needed()
     headers = {"Authorization": f"Bearer {st.session_state.token}"}
-    url = f"{API_BASE}/{path.lstrip('/')}"
     try:
-        fn = requests.post if method.upper() == "POST" else requests.get
-        res = fn(url, headers=headers, timeout=15, **kwargs)
-        res.raise_for_status()
+        res = get_session().request(method.upper(), _url(path), headers=headers, timeout=15, **kwargs)
+        raise_for_status(res)
         return res.json()
+    except BackendBusy as e:
+        _show_busy(e)
+        return None
     except requests.exceptions.RequestException as e:
-        st.error(f"🌐 Network error: {e}")
+        st.error(f"🌐 Network error: {e}")
         return None
 
+def stream_backend(path: str, **kwargs):
+    """Yield tokens from an SSE endpoint (`?stream=true`) as they arrive.
+    The final "done" payload is left in st.session_state["stream_result"]."""
+    st.session_state["stream_result"] = None
+    refresh_token_if_needed()
+
+    def done(data: dict) -> None:
+        st.session_state["stream_result"] = data
+
+    try:
+        yield from stream_tokens(get_session(), _url(path), st.session_state.token, on_done=done, **kwargs)
+    except BackendBusy as e:
+        _show_busy(e)
+    except BackendError as e:
+        st.error(f"⚠️ {e}")
+    except requests.exceptions.RequestException as e:
+        st.error(f"🌐 Network error: {e}")
+
 # ════════════════ 4.  LOGIN  ═══════════════════
 if "token" not in st.session_state:
     if "auth_mode" not in st.session_state:
@@ -146,9 +190,16 @@ def handle_resume_upload():
     # --- only parse NEW files ---
     if checksum != st.session_state.get("resume_checksum"):
         st.session_state["resume_checksum"] = checksum
-        st.session_state["resume_data"] = parse_and_upload(bytes_data, file.name)
+        data = parse_and_upload(bytes_data, file.name)
+        st.session_state["resume_data"] = data
         st.session_state["resume_uploaded_name"] = file.name
-        st.toast("Resume uploaded & parsed! 🎉")
+        # Results for the previous resume no longer apply.
+        for key in ("career_suggestions", "resume_feedback", "pending_jobs"):
+            st.session_state.pop(key, None)
+        if data and data.get("unchanged"):
+            st.toast("Same resume as the one on file, nothing to re-process. 👍")
+        else:
+            st.toast("Resume uploaded & parsed! 🎉")
 
 # ════════════════ 8.  RESUME UPLOAD WIDGET ═════
 st.header("Upload Your Resume (PDF)")
@@ -167,6 +218,100 @@ if "resume_uploaded_name" in st.session_state:
 st.header("✨ Explore Our AI Services")
 st.caption("Pick a service to get started. Our AI will provide personalized insights based on your resume.")
 
+# Session key -> (backend path, field of the job result, heading).
+GENERATIONS = {
+    "career_suggestions": ("career/recommend", "recommendations", "🎯 Your AI‑Powered Career Roadmap"),
+    "resume_feedback": ("resume_feedback/feedback", "feedback", "📝 Detailed Resume Analysis"),
+}
+
+def stream_generation(key: str) -> None:
+    """Interactive: stream the answer into the page token by token, or show
+    the memoized one for this resume without calling the backend."""
+    path, _, title = GENERATIONS[key]
+    checksum = st.session_state["resume_checksum"]
+    st.subheader(title)
+    text = get_memo().get(path, checksum)
+    if text is not None:
+        st.markdown(text)
+    else:
+        text = st.write_stream(stream_backend(path))
+        # Only a stream that reached its "done" event is complete.
+        if st.session_state["stream_result"] is None:
+            return
+        get_memo().set(path, checksum, text)
+    st.session_state[key] = text
+
+def show_generation(key: str) -> None:
+    if key in st.session_state.get("pending_jobs", {}):
+        return
+    if text := st.session_state.get(key):
+        st.subheader(GENERATIONS[key][2])
+        st.markdown(text)
+
+def start_jobs() -> None:
+    """Bulk: queue every generation as a backend job (memoized ones are
+    shown right away); show_jobs polls them."""
+    refresh_token_if_needed()
+    checksum = st.session_state["resume_checksum"]
+    pending = st.session_state.setdefault("pending_jobs", {})
+    for key, (path, _, _) in GENERATIONS.items():
+        if key in pending:
+            continue
+        text = get_memo().get(path, checksum)
+        if text is not None:
+            st.session_state[key] = text
+            continue
+        try:
+            job = submit_job(get_session(), _url(path), st.session_state.token)
+        except BackendBusy as e:
+            _show_busy(e)
+            return
+        except BackendError as e:
+            st.error(f"⚠️ {e}")
+            return
+        except requests.exceptions.RequestException as e:
+            st.error(f"🌐 Network error: {e}")
+            return
+        pending[key] = {"job_id": job["job_id"], "status": job["status"], "checksum": checksum,
+                        "deadline": time.monotonic() + JOB_TIMEOUT}
+
+@st.fragment(run_every=1)
+def show_jobs() -> None:
+    """Poll the pending jobs (one quick GET each per tick) and store their
+    results; the page reruns once something has finished."""
+    pending = st.session_state.get("pending_jobs", {})
+    finished = False
+    for key, job in list(pending.items()):
+        path, field, title = GENERATIONS[key]
+        try:
+            body = poll_job(get_session(), _url(f"jobs/{job['job_id']}"), st.session_state.token)
+        except BackendError as e:
+            del pending[key]
+            st.error(f"⚠️ {e}")
+            continue
+        except (BackendBusy, requests.exceptions.RequestException):
+            body = job  # Try again on the next tick.
+        if body["status"] == "succeeded":
+            del pending[key]
+            get_memo().set(path, job["checksum"], body["result"][field])
+            st.session_state[key] = body["result"][field]
+            finished = True
+        elif time.monotonic() > job["deadline"]:
+            del pending[key]
+            st.error(f"⚠️ {title}: the backend did not finish in time.")
+        else:
+            job["status"] = body["status"]
+            st.info(f"⏳ {title}: {body['status']}…")
+    if finished:
+        st.rerun()
+
+if st.button("⚡ Run Full Analysis", help="Career paths and resume feedback in one go"):
+    if "resume_data" not in st.session_state:
+        st.warning("Upload a resume first! ☝️")
+    else:
+        start_jobs()
+show_jobs()
+
 tab_titles = ["🧭 Career Path Finder", "📝 Resume Reviewer", "💬 Mock Interview Practice"]
 tab1, tab2, tab3 = st.tabs(tab_titles)
 
@@ -176,21 +321,9 @@ with tab1:
         if "resume_data" not in st.session_state:
             st.warning("Upload a resume first! ☝️")
         else:
-            progress = st.progress(0, text="🧠 Analyzing possibilities with Groq AI...")
-            for i in range(3):
-                time.sleep(0.35)
-                progress.progress((i + 1) / 3)
-            data = call_backend(
-                "career/recommend",
-                json={"parsed_resume": st.session_state["resume_data"]},
-            )
-            progress.empty()
-            if data:
-                st.session_state["career_suggestions"] = data["recommendations"]
-
-    if suggestions := st.session_state.get("career_suggestions"):
-        st.subheader("🎯 Your AI‑Powered Career Roadmap")
-        st.markdown(suggestions)
+            stream_generation("career_suggestions")
+    else:
+        show_generation("career_suggestions")
 
 # ---- 9‑B Resume feedback ----
 with tab2:
@@ -198,21 +331,9 @@ with tab2:
         if "resume_data" not in st.session_state:
             st.warning("Upload a resume first! ☝️")
         else:
-            progress = st.progress(0, text="🔎 Reviewing your resume line by line...")
-            for i in range(3):
-                time.sleep(0.35)
-                progress.progress((i + 1) / 3)
-            data = call_backend(
-                "resume_feedback/feedback",
-                json={"parsed_resume": st.session_state["resume_data"]},
-            )
-            progress.empty()
-            if data:
-                st.session_state["resume_feedback"] = data["feedback"]
-
-    if feedback := st.session_state.get("resume_feedback"):
-        st.subheader("📝 Detailed Resume Analysis")
-        st.markdown(feedback)
+            stream_generation("resume_feedback")
+    else:
+        show_generation("resume_feedback")
 
 # ---- 9‑C Mock interview ----
 with tab3:
@@ -233,16 +354,11 @@ with tab3:
         answer = st.text_area("Your answer", value=st.session_state.get("interview_a", ""))
         st.session_state["interview_a"] = answer
         if st.button("📊 Submit for critique") and answer.strip():
-            progress = st.progress(0, text="🧠 Reviewing your answer...")
-            for i in range(3):
-                time.sleep(0.35)
-                progress.progress((i + 1) / 3)
-            data = call_backend(
+            st.subheader("📝 AI Feedback")
+            st.write_stream(stream_backend(
                 "interview/critique",
                 json={"question": q, "answer": answer},
-            )
-            progress.empty()
-            if data:
-                st.subheader("📝 AI Feedback")
-                st.markdown(data["critique"])
-                st.success(f"Score: {data['score']} / 10")
+            ))
+            score = (st.session_state["stream_result"] or {}).get("score")
+            if score is not None:
+                st.success(f"Score: {score} / 10")
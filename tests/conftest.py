@@ -0,0 +1,9 @@
+import os
+
+# Dummy credentials so service modules can be imported without a real .env.
+os.environ.setdefault("GROQ_API_KEY", "test-groq-key")
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.test")
+# Tests reuse one user id across many requests; keep admission control out of the way.
+os.environ.setdefault("ADMISSION_USER_BURST", "1000")
+os.environ.setdefault("ADMISSION_GLOBAL_BURST", "1000")
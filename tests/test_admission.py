@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import admission
+from app.core.admission import BULK, INTERACTIVE, AdmissionController, AdmissionRejected, TokenBucket
+from app.main import app
+from app.api.deps import get_current_user
+from app.api.endpoints import interview
+
+
+def test_token_bucket_refills_at_rate():
+    bucket = TokenBucket(rate=2, burst=2)
+    now = bucket.updated
+    assert bucket.try_take(now=now) and bucket.try_take(now=now)
+    assert not bucket.try_take(now=now)
+    assert bucket.wait_time(now=now) == pytest.approx(0.5)
+    assert bucket.try_take(now=now + 0.5)
+
+
+def test_user_over_budget_is_rejected_without_queueing():
+    async def scenario():
+        controller = AdmissionController(user_rate=0.5, user_burst=2)
+        await controller.acquire("alice")
+        await controller.acquire("alice")
+        with pytest.raises(AdmissionRejected) as exc:
+            await controller.acquire("alice")
+        # Other users keep their own budget.
+        await controller.acquire("bob")
+        return exc.value
+
+    rejected = asyncio.run(scenario())
+    assert rejected.reason == "user_rate"
+    assert rejected.retry_after == pytest.approx(2, abs=0.1)
+
+
+def test_interactive_requests_jump_the_queue():
+    async def scenario():
+        controller = AdmissionController(global_rate=20, global_burst=1, max_wait=2)
+        await controller.acquire("warmup")
+        order = []
+
+        async def request(user, priority):
+            await controller.acquire(user, priority)
+            order.append(user)
+
+        bulk = [asyncio.ensure_future(request(f"bulk-{i}", BULK)) for i in range(3)]
+        await asyncio.sleep(0)
+        critique = asyncio.ensure_future(request("critique", INTERACTIVE))
+        await asyncio.gather(*bulk, critique)
+        return order
+
+    assert asyncio.run(scenario())[0] == "critique"
+
+
+def test_full_queue_and_long_waits_are_shed_fast():
+    async def scenario():
+        controller = AdmissionController(global_rate=1, global_burst=1, queue_size=1, max_wait=5)
+        await controller.acquire("a")
+        queued = asyncio.ensure_future(controller.acquire("b"))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as full:
+            await controller.acquire("c")
+        queued.cancel()
+        await asyncio.gather(queued, return_exceptions=True)
+
+        slow = AdmissionController(global_rate=1, global_burst=1, max_wait=0.5)
+        await slow.acquire("a")
+        with pytest.raises(AdmissionRejected) as exceeded:
+            await slow.acquire("b")
+        return full.value, exceeded.value, controller.queue_depth()
+
+    full, exceeded, depth = asyncio.run(scenario())
+    assert full.reason == "queue_full" and full.retry_after >= 1
+    assert exceeded.reason == "wait_exceeded"
+    assert depth == 0
+
+
+def test_rejected_request_gets_429_with_retry_after(monkeypatch):
+    async def fake_completion(route, messages):
+        return "Fine.\nScore: 7/10"
+
+    monkeypatch.setattr(admission, "controller", AdmissionController(user_rate=0.1, user_burst=1))
+    monkeypatch.setattr(interview, "routed_completion", fake_completion)
+    monkeypatch.setattr(interview.mock_interviews, "record", lambda *args: None)
+    app.dependency_overrides[get_current_user] = lambda: {"id": "user-1"}
+    try:
+        client = TestClient(app)
+        payload = {"question": "Q?", "answer": "A."}
+        assert client.post("/interview/critique", json=payload).status_code == 200
+        resp = client.post("/interview/critique", json=payload)
+    finally:
+        app.dependency_overrides.clear()
+
+    assert resp.status_code == 429
+    assert resp.headers["Retry-After"] == "10"
@@ -0,0 +1,101 @@
+import asyncio
+import json
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api.deps import get_current_user
+from app.api import etag
+from app.api.endpoints import analysis
+from app.core import admission
+from app.services.groq_service import GroqServiceError
+
+DELAYS = {"career": 0.3, "resume": 0.1, "technical": 0.2}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fetches = []
+
+    async def fake_resume(user_id):
+        fetches.append(user_id)
+        return {"content": "Python developer", "revision": 1, "content_hash": "a"}
+
+    async def fake_completion(messages, prompt_version=None, route=None):
+        system = messages[0]["content"]
+        kind = next(k for k in DELAYS if k in system)
+        await asyncio.sleep(DELAYS[kind])
+        return kind
+
+    monkeypatch.setattr(etag, "get_latest_resume_by_user", fake_resume)
+    monkeypatch.setattr(analysis, "cached_chat_completion", fake_completion)
+    app.dependency_overrides[get_current_user] = lambda: {"id": "user-1"}
+    yield TestClient(app), fetches
+    app.dependency_overrides.clear()
+
+
+def test_full_analysis_runs_sections_concurrently(client):
+    http, fetches = client
+    start = time.perf_counter()
+    resp = http.post("/analysis/full", json={"job_title": "Data Scientist"})
+    elapsed = time.perf_counter() - start
+
+    assert resp.json() == {"recommendations": "career", "feedback": "resume", "question": "technical", "errors": {}}
+    assert fetches == ["user-1"]
+    assert elapsed < sum(DELAYS.values())
+
+
+def test_streamed_sections_arrive_in_completion_order(client):
+    http, _ = client
+    resp = http.post("/analysis/full?stream=true", json={"job_title": "Data Scientist"})
+    sections = [
+        json.loads(line[len("data: "):])["section"]
+        for line in resp.text.splitlines()
+        if line.startswith("data: ") and "section" in line
+    ]
+    assert sections == ["feedback", "question", "recommendations"]
+
+
+def test_conditional_request_is_answered_before_admission(client, monkeypatch):
+    http, _ = client
+    first = http.post("/analysis/full", json={"job_title": "Data Scientist"})
+    tag = first.headers["ETag"]
+
+    async def refuse(*args, **kwargs):
+        raise admission.AdmissionRejected("user_rate", 5)
+
+    monkeypatch.setattr(admission.controller, "acquire", refuse)
+    again = http.post("/analysis/full", json={"job_title": "Data Scientist"}, headers={"If-None-Match": tag})
+    assert again.status_code == 304
+    # The job title is part of the tag.
+    other = http.post("/analysis/full", json={"job_title": "Nurse"}, headers={"If-None-Match": tag})
+    assert other.status_code == 429
+
+
+def test_retrieval_does_not_delay_the_other_sections(client, monkeypatch):
+    http, _ = client
+
+    async def slow_postings(job_title):
+        await asyncio.sleep(0.2)
+        return []
+
+    monkeypatch.setattr(analysis, "similar_postings", slow_postings)
+    resp = http.post("/analysis/full?stream=true", json={"job_title": "Data Scientist"})
+    sections = [
+        json.loads(line[len("data: "):])["section"]
+        for line in resp.text.splitlines()
+        if line.startswith("data: ") and "section" in line
+    ]
+    # Career and feedback start right away; only the question waits for retrieval.
+    assert sections == ["feedback", "recommendations", "question"]
+
+
+def test_failed_section_hides_groq_details(client, monkeypatch):
+    http, _ = client
+
+    async def failing(messages, prompt_version=None, route=None):
+        raise GroqServiceError("Groq API error 401: invalid api key gsk_123", 401)
+
+    monkeypatch.setattr(analysis, "cached_chat_completion", failing)
+    errors = http.post("/analysis/full", json={}).json()["errors"]
+    assert errors == {"recommendations": GroqServiceError.PUBLIC_MESSAGE, "feedback": GroqServiceError.PUBLIC_MESSAGE}
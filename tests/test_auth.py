@@ -0,0 +1,67 @@
+import asyncio
+import time
+import jwt
+import pytest
+from app.services import auth
+
+SECRET = "test-jwt-secret-with-enough-length-for-hs256"
+
+
+def _token(secret=SECRET, **claims):
+    payload = {"sub": "user-1", "aud": "authenticated", "exp": int(time.time()) + 3600, **claims}
+    return jwt.encode(payload, secret, algorithm="HS256")
+
+
+@pytest.fixture
+def remote(monkeypatch):
+    calls = []
+
+    async def fake_get_user(token):
+        calls.append(token)
+        return {"id": "user-1"}
+
+    monkeypatch.setattr(auth.supabase_client, "get_user_from_token", fake_get_user)
+    auth._token_cache.clear()
+    return calls
+
+
+def test_local_verification_with_project_secret(monkeypatch, remote):
+    monkeypatch.setattr(auth, "SUPABASE_JWT_SECRET", SECRET)
+
+    user = asyncio.run(auth.verify_token(_token(email="a@b.c")))
+    assert user["id"] == "user-1" and user["email"] == "a@b.c"
+    assert asyncio.run(auth.verify_token(_token(exp=int(time.time()) - 60))) is None
+    assert asyncio.run(auth.verify_token(_token(aud="anon"))) is None
+    assert asyncio.run(auth.verify_token(_token(secret="wrong-secret-wrong-secret-wrong-secret"))) is None
+    assert remote == []
+
+
+def test_remote_fallback_is_cached_until_token_expiry(monkeypatch, remote):
+    monkeypatch.setattr(auth, "SUPABASE_JWT_SECRET", None)
+    exp = int(time.time()) + 30
+    token = _token(exp=exp)
+
+    asyncio.run(auth.verify_token(token))
+    asyncio.run(auth.verify_token(token))
+    assert len(remote) == 1
+    expires_at, _ = next(iter(auth._token_cache.values()))
+    assert expires_at <= exp
+
+    monkeypatch.setattr(auth.time, "time", lambda: exp + 1)
+    asyncio.run(auth.verify_token(token))
+    assert len(remote) == 2
+
+
+def test_placeholder_secret_is_not_trusted(monkeypatch, remote):
+    assert auth._jwt_secret("your-supabase-jwt-secret") is None
+    assert auth._jwt_secret("") is None
+    assert auth._jwt_secret(SECRET) == SECRET
+
+    monkeypatch.setattr(auth, "SUPABASE_JWT_SECRET", auth._jwt_secret("your-supabase-jwt-secret"))
+    monkeypatch.setattr(auth, "_jwks", {})
+    forged = _token(secret="your-supabase-jwt-secret", sub="someone-else")
+    with pytest.raises(auth._NoVerificationKey):
+        auth.verify_locally(forged)
+    # The forged token goes to Supabase Auth instead of being accepted locally.
+    asyncio.run(auth.verify_token(forged))
+    assert remote == [forged]
@@ -0,0 +1,40 @@
+import asyncio
+import numpy as np
+import pytest
+from app.services import embeddings
+
+
+class FakeModel:
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, **kwargs):
+        self.calls.append(list(texts))
+        return np.array([[len(t)] * embeddings.EMBEDDING_DIM for t in texts], dtype=np.float64)
+
+
+@pytest.fixture
+def model(monkeypatch):
+    fake = FakeModel()
+    monkeypatch.setattr(embeddings, "_model", fake)
+    embeddings._cache.clear()
+    yield fake
+    embeddings._cache.clear()
+
+
+def test_embed_many_batches_and_caches(model):
+    out = embeddings.embed_many(["a", "bb", "a"])
+    assert out.dtype == np.float32 and out.shape == (3, embeddings.EMBEDDING_DIM)
+    assert model.calls == [["a", "bb", "a"]]
+
+    embeddings.embed_many(["bb", "ccc"])
+    assert model.calls[-1] == ["ccc"]
+
+
+def test_concurrent_async_requests_are_micro_batched(model):
+    async def run():
+        return await asyncio.gather(*[embeddings.aembed_text(t) for t in ["x", "yy", "zzz"]])
+
+    vectors = asyncio.run(run())
+    assert [v[0] for v in vectors] == [1, 2, 3]
+    assert model.calls == [["x", "yy", "zzz"]]
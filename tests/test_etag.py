@@ -0,0 +1,111 @@
+import hashlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.api import etag
+from app.api.deps import get_current_user
+from app.core import admission
+from app.api.endpoints import career, resume
+
+PDF = b"%PDF-1.4 resume"
+
+
+async def _refuse(*args, **kwargs):
+    raise admission.AdmissionRejected("user_rate", 5)
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_current_user] = lambda: {"id": "user-1"}
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_identical_upload_skips_parsing_and_writes(client, monkeypatch):
+    async def meta(user_id):
+        return {"id": "resume-1", "content_hash": hashlib.sha256(PDF).hexdigest(), "revision": 3}
+
+    async def must_not_run(*args, **kwargs):
+        raise AssertionError("an unchanged upload must not be parsed or written")
+
+    monkeypatch.setattr(resume, "get_resume_meta", meta)
+    monkeypatch.setattr(resume, "extract_pdf_pages", must_not_run)
+    monkeypatch.setattr(resume, "upsert_resume", must_not_run)
+
+    resp = client.post("/resume/upload", files={"file": ("cv.pdf", PDF, "application/pdf")})
+    assert resp.json() == {"resume_id": "resume-1", "message": "Resume unchanged", "revision": 3, "unchanged": True}
+
+
+def test_changed_upload_bumps_revision_and_stores_hash(client, monkeypatch):
+    written = {}
+
+    async def meta(user_id):
+        return {"id": "resume-1", "content_hash": "old", "revision": 3}
+
+    async def pages(file_bytes):
+        return ["Jane Doe\nSkills\nPython"]
+
+    async def upsert(**row):
+        written.update(row)
+        return "resume-1"
+
+    monkeypatch.setattr(resume, "get_resume_meta", meta)
+    monkeypatch.setattr(resume, "extract_pdf_pages", pages)
+    monkeypatch.setattr(resume, "upsert_resume", upsert)
+
+    resp = client.post("/resume/upload", files={"file": ("cv.pdf", PDF, "application/pdf")})
+    assert resp.json()["revision"] == 4 and resp.json()["unchanged"] is False
+    assert written["revision"] == 4
+    assert written["content_hash"] == hashlib.sha256(PDF).hexdigest()
+
+
+def test_generation_etag_and_conditional_request(client, monkeypatch):
+    calls = []
+    row = {"content": "Python developer", "revision": 2, "content_hash": "a"}
+
+    async def fake_resume(user_id):
+        calls.append("supabase")
+        return dict(row)
+
+    async def fake_completion(messages, prompt_version=None, route=None):
+        calls.append("groq")
+        return "Data engineer"
+
+    monkeypatch.setattr(etag, "get_latest_resume_by_user", fake_resume)
+    monkeypatch.setattr(career, "cached_chat_completion", fake_completion)
+
+    first = client.post("/career/recommend")
+    tag = first.headers["ETag"]
+    assert first.json() == {"recommendations": "Data engineer"}
+
+    again = client.post("/career/recommend", headers={"If-None-Match": tag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == tag
+    # The tag is checked against the row just fetched; no completion is made.
+    assert calls == ["supabase", "groq", "supabase"]
+
+    # A new upload, seen on whichever worker answers, invalidates the tag.
+    row.update(revision=3, content_hash="b")
+    fresh = client.post("/career/recommend", headers={"If-None-Match": tag})
+    assert fresh.status_code == 200
+    assert fresh.headers["ETag"] != tag
+
+
+def test_conditional_request_skips_admission(client, monkeypatch):
+    async def fake_resume(user_id):
+        return {"content": "Python developer", "revision": 2, "content_hash": "a"}
+
+    monkeypatch.setattr(etag, "get_latest_resume_by_user", fake_resume)
+    tag = etag.make_etag(2, "a", etag.prompt_version("career_recommendation.md"))
+    # Admission would refuse this user outright.
+    monkeypatch.setattr(admission.controller, "acquire", _refuse)
+
+    resp = client.post("/career/recommend", headers={"If-None-Match": tag})
+    assert resp.status_code == 304
+
+
+def test_etag_depends_on_prompt_version():
+    assert etag.make_etag(1, "v1") != etag.make_etag(1, "v2")
+    assert etag.make_etag(1, "v1") != etag.make_etag(2, "v1")
@@ -0,0 +1,128 @@
+import asyncio
+import email.utils
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from app.services import groq_service
+
+
+def _ok(content="hello"):
+    return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(groq_service.asyncio, "sleep", fake_sleep)
+    return delays
+
+
+def _run_with_transport(handler, messages=None):
+    async def run():
+        await groq_service.init_client(transport=httpx.MockTransport(handler))
+        try:
+            return await groq_service.chat_completion(messages or [{"role": "user", "content": "hi"}])
+        finally:
+            await groq_service.close_client()
+    return asyncio.run(run())
+
+
+def test_retries_on_429_and_honors_retry_after(no_sleep):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) < 3:
+            return httpx.Response(429, headers={"Retry-After": "2"})
+        return _ok()
+
+    assert _run_with_transport(handler) == "hello"
+    assert len(calls) == 3
+    assert no_sleep == [2.0, 2.0]
+
+
+def test_retry_after_is_honoured_beyond_backoff_cap_and_as_http_date(no_sleep):
+    when = email.utils.format_datetime(datetime.now(timezone.utc) + timedelta(seconds=20), usegmt=True)
+    responses = iter([
+        httpx.Response(429, headers={"Retry-After": "12"}),
+        httpx.Response(503, headers={"Retry-After": when}),
+        _ok(),
+    ])
+
+    assert _run_with_transport(lambda request: next(responses)) == "hello"
+    assert no_sleep[0] == 12.0
+    assert 15 < no_sleep[1] <= 20
+
+
+def test_too_long_retry_after_is_returned_to_the_caller(no_sleep):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(429, headers={"Retry-After": "3600"})
+
+    with pytest.raises(groq_service.GroqServiceError) as exc:
+        _run_with_transport(handler)
+    assert exc.value.retry_after == 3600
+    assert len(calls) == 1 and no_sleep == []
+
+
+def test_backoff_does_not_hold_a_concurrency_slot(monkeypatch):
+    held = []
+
+    async def fake_sleep(delay):
+        held.append(groq_service._semaphore.locked())
+
+    monkeypatch.setattr(groq_service, "GROQ_MAX_CONCURRENCY", 1)
+    monkeypatch.setattr(groq_service.asyncio, "sleep", fake_sleep)
+    responses = iter([httpx.Response(503), _ok()])
+
+    assert _run_with_transport(lambda request: next(responses)) == "hello"
+    assert held == [False]
+
+
+def test_non_retryable_status_raises_immediately():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(400, text="bad request")
+
+    with pytest.raises(groq_service.GroqServiceError) as exc:
+        _run_with_transport(handler)
+    assert exc.value.status_code == 400
+    assert len(calls) == 1
+
+
+def test_gives_up_after_max_retries(no_sleep):
+    def handler(request):
+        raise httpx.ConnectError("boom", request=request)
+
+    with pytest.raises(groq_service.GroqServiceError):
+        _run_with_transport(handler)
+    assert len(no_sleep) == groq_service.GROQ_MAX_RETRIES
+    assert all(0 <= d <= groq_service.GROQ_BACKOFF_MAX for d in no_sleep)
+
+
+def test_stream_chat_completion_parses_sse_chunks():
+    def chunk(text):
+        return 'data: {"choices": [{"delta": {"content": "%s"}}]}\n\n' % text
+
+    body = chunk("Hel") + chunk("lo") + 'data: {"choices": [{"delta": {}}]}\n\n' + "data: [DONE]\n\n"
+
+    def handler(request):
+        return httpx.Response(200, text=body, headers={"Content-Type": "text/event-stream"})
+
+    async def run():
+        await groq_service.init_client(transport=httpx.MockTransport(handler))
+        try:
+            return [t async for t in groq_service.stream_chat_completion([{"role": "user", "content": "hi"}])]
+        finally:
+            await groq_service.close_client()
+
+    assert asyncio.run(run()) == ["Hel", "lo"]
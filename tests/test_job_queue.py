@@ -0,0 +1,115 @@
+import asyncio
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+
+import pytest
+from app.services import job_queue
+
+
+@pytest.fixture
+def handler():
+    calls = []
+
+    async def run(params):
+        calls.append(params)
+        await asyncio.sleep(0.01)
+        if params.get("fail"):
+            raise ValueError("bad input")
+        return {"echo": params["text"]}
+
+    job_queue.register("echo", run)
+    return calls
+
+
+async def _wait(job_id):
+    for _ in range(100):
+        job = await job_queue.get_job(job_id)
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+def test_jobs_run_in_background_and_deduplicate(tmp_path, handler):
+    async def run():
+        await job_queue.start(str(tmp_path / "jobs.sqlite3"), workers=2)
+        try:
+            first, second = await asyncio.gather(
+                job_queue.submit("u1", "echo", {"text": "hi"}),
+                job_queue.submit("u1", "echo", {"text": "hi"}),
+            )
+            other_user = await job_queue.submit("u2", "echo", {"text": "hi"})
+            failing = await job_queue.submit("u1", "echo", {"text": "x", "fail": True})
+            assert first["id"] == second["id"] != other_user["id"]
+            done = await _wait(first["id"])
+            failed = await _wait(failing["id"])
+            again = await job_queue.submit("u1", "echo", {"text": "hi"})
+            return done, failed, again
+        finally:
+            await job_queue.stop()
+
+    done, failed, again = asyncio.run(run())
+    assert done["result"] == {"echo": "hi"}
+    assert failed["status"] == "failed" and failed["error"] == "bad input"
+    assert again["id"] == done["id"]
+    assert len(handler) == 3
+
+
+def test_pending_jobs_are_marked_failed_after_restart(tmp_path, handler):
+    path = str(tmp_path / "jobs.sqlite3")
+    store = job_queue.JobStore(path)
+    job = store.create("u1", "echo", "key")
+    store.close()
+
+    async def run():
+        await job_queue.start(path, workers=1)
+        try:
+            return await job_queue.get_job(job["id"])
+        finally:
+            await job_queue.stop()
+
+    assert asyncio.run(run())["status"] == "failed"
+
+
+def test_restart_leaves_jobs_of_live_sibling_workers_alone(tmp_path, handler):
+    path = str(tmp_path / "jobs.sqlite3")
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    store = job_queue.JobStore(path)
+    orphan = store.create("u1", "echo", "a")
+    sibling = store.create("u1", "echo", "b")
+    store._execute("UPDATE jobs SET owner = ? WHERE id = ?", (str(dead.pid), orphan["id"]))
+    store._execute("UPDATE jobs SET owner = ?, status = 'running' WHERE id = ?", (str(os.getppid()), sibling["id"]))
+    store.close()
+
+    async def run():
+        await job_queue.start(path, workers=1)
+        try:
+            return [await job_queue.get_job(job["id"]) for job in (orphan, sibling)]
+        finally:
+            await job_queue.stop()
+
+    orphan, sibling = asyncio.run(run())
+    assert orphan["status"] == "failed"
+    assert sibling["status"] == "running"
+
+
+def test_store_adds_owner_column_to_an_existing_database(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE jobs (id TEXT PRIMARY KEY, user_id TEXT NOT NULL, kind TEXT NOT NULL, dedup_key TEXT NOT NULL, "
+        "status TEXT NOT NULL, result TEXT, error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+    )
+    conn.execute("INSERT INTO jobs VALUES ('old', 'u1', 'echo', 'k', 'queued', NULL, NULL, 0, ?)", (time.time(),))
+    conn.commit()
+    conn.close()
+
+    store = job_queue.JobStore(path)
+    store.recover()
+    assert store.get("old")["status"] == "failed"
+    assert store.create("u1", "echo", "k2")["owner"] == str(os.getpid())
+    store.close()
@@ -0,0 +1,94 @@
+import asyncio
+import pytest
+from app.services import llm_cache
+
+MESSAGES = [{"role": "user", "content": "Suggest careers"}]
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    llm_cache.clear()
+    yield
+    llm_cache.clear()
+    llm_cache.close_disk_cache()
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    calls = []
+
+    async def fake_completion(messages, model, temperature):
+        calls.append(messages)
+        await asyncio.sleep(0.01)
+        return f"answer {len(calls)}"
+
+    monkeypatch.setattr(llm_cache.groq_service, "chat_completion", fake_completion)
+    return calls
+
+
+def test_concurrent_identical_requests_share_one_upstream_call(upstream):
+    async def run():
+        return await asyncio.gather(*[
+            llm_cache.cached_chat_completion(MESSAGES, prompt_version="v1") for _ in range(5)
+        ])
+
+    assert asyncio.run(run()) == ["answer 1"] * 5
+    assert len(upstream) == 1
+    assert llm_cache.cache_stats()["coalesced"] == 4
+
+
+def test_prompt_version_is_part_of_the_key(upstream):
+    asyncio.run(llm_cache.cached_chat_completion(MESSAGES, prompt_version="v1"))
+    asyncio.run(llm_cache.cached_chat_completion(MESSAGES, prompt_version="v1"))
+    asyncio.run(llm_cache.cached_chat_completion(MESSAGES, prompt_version="v2"))
+    stats = llm_cache.cache_stats()
+    assert len(upstream) == 2
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+def test_lru_evicts_by_entries_bytes_and_ttl(monkeypatch):
+    cache = llm_cache.LRUCache(max_entries=2, max_bytes=10, ttl=60)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+    assert cache.get("b") is None and cache.get("a") == "1"
+
+    cache.set("big", "x" * 10)
+    assert len(cache) == 1
+
+    now = llm_cache.time.monotonic()
+    monkeypatch.setattr(llm_cache.time, "monotonic", lambda: now + 120)
+    assert cache.get("big") is None
+
+
+def test_disk_tier_survives_memory_loss(tmp_path, upstream):
+    llm_cache.open_disk_cache(str(tmp_path / "cache.sqlite"))
+    asyncio.run(llm_cache.cached_chat_completion(MESSAGES))
+    llm_cache.clear()
+    assert asyncio.run(llm_cache.cached_chat_completion(MESSAGES)) == "answer 1"
+    assert llm_cache.cache_stats()["disk_hits"] == 1
+
+
+def test_empty_answers_are_not_cached(monkeypatch):
+    calls = []
+
+    async def empty_completion(messages, model, temperature):
+        calls.append(messages)
+        return ""
+
+    async def empty_stream(messages, model, temperature):
+        calls.append(messages)
+        for token in ():
+            yield token
+
+    async def collect():
+        return [token async for token in llm_cache.cached_stream_chat_completion(MESSAGES, prompt_version="s")]
+
+    monkeypatch.setattr(llm_cache.groq_service, "chat_completion", empty_completion)
+    monkeypatch.setattr(llm_cache.groq_service, "stream_chat_completion", empty_stream)
+    for _ in range(2):
+        assert asyncio.run(llm_cache.cached_chat_completion(MESSAGES, prompt_version="v1")) == ""
+        assert asyncio.run(collect()) == []
+    assert len(calls) == 4
+    assert llm_cache.cache_stats()["hits"] == 0
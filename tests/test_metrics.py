@@ -0,0 +1,99 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import metrics
+from app.services import groq_service
+
+
+def test_histogram_renders_cumulative_buckets():
+    hist = metrics.Histogram("test_latency_seconds", "Test histogram.", ("stage",), buckets=(0.1, 1))
+    hist.observe(0.05, stage="a")
+    hist.observe(0.5, stage="a")
+    hist.observe(5, stage="a")
+    lines = hist.render()
+    assert 'test_latency_seconds_bucket{stage="a",le="0.1"} 1' in lines
+    assert 'test_latency_seconds_bucket{stage="a",le="1"} 2' in lines
+    assert 'test_latency_seconds_bucket{stage="a",le="+Inf"} 3' in lines
+    assert 'test_latency_seconds_count{stage="a"} 3' in lines
+
+
+def test_span_records_latency_and_errors():
+    before = metrics.STAGE_LATENCY.count(stage="test_stage")
+    with pytest.raises(ValueError):
+        with metrics.span("test_stage"):
+            raise ValueError("boom")
+    assert metrics.STAGE_LATENCY.count(stage="test_stage") == before + 1
+    assert metrics.STAGE_ERRORS.value(stage="test_stage") >= 1
+
+
+def test_groq_usage_is_counted(monkeypatch):
+    def handler(request):
+        return httpx.Response(200, json={
+            "choices": [{"message": {"content": "hi"}}],
+            "usage": {"prompt_tokens": 11, "completion_tokens": 7, "total_tokens": 18},
+        })
+
+    async def run():
+        await groq_service.init_client(transport=httpx.MockTransport(handler))
+        try:
+            return await groq_service.chat_completion([{"role": "user", "content": "hi"}], model="usage-test")
+        finally:
+            await groq_service.close_client()
+
+    assert asyncio.run(run()) == "hi"
+    assert metrics.LLM_TOKENS.value(model="usage-test", kind="prompt") == 11
+    assert metrics.LLM_TOKENS.value(model="usage-test", kind="completion") == 7
+
+
+def test_groq_stream_usage_from_final_chunk():
+    chunks = [
+        {"choices": [{"delta": {"content": "a"}}]},
+        {"choices": [{"delta": {}}], "x_groq": {"usage": {"prompt_tokens": 3, "completion_tokens": 1}}},
+    ]
+    body = "".join(f"data: {json.dumps(c)}\n\n" for c in chunks) + "data: [DONE]\n\n"
+
+    async def run():
+        await groq_service.init_client(transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})))
+        try:
+            return [t async for t in groq_service.stream_chat_completion([], model="stream-usage-test")]
+        finally:
+            await groq_service.close_client()
+
+    assert asyncio.run(run()) == ["a"]
+    assert metrics.LLM_TOKENS.value(model="stream-usage-test", kind="completion") == 1
+
+
+def test_loop_monitor_counts_blocking(monkeypatch):
+    monkeypatch.setattr(metrics, "LOOP_LAG_INTERVAL", 0.01)
+    monkeypatch.setattr(metrics, "LOOP_BLOCK_THRESHOLD", 0.05)
+    before = metrics.LOOP_BLOCKED.value()
+
+    async def run():
+        metrics.start_loop_monitor()
+        await asyncio.sleep(0.02)
+        time.sleep(0.1)  # block the loop
+        await asyncio.sleep(0.02)
+        await metrics.stop_loop_monitor()
+
+    asyncio.run(run())
+    assert metrics.LOOP_BLOCKED.value() > before
+
+
+def test_metrics_endpoint_reports_route_templates():
+    from app.main import app
+
+    client = TestClient(app)
+    assert client.get("/health").status_code == 200
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert 'http_requests_total{method="GET",route="/health",status="200"}' in text
+    assert "# TYPE stage_duration_seconds histogram" in text
+    assert "job_queue_depth" in text
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.api.deps import get_current_user
+from app.api.endpoints import interview
+from app.services import mock_interviews, supabase_client
+
+
+def test_parse_critique_extracts_trailing_score():
+    text = "Good structure.\n\nSuggestions: quantify results.\n\n**Score: 7/10**"
+    assert mock_interviews.parse_critique(text) == (7, "Good structure.\n\nSuggestions: quantify results.")
+
+
+def test_parse_critique_keeps_inline_score_text_and_clamps():
+    score, critique = mock_interviews.parse_critique("I would rate this 8.6 out of 10 overall.")
+    assert score == 9
+    assert critique == "I would rate this 8.6 out of 10 overall."
+    assert mock_interviews.parse_critique("No rating given.") == (None, "No rating given.")
+
+
+@pytest.fixture
+def writer(monkeypatch, tmp_path):
+    batches = []
+    state = {"fail": False}
+
+    async def fake_insert(rows):
+        if state["fail"]:
+            raise ConnectionError("db down")
+        batches.append(list(rows))
+
+    monkeypatch.setattr(supabase_client, "insert_mock_interviews", fake_insert)
+    monkeypatch.setattr(mock_interviews, "MOCK_LOG_SPILL_PATH", str(tmp_path / "spill.jsonl"))
+    monkeypatch.setattr(mock_interviews, "MOCK_LOG_BATCH_SIZE", 3)
+    monkeypatch.setattr(mock_interviews, "MOCK_LOG_FLUSH_INTERVAL", 0.05)
+    return batches, state, tmp_path / f"spill.jsonl.{os.getpid()}"
+
+
+def _record(i):
+    mock_interviews.record(f"user-{i}", "Q", "A", "critique", i)
+
+
+def test_rows_are_batched_by_size_and_time(writer):
+    batches, _, _ = writer
+
+    async def run():
+        await mock_interviews.start()
+        for i in range(4):
+            _record(i)
+        await asyncio.sleep(0.2)
+        await mock_interviews.stop()
+
+    asyncio.run(run())
+    assert [len(b) for b in batches] == [3, 1]
+
+
+def test_stop_flushes_buffered_rows(writer, monkeypatch):
+    batches, _, _ = writer
+    monkeypatch.setattr(mock_interviews, "MOCK_LOG_FLUSH_INTERVAL", 60)
+
+    async def run():
+        await mock_interviews.start()
+        _record(1)
+        await asyncio.sleep(0)
+        await mock_interviews.stop()
+
+    asyncio.run(run())
+    assert [row["user_id"] for b in batches for row in b] == ["user-1"]
+
+
+def test_failed_writes_spill_and_replay_on_next_start(writer):
+    batches, state, spill = writer
+    state["fail"] = True
+
+    async def run_down():
+        await mock_interviews.start()
+        _record(1)
+        _record(2)
+        await mock_interviews.stop()
+
+    asyncio.run(run_down())
+    assert [json.loads(line)["user_id"] for line in spill.read_text().splitlines()] == ["user-1", "user-2"]
+
+    state["fail"] = False
+
+    async def run_up():
+        await mock_interviews.start()
+        await asyncio.sleep(0.05)
+        await mock_interviews.stop()
+
+    asyncio.run(run_up())
+    assert [row["user_id"] for b in batches for row in b] == ["user-1", "user-2"]
+    assert not spill.exists()
+
+
+def _replay():
+    async def run():
+        await mock_interviews.start()
+        await asyncio.sleep(0.05)
+        await mock_interviews.stop()
+
+    asyncio.run(run())
+
+
+def test_torn_spill_lines_are_quarantined_not_fatal(writer, tmp_path):
+    batches, _, spill = writer
+    spill.write_text('{"user_id": "user-1"}\n{"user_id": "us\n{"user_id": "user-2"}\n')
+
+    _replay()
+    assert [row["user_id"] for b in batches for row in b] == ["user-1", "user-2"]
+    assert (tmp_path / "spill.jsonl.bad").read_text() == '{"user_id": "us\n'
+    assert not spill.exists()
+
+
+def test_only_spill_files_of_dead_processes_are_adopted(writer, tmp_path):
+    batches, _, _ = writer
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    (tmp_path / f"spill.jsonl.{dead.pid}").write_text('{"user_id": "orphan"}\n')
+    sibling = tmp_path / f"spill.jsonl.{os.getppid()}"
+    sibling.write_text('{"user_id": "sibling"}\n')
+
+    _replay()
+    assert [row["user_id"] for b in batches for row in b] == ["orphan"]
+    assert sibling.exists()
+
+
+def test_stop_does_not_hang_behind_a_stuck_write(writer, monkeypatch):
+    _, _, spill = writer
+    monkeypatch.setattr(mock_interviews, "MOCK_LOG_MAX_BUFFER", 2)
+    monkeypatch.setattr(mock_interviews, "MOCK_LOG_STOP_TIMEOUT", 0.1)
+
+    async def stuck_insert(rows):
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(supabase_client, "insert_mock_interviews", stuck_insert)
+
+    async def run():
+        await mock_interviews.start()
+        for i in range(6):
+            _record(i)
+            await asyncio.sleep(0)
+        await asyncio.wait_for(mock_interviews.stop(), 2)
+
+    asyncio.run(run())
+    spilled = sorted(json.loads(line)["user_id"] for line in spill.read_text().splitlines())
+    assert spilled == [f"user-{i}" for i in range(6)]
+
+
+def test_critique_returns_score_and_buffers_result(monkeypatch):
+    recorded = []
+
+    async def fake_completion(route, messages):
+        return "Clear answer, but add metrics.\nScore: 6/10"
+
+    monkeypatch.setattr(interview, "routed_completion", fake_completion)
+    monkeypatch.setattr(mock_interviews, "record", lambda *args: recorded.append(args))
+    app.dependency_overrides[get_current_user] = lambda: {"id": "user-1"}
+    try:
+        resp = TestClient(app).post("/interview/critique", json={"question": "Q?", "answer": "A."})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert resp.json() == {"critique": "Clear answer, but add metrics.", "score": 6}
+    assert recorded == [("user-1", "Q?", "A.", "Clear answer, but add metrics.", 6)]
@@ -0,0 +1,76 @@
+import asyncio
+import os
+import signal
+import fitz
+import pytest
+from app.services import pdf_parser
+
+
+def _pdf(pages):
+    doc = fitz.open()
+    for i in range(pages):
+        doc.new_page().insert_text((72, 72), f"Page {i} text")
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+@pytest.fixture(autouse=True)
+def pool():
+    pdf_parser._cache.clear()
+    yield
+    pdf_parser.shutdown_pool()
+
+
+def test_page_parallel_extraction_keeps_order_and_caps_pages(monkeypatch):
+    monkeypatch.setattr(pdf_parser, "PDF_PARALLEL_MIN_PAGES", 2)
+    data = _pdf(7)
+
+    pages = asyncio.run(pdf_parser.extract_pdf_pages(data, max_pages=6))
+    assert [p.strip() for p in pages] == [f"Page {i} text" for i in range(6)]
+
+
+def test_reupload_is_served_from_checksum_cache(monkeypatch):
+    data = _pdf(1)
+    assert asyncio.run(pdf_parser.extract_text(data)) == "Page 0 text"
+
+    def boom(*args):
+        raise AssertionError("should not parse again")
+
+    monkeypatch.setattr(pdf_parser, "_parse", boom)
+    assert asyncio.run(pdf_parser.extract_text(data)) == "Page 0 text"
+
+
+def test_corrupt_file_raises_parse_error():
+    with pytest.raises(pdf_parser.PDFParseError):
+        asyncio.run(pdf_parser.extract_text(b"not a pdf"))
+
+
+def _kill_workers(pool):
+    processes = list(pool._processes.values())
+    for process in processes:
+        os.kill(process.pid, signal.SIGKILL)
+    for process in processes:
+        process.join(5)
+
+
+def test_pool_recovers_after_a_worker_dies():
+    asyncio.run(pdf_parser.extract_text(_pdf(1)))
+    broken = pdf_parser._pool
+    _kill_workers(broken)
+
+    assert asyncio.run(pdf_parser.extract_text(_pdf(2))) == "Page 0 text\nPage 1 text"
+    assert pdf_parser._pool is not broken
+
+
+def test_timeout_kills_the_stuck_workers(monkeypatch):
+    asyncio.run(pdf_parser.extract_text(_pdf(1)))
+    processes = list(pdf_parser._pool._processes.values())
+    monkeypatch.setattr(pdf_parser, "PDF_PARSE_TIMEOUT", 0.001)
+
+    with pytest.raises(pdf_parser.PDFParseError):
+        asyncio.run(pdf_parser.extract_text(_pdf(200)))
+    assert pdf_parser._pool is None
+    for process in processes:
+        process.join(5)
+        assert not process.is_alive()
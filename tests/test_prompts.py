@@ -0,0 +1,29 @@
+import os
+import pytest
+from app.prompts.loader import PromptRegistry, PromptVariableError, registry
+
+
+def test_all_templates_compile_with_declared_variables():
+    assert "resume_text" in registry.get("career_recommendation.md").variables
+    assert registry.get("mock_critique.md").variables == {"question", "answer"}
+    assert len(registry.get("resume_feedback.md").version) == 12
+
+
+def test_render_validates_variables_and_does_not_reinterpret_values():
+    text = registry.get("mock_question.md").render(job_title="{{ evil }}")
+    assert "**{{ evil }}**" in text
+    with pytest.raises(PromptVariableError):
+        registry.get("mock_critique.md").render(question="Why?")
+
+
+def test_hot_reload_picks_up_changed_files(tmp_path):
+    path = tmp_path / "greet.md"
+    path.write_text("Hello {{ name }}", encoding="utf-8")
+    reg = PromptRegistry(str(tmp_path), hot_reload=True)
+    first = reg.get("greet.md")
+
+    path.write_text("Hi {{ name }}!", encoding="utf-8")
+    os.utime(path, (first.mtime + 5, first.mtime + 5))
+    second = reg.get("greet.md")
+    assert second.render(name="Ana") == "Hi Ana!"
+    assert second.version != first.version
@@ -0,0 +1,102 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.services import question_cache
+
+# Tiny fake embedding space: titles of the same role point the same way.
+ROLES = {"data scientist": 0, "senior data scientist": 0, "backend engineer": 1, "product manager": 2}
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    async def fake_embed(title):
+        vec = np.zeros(question_cache.EMBEDDING_DIM, dtype=np.float32)
+        vec[ROLES[title]] = 1.0
+        vec[10] = 0.2 if title.startswith("senior") else 0.0
+        return vec
+
+    monkeypatch.setattr(question_cache, "aembed_text", fake_embed)
+    question_cache.clear()
+    yield question_cache
+    question_cache.clear()
+
+
+def _generator():
+    calls = []
+
+    async def generate(title):
+        calls.append(title)
+        await asyncio.sleep(0.01)
+        return f"{title} question {len(calls)}"
+
+    return generate, calls
+
+
+def test_similar_titles_share_a_pool(cache):
+    generate, calls = _generator()
+
+    async def run():
+        first = await cache.get_question("Data Scientist", generate)
+        second = await cache.get_question("Sr. Data Scientist", generate)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == "Data Scientist question 1"
+    assert second.startswith("Data Scientist question")
+    assert calls[0] == "Data Scientist"
+    assert cache.cache_stats()["hits"] == 1
+    assert cache.cache_stats()["clusters"] == 1
+
+
+def test_different_roles_get_separate_pools(cache):
+    generate, calls = _generator()
+
+    async def run():
+        await cache.get_question("Data Scientist", generate)
+        await cache.get_question("Backend Engineer", generate)
+
+    asyncio.run(run())
+    assert cache.cache_stats()["clusters"] == 2
+    assert cache.cache_stats()["misses"] == 2
+
+
+def test_pool_is_prewarmed_and_rotates(cache, monkeypatch):
+    monkeypatch.setattr(question_cache, "QUESTION_POOL_SIZE", 3)
+    generate, calls = _generator()
+
+    async def run():
+        await cache.get_question("Product Manager", generate)
+        await asyncio.sleep(0.1)  # background refill
+        return [await cache.get_question("product  manager", generate) for _ in range(6)]
+
+    served = asyncio.run(run())
+    assert len(calls) == 3
+    assert len(set(served)) == 3
+
+
+def test_worn_out_questions_are_replaced(cache, monkeypatch):
+    monkeypatch.setattr(question_cache, "QUESTION_POOL_SIZE", 2)
+    monkeypatch.setattr(question_cache, "QUESTION_POOL_MIN", 2)
+    monkeypatch.setattr(question_cache, "QUESTION_MAX_SERVES", 2)
+    generate, calls = _generator()
+
+    async def run():
+        for _ in range(8):
+            await cache.get_question("Data Scientist", generate)
+            await asyncio.sleep(0.05)
+
+    asyncio.run(run())
+    assert len(calls) > 2
+
+
+def test_concurrent_misses_generate_once(cache):
+    generate, calls = _generator()
+
+    async def run():
+        return await asyncio.gather(*[cache.get_question("Backend Engineer", generate) for _ in range(5)])
+
+    answers = asyncio.run(run())
+    assert len(set(answers)) == 1
+    assert calls[:1] == ["Backend Engineer"] and calls.count("Backend Engineer") <= 2
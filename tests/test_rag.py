@@ -0,0 +1,142 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.api.deps import get_optional_user
+from app.api.endpoints import interview
+from app.core import admission
+from app.services import question_cache, rag, vector_search
+
+POSTINGS = [{"title": "Data Scientist", "description": "Build forecasting models with Python and SQL."}]
+
+
+@pytest.fixture
+def search(monkeypatch):
+    calls = []
+
+    async def fake_find(query, top_k=3):
+        calls.append(query)
+        await asyncio.sleep(0.2)
+        return POSTINGS
+
+    rag.clear()
+    monkeypatch.setattr(vector_search, "search_available", lambda: True)
+    monkeypatch.setattr(vector_search, "find_similar_jobs", fake_find)
+    yield calls
+    rag.clear()
+
+
+def test_retrieval_is_cached_per_normalized_title(search):
+    async def run():
+        first = await asyncio.gather(rag.similar_postings("Data Scientist"), rag.similar_postings(" data  scientist "))
+        again = await rag.similar_postings("DATA SCIENTIST")
+        return first, again
+
+    first, again = asyncio.run(run())
+    assert first == [POSTINGS, POSTINGS] and again == POSTINGS
+    assert search == ["data scientist"]
+
+
+def test_retrieval_failure_falls_back_to_no_postings(monkeypatch):
+    async def broken(query, top_k=3):
+        raise RuntimeError("db down")
+
+    rag.clear()
+    monkeypatch.setattr(vector_search, "search_available", lambda: True)
+    monkeypatch.setattr(vector_search, "find_similar_jobs", broken)
+    assert asyncio.run(rag.similar_postings("Data Scientist")) == []
+
+
+def test_question_is_grounded_and_overlaps_with_resume_fetch(search, monkeypatch):
+    prompts = []
+
+    async def fake_resume(user_id):
+        await asyncio.sleep(0.2)
+        return {"content": "Summary\nAnalyst\nSkills\nPython, dbt"}
+
+    async def fake_completion(messages, prompt_version=None, route=None):
+        prompts.append(messages[1]["content"])
+        return " Tell me about a model you shipped. "
+
+    monkeypatch.setattr(interview, "get_latest_resume_by_user", fake_resume)
+    monkeypatch.setattr(interview, "cached_chat_completion", fake_completion)
+    app.dependency_overrides[get_optional_user] = lambda: {"id": "user-1"}
+    try:
+        start = time.perf_counter()
+        resp = TestClient(app).get("/interview/question", params={"job_title": "Data Scientist", "tailored": "true"})
+        elapsed = time.perf_counter() - start
+    finally:
+        app.dependency_overrides.clear()
+
+    assert resp.json() == {"question": "Tell me about a model you shipped."}
+    assert "Build forecasting models" in prompts[0]
+    assert "Python, dbt" in prompts[0]
+    assert elapsed < 0.35
+
+
+def test_anonymous_question_without_search_backend_uses_plain_prompt(monkeypatch):
+    prompts = []
+
+    async def fake_completion(route, messages, temperature=0.5):
+        prompts.append(messages[1]["content"])
+        return "Q"
+
+    async def no_model(text):
+        raise ImportError("sentence_transformers")
+
+    rag.clear()
+    monkeypatch.setattr(vector_search, "search_available", lambda: False)
+    monkeypatch.setattr(question_cache, "aembed_text", no_model)
+    monkeypatch.setattr(interview, "routed_completion", fake_completion)
+    resp = TestClient(app).get("/interview/question", params={"job_title": "Data Scientist"})
+    assert resp.json() == {"question": "Q"}
+    assert "**Data Scientist**" in prompts[0]
+
+
+def test_pooled_question_does_not_start_request_retrieval(monkeypatch):
+    started = []
+
+    async def fake_postings(job_title):
+        started.append(job_title)
+        return POSTINGS
+
+    async def pooled(job_title, generate):
+        return "Q"
+
+    monkeypatch.setattr(interview, "similar_postings", fake_postings)
+    monkeypatch.setattr(question_cache, "get_question", pooled)
+    resp = TestClient(app).get("/interview/question", params={"job_title": "Data Scientist"})
+    assert resp.json() == {"question": "Q"}
+    assert started == []
+
+
+def test_refused_tailored_request_cancels_retrieval(monkeypatch):
+    state = {}
+
+    async def slow_postings(job_title):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+        return POSTINGS
+
+    async def refuse(*args, **kwargs):
+        raise admission.AdmissionRejected("user_rate", 5)
+
+    monkeypatch.setattr(interview, "similar_postings", slow_postings)
+    monkeypatch.setattr(admission.controller, "acquire", refuse)
+    app.dependency_overrides[get_optional_user] = lambda: {"id": "user-1"}
+    try:
+        start = time.perf_counter()
+        resp = TestClient(app).get("/interview/question", params={"job_title": "Data Scientist", "tailored": "true"})
+        elapsed = time.perf_counter() - start
+    finally:
+        app.dependency_overrides.clear()
+
+    assert resp.status_code == 429
+    assert elapsed < 1
+    assert state == {"cancelled": True}
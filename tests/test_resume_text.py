@@ -0,0 +1,98 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.api import etag
+from app.api.deps import get_current_user
+from app.api.endpoints import interview
+from app.prompts import messages
+from app.services import resume_text
+from app.services.resume_text import count_tokens, fit_to_budget, normalize_pages, preprocess, split_sections
+
+
+def test_normalize_strips_repeated_headers_footers_and_page_numbers():
+    pages = [
+        "Jane Doe | jane@example.com\nEXPERIENCE\n•  Built   pipelines\n\n\nPage 1 of 2",
+        "Jane Doe | jane@example.com\n● Led a team of 4\nEDUCATION\nBSc CS\nPage 2 of 2",
+    ]
+    text = normalize_pages(pages)
+    assert "Page" not in text
+    assert text.count("jane@example.com") == 1
+    assert "- Built pipelines" in text
+    assert "- Led a team of 4" in text
+
+
+def test_numbers_alone_mid_page_are_kept():
+    page = "Jane Doe\nEDUCATION\nBSc Computer Science\n2021\nGPA\n3\nEXPERIENCE\nAcme Corp\nData engineer\n- 2"
+    text = normalize_pages([page, "Jane Doe\nSKILLS\nPython\nSQL\nDocker\nKubernetes\n2"])
+    lines = text.splitlines()
+    assert "2021" in lines and "3" in lines
+    assert "- 2" not in lines and "2" not in lines
+
+
+def test_single_page_keeps_contact_line():
+    assert normalize_pages(["Jane Doe\nSkills\nPython"]).startswith("Jane Doe")
+
+
+def test_split_sections_by_heading():
+    sections = split_sections("Jane Doe\nSummary\nData engineer.\nWORK EXPERIENCE\nAcme\nSkills:\nPython, SQL")
+    assert [(s["title"], s["kind"]) for s in sections] == [
+        ("", "header"), ("Summary", "summary"), ("WORK EXPERIENCE", "experience"), ("Skills", "skills"),
+    ]
+    assert all(s["tokens"] == count_tokens(s["text"]) for s in sections)
+
+
+def test_fit_to_budget_keeps_priority_sections_in_document_order():
+    sections = split_sections(
+        "Jane Doe\nInterests\n" + "chess " * 200 + "\nExperience\nAcme data lead\nSkills\nPython"
+    )
+    fitted = fit_to_budget(sections, budget=30, priority=("experience", "skills"))
+    assert fitted.index("Experience") < fitted.index("Skills")
+    assert "chess" not in fitted
+    assert count_tokens(fitted) <= 30
+
+
+def test_fit_to_budget_truncates_oversized_section():
+    body = "\n".join(f"- achievement number {i}" for i in range(200))
+    sections = split_sections("Experience\n" + body)
+    fitted = fit_to_budget(sections, budget=100, priority=("experience",))
+    assert fitted.startswith("Experience\n- achievement number 0")
+    assert fitted.endswith("[...]")
+    assert count_tokens(fitted) <= 110
+
+
+def test_career_prompt_respects_budget(monkeypatch):
+    monkeypatch.setattr(messages, "CAREER_RESUME_BUDGET", 50)
+    processed = preprocess(["Summary\nEngineer\nExperience\n" + "- shipped things\n" * 500])
+    msgs, _ = messages.career_messages(processed["text"], processed["sections"])
+    assert "Engineer" in msgs[1]["content"]
+    assert msgs[1]["content"].count("shipped things") < 50
+
+
+def test_interview_feedback_uses_the_budgeted_prompt(monkeypatch):
+    monkeypatch.setattr(messages, "FEEDBACK_RESUME_BUDGET", 50)
+    processed = preprocess(["Experience\nAcme data lead\n" + "- shipped things\n" * 500])
+    sent = []
+
+    async def fake_resume(user_id):
+        return {"content": processed["text"], "sections": processed["sections"]}
+
+    async def fake_completion(msgs, prompt_version=None, route=None):
+        sent.append(msgs)
+        return "Tighten the bullets."
+
+    monkeypatch.setattr(etag, "get_latest_resume_by_user", fake_resume)
+    monkeypatch.setattr(interview, "cached_chat_completion", fake_completion)
+    app.dependency_overrides[get_current_user] = lambda: {"id": "user-1"}
+    try:
+        resp = TestClient(app).post("/interview/feedback")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert resp.json() == {"feedback": "Tighten the bullets."}
+    assert sent[0] == messages.feedback_messages(processed["text"], processed["sections"])[0]
+    assert sent[0][1]["content"].count("shipped things") < 50
+
+
+def test_fallback_token_estimate_without_tiktoken(monkeypatch):
+    monkeypatch.setattr(resume_text, "_encoding", lambda: None)
+    assert count_tokens("Hello, world!") == 4
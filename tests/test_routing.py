@@ -0,0 +1,135 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.services import groq_service
+from app.services.groq_service import Route
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+class FakeCompletionServer:
+    """Answers with the requested model's name after a per-model delay,
+    or with a canned error status."""
+
+    def __init__(self, delays=None, statuses=None):
+        self.delays = delays or {}
+        self.statuses = statuses or {}
+        self.requests = []
+
+    async def __call__(self, request):
+        payload = json.loads(request.content)
+        self.requests.append(payload)
+        model = payload["model"]
+        if model in self.statuses:
+            return httpx.Response(self.statuses[model], headers={"Retry-After": "30"})
+        delay = self.delays.get(model, 0)
+        if callable(delay):
+            delay = delay()
+        await asyncio.sleep(delay)
+        return httpx.Response(200, json={"choices": [{"message": {"content": model}}]})
+
+    def models(self):
+        return [p["model"] for p in self.requests]
+
+
+@pytest.fixture(autouse=True)
+def routing(monkeypatch):
+    groq_service.clear_routing_stats()
+    monkeypatch.setitem(groq_service.ROUTES, "test", Route("big", "small", slo=0.2, max_tokens=64, hedge=True))
+    yield
+    groq_service.clear_routing_stats()
+
+
+def _run(server, coro_factory):
+    async def run():
+        await groq_service.init_client(transport=httpx.MockTransport(server))
+        try:
+            return await coro_factory()
+        finally:
+            await groq_service.close_client()
+    return asyncio.run(run())
+
+
+def _decisions():
+    return groq_service.routing_stats()["test"]["decisions"]
+
+
+def test_prompt_types_use_their_tier():
+    server = FakeCompletionServer()
+    assert _run(server, lambda: groq_service.routed_completion("interview_question", MESSAGES)) == "llama3-8b-8192"
+    assert server.requests[0]["max_tokens"] == groq_service.ROUTES["interview_question"].max_tokens
+
+
+def test_rate_limited_primary_falls_back_and_is_parked():
+    server = FakeCompletionServer(statuses={"big": 429})
+
+    async def two_calls():
+        return [await groq_service.routed_completion("test", MESSAGES) for _ in range(2)]
+
+    assert _run(server, two_calls) == ["small", "small"]
+    # The second call skips the parked primary entirely.
+    assert server.models() == ["big", "small", "small"]
+    assert _decisions() == {"small:fallback_rate_limited": 2}
+
+
+def test_slow_primary_falls_back_after_slo():
+    server = FakeCompletionServer(delays={"big": 1.0})
+    assert _run(server, lambda: groq_service.routed_completion("test", MESSAGES)) == "small"
+    assert _decisions() == {"small:fallback_slow": 1}
+
+
+def test_bad_request_does_not_fall_back():
+    server = FakeCompletionServer(statuses={"big": 400})
+    with pytest.raises(groq_service.GroqServiceError):
+        _run(server, lambda: groq_service.routed_completion("test", MESSAGES))
+    assert server.models() == ["big"]
+
+
+def test_hedged_duplicate_wins_against_a_straggler(monkeypatch):
+    monkeypatch.setattr(groq_service, "GROQ_HEDGE", True)
+    monkeypatch.setattr(groq_service, "GROQ_HEDGE_MIN_DELAY", 0.01)
+    for _ in range(groq_service.GROQ_ROUTE_MIN_SAMPLES):
+        groq_service._observe("test", "big", 0.02)
+    # The first request stalls; the duplicate sent after the p95 (20ms) is fast.
+    delays = iter([0.5, 0.01])
+    server = FakeCompletionServer(delays={"big": lambda: next(delays)})
+
+    assert _run(server, lambda: groq_service.routed_completion("test", MESSAGES)) == "big"
+    assert server.models() == ["big", "big"]
+    assert _decisions() == {"big:hedge_won": 1}
+
+
+def test_routed_cache_calls_use_the_tier_model(monkeypatch):
+    from app.services import llm_cache
+
+    llm_cache.clear()
+    server = FakeCompletionServer()
+    answer = _run(server, lambda: llm_cache.cached_chat_completion(MESSAGES, route="test"))
+    assert answer == "big"
+    assert server.requests[0]["max_tokens"] == 64
+
+
+def test_route_overrides_apply_on_top_of_defaults(monkeypatch):
+    monkeypatch.setattr(groq_service, "ROUTES", dict(groq_service.ROUTES))
+    groq_service._load_route_overrides('{"critique": {"slo": 5}, "summary": {"max_tokens": 300}}')
+    assert groq_service.ROUTES["critique"].slo == 5
+    assert groq_service.ROUTES["critique"].model == groq_service.DEFAULT_MODEL
+    assert groq_service.ROUTES["summary"].max_tokens == 300
+
+
+@pytest.mark.parametrize("raw", [
+    "{not json",
+    '["critique"]',
+    '{"critique": 5}',
+    '{"critique": {"timeout": 5}}',
+    '{"critique": {"slo": "fast"}}',
+    '{"critique": {"slo": 5}, "summary": {"max_tokens": -1}}',
+])
+def test_invalid_route_overrides_keep_the_defaults(monkeypatch, raw):
+    defaults = dict(groq_service.ROUTES)
+    monkeypatch.setattr(groq_service, "ROUTES", dict(defaults))
+    groq_service._load_route_overrides(raw)
+    assert groq_service.ROUTES == defaults
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import health
+from app.main import app
+from app.services import db_client, supabase_client, vector_search
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Generous enough for a slow CI box; importing app.main takes well under a
+# second locally once the heavy dependencies are deferred.
+IMPORT_BUDGET_SECONDS = float(os.getenv("IMPORT_BUDGET_SECONDS", "3"))
+# Loaded in the lifespan or on first use, never by importing the app.
+DEFERRED_MODULES = ["fitz", "supabase", "asyncpg", "sentence_transformers", "torch"]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (DEFERRED_MODULES,)
+
+
+def _import_app():
+    env = {k: v for k, v in os.environ.items() if k != "GROQ_API_KEY"}
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE], cwd=ROOT, env=env,
+        capture_output=True, text=True, timeout=60, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_import_is_lazy_and_within_budget():
+    # Best of three so one slow run on a busy machine does not fail the build.
+    results = [_import_app() for _ in range(3)]
+    assert results[0]["loaded"] == []
+    assert min(r["elapsed"] for r in results) < IMPORT_BUDGET_SECONDS
+
+
+def test_liveness_does_not_depend_on_startup():
+    client = TestClient(app)
+    response = client.get("/health/live")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+
+def test_readiness_fails_until_startup_completes(monkeypatch):
+    monkeypatch.setattr(health.groq_service, "is_configured", lambda: True)
+    monkeypatch.setattr(health.supabase_client, "is_initialised", lambda: True)
+    monkeypatch.setattr(health.job_queue, "is_running", lambda: True)
+    monkeypatch.setattr(health.embeddings, "EMBEDDING_WARMUP", False)
+    health.prompt_registry.load_all()
+    client = TestClient(app)
+
+    monkeypatch.setattr(app.state, "ready", False, raising=False)
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["checks"]["startup"] is False
+
+    monkeypatch.setattr(app.state, "ready", True)
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    assert all(response.json()["checks"].values())
+
+
+def test_readiness_reports_missing_groq_key(monkeypatch):
+    monkeypatch.setattr(app.state, "ready", True, raising=False)
+    monkeypatch.setattr(health.groq_service, "is_configured", lambda: False)
+    response = TestClient(app).get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["checks"]["groq"] is False
+
+
+def test_unreachable_postgres_leaves_search_unavailable(monkeypatch):
+    # Port 1 refuses connections; job retrieval is best-effort.
+    asyncio.run(db_client.init_pool("postgresql://postgres@127.0.0.1:1/postgres", timeout=5))
+    assert not db_client.is_configured()
+
+    monkeypatch.setattr(vector_search, "VECTOR_BACKEND", "local")
+    monkeypatch.setattr(vector_search, "VECTOR_INDEX_PATH", None)
+    monkeypatch.setattr(vector_search, "_local_index", None)
+    asyncio.run(vector_search.load_local_index())
+    assert not vector_search.search_available()
+
+
+def test_readiness_lists_degraded_retrieval(monkeypatch):
+    monkeypatch.setattr(app.state, "ready", True, raising=False)
+    monkeypatch.setattr(health.groq_service, "is_configured", lambda: True)
+    monkeypatch.setattr(health.supabase_client, "is_initialised", lambda: True)
+    monkeypatch.setattr(health.job_queue, "is_running", lambda: True)
+    monkeypatch.setattr(health.embeddings, "EMBEDDING_WARMUP", False)
+    monkeypatch.setattr(health.db_client, "DATABASE_URL", "postgresql://postgres@127.0.0.1:1/postgres")
+    monkeypatch.setattr(health.db_client, "_pool", None)
+    health.prompt_registry.load_all()
+
+    response = TestClient(app).get("/health/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "degraded"
+    assert response.json()["degraded"] == ["database"]
+
+
+def test_missing_supabase_url_is_not_ready(monkeypatch):
+    monkeypatch.setattr(supabase_client, "url", None)
+    monkeypatch.setattr(supabase_client, "_client", None)
+    monkeypatch.setattr(supabase_client, "_http", None)
+    asyncio.run(supabase_client.init_client())
+
+    monkeypatch.setattr(app.state, "ready", True, raising=False)
+    monkeypatch.setattr(health.groq_service, "is_configured", lambda: True)
+    monkeypatch.setattr(health.job_queue, "is_running", lambda: True)
+    response = TestClient(app).get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["checks"]["supabase"] is False
@@ -0,0 +1,85 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.api import etag
+from app.api.deps import get_current_user
+from app.api.endpoints import career, interview
+from app.services.groq_service import GroqServiceError
+
+
+def _events(resp):
+    """(event, data) pairs of an SSE response body."""
+    events = []
+    for block in resp.text.split("\n\n"):
+        if not block.strip():
+            continue
+        event = None
+        for line in block.splitlines():
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                events.append((event, json.loads(line[len("data: "):])))
+    return events
+
+
+def _tokens(*tokens, fail=None):
+    async def stream(*args, **kwargs):
+        for token in tokens:
+            yield token
+        if fail:
+            raise fail
+    return stream
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def fake_resume(user_id):
+        return {"content": "Python developer", "revision": 1}
+
+    monkeypatch.setattr(etag, "get_latest_resume_by_user", fake_resume)
+    app.dependency_overrides[get_current_user] = lambda: {"id": "user-1"}
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_career_stream_sends_tokens_then_done(client, monkeypatch):
+    monkeypatch.setattr(career, "cached_stream_chat_completion", _tokens("Data ", "engineer"))
+
+    resp = client.post("/career/recommend?stream=true")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    # A stream may still fail after the headers; it must not be cacheable.
+    assert "etag" not in resp.headers
+    assert _events(resp) == [(None, {"token": "Data "}), (None, {"token": "engineer"}), ("done", {})]
+
+
+def test_failure_before_first_token_is_an_error_status(client, monkeypatch):
+    monkeypatch.setattr(career, "cached_stream_chat_completion", _tokens(fail=GroqServiceError("down", 500)))
+
+    resp = client.post("/career/recommend?stream=true")
+    assert resp.status_code == 502
+
+
+def test_failure_mid_stream_ends_with_an_error_event(client, monkeypatch):
+    monkeypatch.setattr(career, "cached_stream_chat_completion", _tokens("Data ", fail=GroqServiceError("Groq API error 500: {'raw': 'body'}", 500)))
+
+    events = _events(client.post("/career/recommend?stream=true"))
+    assert events[0] == (None, {"token": "Data "})
+    # Groq's status and body stay in the server log.
+    assert events[-1] == ("error", {"detail": GroqServiceError.PUBLIC_MESSAGE})
+    assert all(event != "done" for event, _ in events)
+
+
+def test_critique_stream_done_event_carries_score(client, monkeypatch):
+    recorded = []
+    monkeypatch.setattr(interview, "routed_stream_completion", _tokens("Clear answer.\n", "Score: 7/10"))
+    monkeypatch.setattr(interview.mock_interviews, "record", lambda *row: recorded.append(row))
+
+    resp = client.post("/interview/critique?stream=true", json={"question": "Why?", "answer": "Because."})
+    events = _events(resp)
+    assert [data["token"] for event, data in events if event is None] == ["Clear answer.\n", "Score: 7/10"]
+    assert events[-1] == ("done", {"critique": "Clear answer.", "score": 7})
+    assert recorded == [("user-1", "Why?", "Because.", "Clear answer.", 7)]
@@ -0,0 +1,158 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from streamlit_app import backend
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _serve(self):
+        server = self.server
+        server.calls.append((self.command, self.path, self.client_address[1]))
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        status, headers, body = server.responses.pop(0)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _serve
+
+
+@pytest.fixture
+def server():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    srv.calls, srv.responses = [], []
+    srv.url = f"http://127.0.0.1:{srv.server_port}"
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def _json(status, body, **headers):
+    return status, {"Content-Type": "application/json", **headers}, json.dumps(body).encode()
+
+
+def _sse(*events):
+    body = "".join(
+        (f"event: {event}\n" if event else "") + f"data: {json.dumps(data)}\n\n" for event, data in events
+    )
+    return 200, {"Content-Type": "text/event-stream"}, body.encode()
+
+
+def test_session_reuses_one_keep_alive_connection(server):
+    server.responses = [_json(200, {"status": "queued"}) for _ in range(3)]
+    session = backend.new_session()
+
+    for _ in range(3):
+        backend.poll_job(session, f"{server.url}/jobs/1", "tok")
+    assert len({port for _, _, port in server.calls}) == 1
+
+
+def test_get_is_retried_on_503_but_post_is_not(server):
+    server.responses = [_json(503, {}), _json(200, {"status": "succeeded", "result": {}})]
+    session = backend.new_session()
+
+    assert backend.poll_job(session, f"{server.url}/jobs/1", "tok")["status"] == "succeeded"
+    assert len(server.calls) == 2
+
+    server.calls.clear()
+    server.responses = [_json(503, {}), _json(200, {"job_id": "j", "status": "queued"})]
+    with pytest.raises(requests.HTTPError):
+        backend.submit_job(session, f"{server.url}/career/recommend", "tok")
+    assert len(server.calls) == 1
+
+
+def test_stream_tokens_yields_tokens_and_reports_done(server):
+    server.responses = [_sse((None, {"token": "Data "}), (None, {"token": "engineer"}), ("done", {"score": 7}))]
+    done = []
+
+    tokens = list(backend.stream_tokens(backend.new_session(), f"{server.url}/career/recommend", "tok", on_done=done.append))
+    assert tokens == ["Data ", "engineer"]
+    assert done == [{"score": 7}]
+    assert server.calls[0][:2] == ("POST", "/career/recommend?stream=true")
+
+
+def test_stream_error_event_raises(server):
+    server.responses = [_sse((None, {"token": "Data "}), ("error", {"detail": "Groq is down"}))]
+
+    stream = backend.stream_tokens(backend.new_session(), f"{server.url}/career/recommend", "tok")
+    assert next(stream) == "Data "
+    with pytest.raises(backend.BackendError, match="Groq is down"):
+        next(stream)
+
+
+def test_429_raises_busy_with_retry_after(server):
+    server.responses = [_json(429, {"detail": "busy"}, **{"Retry-After": "5"})]
+
+    with pytest.raises(backend.BackendBusy) as excinfo:
+        list(backend.stream_tokens(backend.new_session(), f"{server.url}/career/recommend", "tok"))
+    assert excinfo.value.retry_after == "5"
+
+
+def test_submit_and_poll_job(server):
+    server.responses = [
+        _json(202, {"job_id": "j1", "status": "queued"}),
+        _json(200, {"status": "succeeded", "result": {"feedback": "Looks good"}}),
+        _json(200, {"status": "failed", "error": "Groq is down"}),
+    ]
+    session = backend.new_session()
+
+    job = backend.submit_job(session, f"{server.url}/resume_feedback/feedback", "tok")
+    assert job == {"job_id": "j1", "status": "queued"}
+    assert server.calls[0][:2] == ("POST", "/resume_feedback/feedback?background=true")
+    assert backend.poll_job(session, f"{server.url}/jobs/j1", "tok")["result"] == {"feedback": "Looks good"}
+    with pytest.raises(backend.BackendError, match="Groq is down"):
+        backend.poll_job(session, f"{server.url}/jobs/j1", "tok")
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_memo_expires_after_ttl():
+    clock = Clock()
+    memo = backend.ResultMemo(ttl=60, clock=clock)
+    memo.set("career/recommend", "abc", "Data engineer")
+
+    clock.now = 59
+    assert memo.get("career/recommend", "abc") == "Data engineer"
+    assert memo.get("career/recommend", "other") is None
+    clock.now = 60
+    assert memo.get("career/recommend", "abc") is None
+
+
+def test_memo_evicts_least_recently_used():
+    memo = backend.ResultMemo(ttl=60, max_entries=2, clock=Clock())
+    memo.set("a", "1", "A")
+    memo.set("b", "1", "B")
+    memo.get("a", "1")
+    memo.set("c", "1", "C")
+
+    assert memo.get("a", "1") == "A"
+    assert memo.get("b", "1") is None
+    assert memo.get("c", "1") == "C"
+
+
+def test_memo_skips_empty_results():
+    memo = backend.ResultMemo(ttl=60, clock=Clock())
+    memo.set("a", "1", "")
+    assert memo.get("a", "1") is None
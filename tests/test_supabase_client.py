@@ -0,0 +1,69 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from postgrest import AsyncPostgrestClient
+
+from app.services import supabase_client
+
+REST_URL = "http://supabase.test/rest/v1"
+
+
+class FakePostgrest:
+    """A real PostgREST client whose HTTP calls go to a handler."""
+
+    def __init__(self, handler):
+        self.requests = []
+
+        def record(request):
+            self.requests.append(request)
+            return handler(request)
+
+        self.postgrest = AsyncPostgrestClient(REST_URL)
+        self.postgrest.session = httpx.AsyncClient(
+            base_url=REST_URL, headers=self.postgrest.session.headers, transport=httpx.MockTransport(record),
+        )
+
+    def table(self, name):
+        return self.postgrest.from_(name)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    def install(handler):
+        fake = FakePostgrest(handler)
+        monkeypatch.setattr(supabase_client, "_client", fake)
+        return fake
+    return install
+
+
+def test_upsert_resume_returns_the_id_from_one_round_trip(db):
+    fake = db(lambda request: httpx.Response(201, json=[{"id": "resume-1", **json.loads(request.content)}]))
+
+    resume_id = asyncio.run(supabase_client.upsert_resume("user-1", "cv.pdf", "text", content_hash="abc", revision=2))
+    assert resume_id == "resume-1"
+    assert len(fake.requests) == 1
+    request = fake.requests[0]
+    assert request.method == "POST" and request.url.params["on_conflict"] == "user_id"
+    assert "return=representation" in request.headers["prefer"]
+    assert json.loads(request.content) == {
+        "user_id": "user-1", "filename": "cv.pdf", "content": "text", "content_hash": "abc", "revision": 2,
+    }
+
+
+def test_missing_resume_is_none(db):
+    fake = db(lambda request: httpx.Response(200, json=[]))
+
+    assert asyncio.run(supabase_client.get_latest_resume_by_user("user-1")) is None
+    assert fake.requests[0].url.params["user_id"] == "eq.user-1"
+
+
+def test_mock_interviews_are_inserted_in_one_minimal_request(db):
+    fake = db(lambda request: httpx.Response(201))
+    rows = [{"user_id": f"user-{i}", "question": "Q", "answer": "A", "critique": "C", "score": i} for i in range(3)]
+
+    asyncio.run(supabase_client.insert_mock_interviews(rows))
+    assert len(fake.requests) == 1
+    assert "return=minimal" in fake.requests[0].headers["prefer"]
+    assert json.loads(fake.requests[0].content) == rows
@@ -0,0 +1,58 @@
+import asyncio
+import numpy as np
+from app.services import embeddings, vector_search
+from app.services.vector_index import FlatIndex, IVFIndex, build_index, load_index
+
+
+def _unit(rows, dim=16, seed=0):
+    v = np.random.default_rng(seed).normal(size=(rows, dim)).astype(np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+def test_flat_index_matches_exact_scan_after_add_and_remove():
+    vectors = _unit(200)
+    index = FlatIndex(16, capacity=8)
+    index.add(list(range(200)), vectors)
+    index.remove([0, 5, 199])
+
+    query = vectors[7]
+    keep = [i for i in range(200) if i not in (0, 5, 199)]
+    expected = sorted(keep, key=lambda i: -float(vectors[i] @ query))[:5]
+    assert [i for i, _ in index.search(query, 5)] == expected
+    assert len(index) == 197
+
+
+def test_ivf_index_recall_and_mmap_roundtrip(tmp_path):
+    vectors = _unit(3000, seed=1)
+    index = build_index(range(3000), vectors, ivf_threshold=1000, nprobe=16)
+    assert isinstance(index, IVFIndex)
+
+    exact = FlatIndex(16)
+    exact.add(list(range(3000)), vectors)
+    queries = _unit(50, seed=2)
+    recall = np.mean([
+        len({i for i, _ in index.search(q, 10)} & {i for i, _ in exact.search(q, 10)}) / 10
+        for q in queries
+    ])
+    assert recall > 0.8
+
+    index.save(str(tmp_path))
+    loaded = load_index(str(tmp_path))
+    assert loaded.search(queries[0], 10) == index.search(queries[0], 10)
+    loaded.add([5000], queries[:1], [{"title": "new"}])
+    assert loaded.search(queries[0], 1)[0][0] == 5000
+
+
+def test_find_similar_jobs_uses_local_index(monkeypatch):
+    vectors = _unit(3, dim=embeddings.EMBEDDING_DIM)
+    index = FlatIndex(embeddings.EMBEDDING_DIM)
+    index.add([1, 2, 3], vectors, [{"title": f"T{i}", "description": f"D{i}"} for i in (1, 2, 3)])
+    monkeypatch.setattr(vector_search, "VECTOR_BACKEND", "local")
+    monkeypatch.setattr(vector_search, "_local_index", index)
+
+    async def fake_embed(text):
+        return vectors[1]
+
+    monkeypatch.setattr(vector_search, "aembed_text", fake_embed)
+    result = asyncio.run(vector_search.find_similar_jobs("anything", top_k=1))
+    assert result == [{"title": "T2", "description": "D2"}]
@@ -0,0 +1,125 @@
+import asyncio
+import csv
+import io
+import numpy as np
+import pytest
+from contextlib import asynccontextmanager
+from app.services import db_client, embeddings, vector_search
+
+
+class FakeConn:
+    def __init__(self):
+        self.copies = []
+
+    async def copy_to_table(self, table, source, columns, format):
+        rows = list(csv.reader(io.StringIO(source.read().decode("utf-8"))))
+        self.copies.append((table, columns, rows))
+
+
+class FakePool:
+    def __init__(self):
+        self.conn = FakeConn()
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+class FakeModel:
+    def __init__(self):
+        self.batches = []
+
+    def encode(self, texts, **kwargs):
+        self.batches.append(len(texts))
+        return np.ones((len(texts), embeddings.EMBEDDING_DIM))
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    fake = FakePool()
+    monkeypatch.setattr(db_client, "_pool", fake)
+    return fake
+
+
+def test_bulk_insert_embeds_and_copies_in_chunks(pool, monkeypatch):
+    model = FakeModel()
+    monkeypatch.setattr(embeddings, "_model", model)
+    jobs = [(f"Job {i}", f"Description, number {i}") for i in range(25)]
+
+    written = asyncio.run(vector_search.bulk_insert_job_embeddings(jobs, batch_size=10))
+
+    assert written == 25
+    assert model.batches == [10, 10, 5]
+    assert [len(rows) for _, _, rows in pool.conn.copies] == [10, 10, 5]
+    table, columns, rows = pool.conn.copies[0]
+    assert table == "job_embeddings" and columns == ["title", "description", "embedding"]
+    assert rows[1][:2] == ["Job 1", "Description, number 1"]
+    assert rows[1][2].startswith("[1,1,")
+
+
+def test_get_pool_requires_initialisation():
+    with pytest.raises(RuntimeError):
+        db_client.get_pool()
+
+
+class TableConn:
+    """job_embeddings rows served to the local-index queries."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.fetches = []
+
+    @asynccontextmanager
+    async def transaction(self, **kwargs):
+        yield
+
+    async def fetchrow(self, query):
+        return {"rows": len(self.rows), "max_id": max((r["id"] for r in self.rows), default=0)}
+
+    async def fetch(self, query, *args):
+        self.fetches.append(args)
+        return [r for r in self.rows if not args or r["id"] > args[0]]
+
+
+def _row(job_id):
+    vec = np.zeros(4, dtype=np.float32)
+    vec[job_id % 4] = 1
+    return {"id": job_id, "title": f"Job {job_id}", "description": "", "embedding": vector_search.to_pgvector(vec)}
+
+
+@pytest.fixture
+def table(monkeypatch, tmp_path):
+    pool = FakePool()
+    pool.conn = TableConn([_row(i) for i in (1, 2, 3)])
+    monkeypatch.setattr(db_client, "_pool", pool)
+    monkeypatch.setattr(vector_search, "_local_index", None)
+    monkeypatch.setattr(vector_search, "VECTOR_INDEX_PATH", str(tmp_path))
+    return pool.conn
+
+
+def test_stale_snapshot_is_caught_up_with_the_table(table):
+    asyncio.run(vector_search.load_local_index())
+    assert sorted(vector_search.get_local_index().ids) == [1, 2, 3]
+
+    # Rows inserted after the snapshot was saved (e.g. by another worker).
+    table.rows.append(_row(4))
+    vector_search._local_index = None
+    asyncio.run(vector_search.load_local_index())
+    assert sorted(vector_search.get_local_index().ids) == [1, 2, 3, 4]
+    # Only the new row was fetched, and the snapshot now records it.
+    assert table.fetches[-1] == (3,)
+    assert vector_search.load_index(vector_search.VECTOR_INDEX_PATH).source == {"rows": 4, "max_id": 4}
+
+
+def test_refresh_adds_new_rows_and_rebuilds_after_deletes(table):
+    asyncio.run(vector_search.rebuild_local_index())
+    assert not asyncio.run(vector_search.refresh_local_index())
+
+    table.rows.append(_row(7))
+    assert asyncio.run(vector_search.refresh_local_index())
+    assert sorted(vector_search.get_local_index().ids) == [1, 2, 3, 7]
+
+    del table.rows[0]
+    assert asyncio.run(vector_search.refresh_local_index())
+    assert sorted(vector_search.get_local_index().ids) == [2, 3, 7]
+    assert table.fetches[-1] == ()